@@ -8,10 +8,12 @@ Automatically archives Phase 0 media analysis results alongside investigation ar
 
 import os
 import json
-import shutil
 from pathlib import Path
 from datetime import datetime
 
+from artifact_placement import place_file
+from ticket_metadata import load_metadata
+
 
 class ResolutionArchiver:
     """Archive Phase 0 and investigation artifacts"""
@@ -69,20 +71,28 @@ class ResolutionArchiver:
         # Copy metadata.json
         metadata_src = ticket_folder / "metadata.json"
         if metadata_src.exists():
-            shutil.copy2(metadata_src, resolution_path / "ticket_original" / "metadata.json")
-            print(f"[+] Copied metadata.json")
+            placement = place_file(metadata_src, resolution_path / "ticket_original" / "metadata.json",
+                                   hardlink=False)
+            print(f"[+] Copied metadata.json ({placement})")
+
+            # OCR text sidecar (see ticket_metadata)
+            for sidecar in load_metadata(metadata_src).sidecars():
+                if sidecar.exists():
+                    placement = place_file(sidecar, resolution_path / "ticket_original" / sidecar.name)
+                    print(f"[+] Copied {sidecar.name} ({placement})")
 
         # Copy preliminary_analysis.md
         analysis_src = ticket_folder / "preliminary_analysis.md"
         if analysis_src.exists():
-            shutil.copy2(analysis_src, resolution_path / "analysis" / "preliminary_analysis.md")
-            print(f"[+] Copied preliminary_analysis.md")
+            placement = place_file(analysis_src, resolution_path / "analysis" / "preliminary_analysis.md",
+                                   hardlink=False)
+            print(f"[+] Copied preliminary_analysis.md ({placement})")
 
         # Copy original ticket file (PDF, image, etc.)
         for ext in ['*.pdf', '*.png', '*.jpg', '*.jpeg', '*.mp3', '*.mp4', '*.wav']:
             for file in ticket_folder.glob(ext):
-                shutil.copy2(file, resolution_path / "ticket_original" / file.name)
-                print(f"[+] Copied {file.name}")
+                placement = place_file(file, resolution_path / "ticket_original" / file.name)
+                print(f"[+] Copied {file.name} ({placement})")
 
     def _generate_resolution_summary(self, resolution_path):
         """Generate resolution_summary.md"""
@@ -91,8 +101,7 @@ class ResolutionArchiver:
         metadata = {}
 
         if metadata_file.exists():
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+            metadata = load_metadata(metadata_file)
 
         # Extract root cause and actions from metadata
         root_cause = metadata.get('root_cause', 'See investigation report')
@@ -148,8 +157,7 @@ class ResolutionArchiver:
             print(f"[!] No Phase 0 metadata found, skipping metrics")
             return
 
-        with open(metadata_file, 'r', encoding='utf-8') as f:
-            metadata = json.load(f)
+        metadata = load_metadata(metadata_file)
 
         # Determine file type from original files
         file_type = "unknown"
@@ -9,11 +9,13 @@ Part of BMAD-EDI Documentation Specialist (Phase 4/5) workflow
 
 import os
 import json
-import shutil
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from artifact_placement import place_file
+from ticket_metadata import load_metadata
+
 
 class EnhancedResolutionArchiver:
     """Archive complete resolution package with Phase 0 artifacts"""
@@ -167,20 +169,25 @@ class EnhancedResolutionArchiver:
         # Copy metadata JSON
         metadata_file = processing_folder / "metadata.json"
         if metadata_file.exists():
-            shutil.copy2(metadata_file, resolution_folder / "analysis" / "phase0_metadata.json")
-            print(f"[+] Archived: phase0_metadata.json")
-
-            # Load metadata for later use
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+            placement = place_file(metadata_file, resolution_folder / "analysis" / "phase0_metadata.json",
+                                   hardlink=False)
+            print(f"[+] Archived: phase0_metadata.json ({placement})")
+
+            # Load metadata for later use (OCR text stays in its sidecar until needed)
+            metadata = load_metadata(metadata_file)
+            for sidecar in metadata.sidecars():
+                if sidecar.exists():
+                    placement = place_file(sidecar, resolution_folder / "analysis" / sidecar.name)
+                    print(f"[+] Archived: {sidecar.name} ({placement})")
         else:
             print(f"[!] Warning: metadata.json not found")
 
         # Copy analysis markdown
         analysis_files = list(processing_folder.glob("*_analysis.md"))
         if analysis_files:
-            shutil.copy2(analysis_files[0], resolution_folder / "analysis" / "phase0_analysis.md")
-            print(f"[+] Archived: phase0_analysis.md")
+            placement = place_file(analysis_files[0], resolution_folder / "analysis" / "phase0_analysis.md",
+                                   hardlink=False)
+            print(f"[+] Archived: phase0_analysis.md ({placement})")
         else:
             print(f"[!] Warning: analysis markdown not found")
 
@@ -189,8 +196,8 @@ class EnhancedResolutionArchiver:
         for ext in media_extensions:
             for media_file in processing_folder.glob(ext):
                 dest_file = resolution_folder / "original_files" / media_file.name
-                shutil.copy2(media_file, dest_file)
-                print(f"[+] Archived: {media_file.name}")
+                placement = place_file(media_file, dest_file)
+                print(f"[+] Archived: {media_file.name} ({placement})")
                 break
 
         # Extract confidence score if available
@@ -0,0 +1,163 @@
+"""
+Artifact Placement
+Put ticket files into processing/, failed/ and resolution folders without
+duplicating their bytes where the filesystem allows it
+
+Methods, in order of preference:
+    reflink    Copy-on-write clone (Linux FICLONE: Btrfs, XFS, bcachefs;
+               macOS clonefile: APFS). Independent file, no data copied.
+    hardlink   Second name for the same file (same filesystem only). No
+               data copied; both names share one inode.
+    rename     Atomic move on the same filesystem (move=True only: the
+               source is given up)
+    copy       Streaming copy (kernel fast-copy where available) to a temp
+               file, then an atomic rename into place
+
+Every method lands the destination atomically: a reader never sees a
+partial file, and an existing destination is replaced.
+
+Hardlinks share data, so a program that rewrites one name in place (not
+via a new file + rename) changes the other too. Pass hardlink=False for
+files that are edited later (metadata.json, analysis markdown) and for
+anything placed from a drop folder such as incoming/, where a file dropped
+again under the same name (e.g. by cp) is rewritten in place. Ticket files
+in processing/ are never rewritten, so archiving them may hardlink.
+
+Configuration (environment):
+    PHASE0_PLACEMENT   auto (default: reflink, hardlink, copy)
+                       reflink (reflink or copy; never hardlink)
+                       copy (always copy, like shutil.copy2)
+"""
+
+import os
+import sys
+import errno
+import shutil
+import threading
+from pathlib import Path
+
+METHODS = ("reflink", "hardlink", "rename", "copy")
+
+# Linux ioctl: clone src_fd's extents into dest_fd (_IOW(0x94, 9, int))
+_FICLONE = 0x40049409
+
+# Errors meaning "this method is not possible here"; anything else is a real failure
+_UNSUPPORTED = {errno.EXDEV, errno.EPERM, errno.EACCES, errno.EINVAL, errno.ENOTTY, errno.EMLINK,
+                errno.ENOSYS, getattr(errno, "EOPNOTSUPP", errno.EINVAL), getattr(errno, "ENOTSUP", errno.EINVAL)}
+
+_clonefile = None
+
+
+def _reflink(source, target):
+    """Clone source to target (which must not exist); False if not supported"""
+    if sys.platform.startswith("linux"):
+        import fcntl
+        with open(source, 'rb') as src, open(target, 'xb') as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+                return True
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+        os.unlink(target)
+        return False
+
+    if sys.platform == "darwin":
+        global _clonefile
+        if _clonefile is None:
+            import ctypes
+            libc = ctypes.CDLL(None, use_errno=True)
+            _clonefile = libc.clonefile
+            _clonefile.argtypes = (ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int)
+        if _clonefile(os.fsencode(source), os.fsencode(target), 0) == 0:
+            return True
+        import ctypes
+        if ctypes.get_errno() not in _UNSUPPORTED:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()), str(source))
+        return False
+
+    # Windows ReFS block cloning needs DeviceIoControl per extent; not worth it here
+    return False
+
+
+def _hardlink(source, target):
+    try:
+        os.link(source, target)
+        return True
+    except OSError as e:
+        if e.errno in _UNSUPPORTED:
+            return False
+        raise
+
+
+def _temp_path(destination):
+    return destination.with_name(f".{destination.name}.{os.getpid()}.{threading.get_ident()}.place")
+
+
+def _preference():
+    mode = os.environ.get("PHASE0_PLACEMENT", "auto").lower()
+    if mode == "copy":
+        return ()
+    if mode == "reflink":
+        return ("reflink",)
+    return ("reflink", "hardlink")
+
+
+def place_file(source, destination, hardlink=True, move=False):
+    """
+    Place source at destination, linking or cloning instead of copying when possible
+
+    Args:
+        source: Existing file
+        destination: Target path (replaced if it exists; parent must exist)
+        hardlink: Allow a hardlink (False for files edited later)
+        move: The source may be consumed: renamed when on the same
+            filesystem, otherwise copied and then removed
+
+    Returns:
+        str: Method used ("reflink", "hardlink", "rename" or "copy")
+    """
+    source = Path(source)
+    destination = Path(destination)
+    if not source.is_file():
+        raise FileNotFoundError(f"Not a file: {source}")
+
+    if move:
+        # A rename is already free and keeps one name; no need to link first
+        try:
+            os.replace(source, destination)
+            return "rename"
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+
+    tmp_path = _temp_path(destination)
+    try:
+        method = None
+        for candidate in _preference():
+            if candidate == "hardlink" and not hardlink:
+                continue
+            placed = _reflink(source, tmp_path) if candidate == "reflink" else _hardlink(source, tmp_path)
+            if placed:
+                method = candidate
+                break
+
+        if method is None:
+            shutil.copyfile(source, tmp_path)
+            method = "copy"
+        if method != "hardlink":
+            shutil.copystat(source, tmp_path)
+        os.replace(tmp_path, destination)
+        if method == "hardlink" and os.path.lexists(tmp_path):
+            # destination was already a link to source: rename() is a no-op
+            os.unlink(tmp_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if move:
+        source.unlink()
+    return method
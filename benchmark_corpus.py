@@ -0,0 +1,183 @@
+"""
+Synthetic EDI Ticket Corpus
+Deterministic ticket images and PDFs with known field values, for OCR benchmarks
+
+Every ticket has a header page carrying the fields Phase 0 extracts
+(ticket #, customer, company, trading partner, transaction, severity,
+issue) and optional follow-up pages of EDI segment dumps. Tickets vary in
+format (PNG, JPEG, PDF, multi-frame TIFF), page count, noise and skew.
+Built with PIL only, so it works offline; the same seed always gives the
+same corpus.
+"""
+
+import json
+import random
+from pathlib import Path
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+
+PAGE_SIZE = (1275, 1650)        # US Letter at 150 DPI
+FONT_SIZE = 30
+
+CUSTOMERS = ["Jody Bridge", "Maria Chen", "Sam Okafor", "Priya Natarajan", "Luis Ortega", "Anna Kowalski"]
+COMPANIES = ["Singtech Inc", "Northwind Traders", "Blue Harbor Foods", "Apex Industrial Supply",
+             "Crescent Apparel", "Summit Home Goods"]
+PARTNERS = ["Staples", "Walmart", "Target", "Home Depot", "Costco", "Lowes"]
+TRANSACTIONS = [("850", "PO"), ("810", "Invoice"), ("856", "ASN"), ("997", "FA"), ("940", "Warehouse")]
+ISSUES = ["ASN rejected by partner - missing SSCC label", "Invoice totals do not match PO",
+          "Acknowledgment not received for last batch", "Duplicate control number on outbound file"]
+
+# Formats: (extension, min pages, max pages)
+FORMATS = [(".png", 1, 1), (".pdf", 2, 3), (".tiff", 2, 4), (".jpg", 1, 1)]
+
+# Fields scored against ground truth, as named by metadata_parser
+SCORED_FIELDS = ("ticket_id", "customer_name", "company", "trading_partner", "transaction_type", "severity")
+TRANSACTION_CODES = tuple(code for code, _ in TRANSACTIONS) + ("997", "945", "947", "204", "210", "214", "990")
+
+
+def _font(size=FONT_SIZE):
+    """A scalable font that exists on every platform"""
+    for name in ("DejaVuSans.ttf", "arial.ttf", "Arial.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def _ticket_id(rng):
+    """8-digit ticket number that contains no transaction code (keeps field scoring unambiguous)"""
+    while True:
+        ticket_id = str(rng.randint(10_000_000, 99_999_999))
+        if not any(code in ticket_id for code in TRANSACTION_CODES):
+            return ticket_id
+
+
+def _ticket_fields(rng):
+    code, name = rng.choice(TRANSACTIONS)
+    urgent = rng.random() < 0.3
+    return {
+        "ticket_id": _ticket_id(rng),
+        "customer_name": rng.choice(CUSTOMERS),
+        "company": rng.choice(COMPANIES),
+        "trading_partner": rng.choice(PARTNERS),
+        "transaction_type": f"{code} {name}",
+        "severity": "HIGH" if urgent else "NORMAL",
+        "issue_title": f"Issue: {rng.choice(ISSUES)}",
+    }
+
+
+def _header_lines(fields):
+    lines = [
+        f"Ticket #{fields['ticket_id']}",
+        f"Customer: {fields['customer_name']}",
+        f"Company: {fields['company']}",
+        f"Trading Partner: {fields['trading_partner']}",
+        f"Transaction: {fields['transaction_type']}",
+        fields["issue_title"],
+    ]
+    if fields["severity"] == "HIGH":
+        lines.append("Priority: urgent")
+    return lines
+
+
+def _segment_lines(rng, count=18):
+    """EDI segment dump for follow-up pages (no field labels, no ticket-like numbers)"""
+    segments = []
+    for _ in range(count):
+        tag = rng.choice(["REF", "N1", "PO1", "CTT", "DTM", "LIN", "SN1", "TD5"])
+        elements = "*".join(rng.choice(["ZZ", "BM", "UP", "EA", "CA", "ST", "BY"]) + str(rng.randint(1, 999))
+                            for _ in range(rng.randint(2, 5)))
+        segments.append(f"{tag}*{elements}~")
+    return segments
+
+
+def _render_page(lines, rng, noise, skew):
+    """Grayscale page with one text line per entry, then noise and skew"""
+    page = Image.new("L", PAGE_SIZE, 255)
+    draw = ImageDraw.Draw(page)
+    font = _font()
+    y = 120
+    for line in lines:
+        draw.text((100 + rng.randint(0, 20), y), line, fill=0, font=font)
+        y += int(FONT_SIZE * 1.9)
+
+    if noise:
+        # effect_noise is centred on 128; shift it so the mean stays put
+        grain = Image.effect_noise(PAGE_SIZE, noise)
+        page = ImageChops.add(page, grain, scale=1.0, offset=-128)
+    if skew:
+        page = page.rotate(skew, resample=Image.BICUBIC, expand=True, fillcolor=255)
+    return page
+
+
+def _save(pages, path):
+    suffix = path.suffix.lower()
+    if suffix == ".pdf":
+        pages[0].save(path, save_all=True, append_images=pages[1:], resolution=150)
+    elif suffix in (".tif", ".tiff"):
+        pages[0].save(path, save_all=True, append_images=pages[1:], compression="tiff_deflate")
+    elif suffix in (".jpg", ".jpeg"):
+        pages[0].save(path, quality=85)
+    else:
+        pages[0].save(path)
+
+
+def generate_corpus(output_dir, tickets=12, seed=1337):
+    """
+    Write a synthetic ticket corpus and its ground truth
+
+    Args:
+        output_dir: Directory for the ticket files and manifest.json
+        tickets: Number of tickets
+        seed: Random seed (same seed, same corpus)
+
+    Returns:
+        list: Manifest entries {"file", "format", "pages", "noise", "skew", "fields"}
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+
+    manifest = []
+    for number in range(tickets):
+        suffix, min_pages, max_pages = FORMATS[number % len(FORMATS)]
+        page_count = rng.randint(min_pages, max_pages)
+        noise = rng.choice([0, 0, 8, 16])
+        skew = rng.choice([0.0, 0.0, 0.8, -1.5])
+        fields = _ticket_fields(rng)
+
+        pages = [_render_page(_header_lines(fields), rng, noise, skew)]
+        for _ in range(page_count - 1):
+            pages.append(_render_page(_segment_lines(rng), rng, noise, skew))
+
+        path = output_dir / f"ticket_{number:03d}_{fields['ticket_id']}{suffix}"
+        _save(pages, path)
+        manifest.append({
+            "file": path.name,
+            "format": suffix,
+            "pages": page_count,
+            "noise": noise,
+            "skew": skew,
+            "fields": fields
+        })
+
+    with open(output_dir / "manifest.json", 'w', encoding='utf-8') as f:
+        json.dump({"seed": seed, "tickets": manifest}, f, indent=2)
+    return manifest
+
+
+def score_fields(expected, parsed):
+    """{field: True/False} for each scored field (case and whitespace insensitive)"""
+    def normalize(value):
+        return " ".join(str(value).split()).lower()
+    return {field: normalize(parsed.get(field, "")) == normalize(expected[field]) for field in SCORED_FIELDS}
+
+
+if __name__ == "__main__":
+    import sys
+    target = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("synthetic_corpus")
+    entries = generate_corpus(target, tickets=int(sys.argv[2]) if len(sys.argv) > 2 else 12)
+    print(f"[+] Wrote {len(entries)} tickets ({sum(e['pages'] for e in entries)} pages) to {target}")
@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+"""
+OCR Pipeline Benchmarks
+Measures per-page latency of the OCR hot path
+
+Usage:
+    python benchmark_ocr.py pipeline [files...] [--runs N] [--no-ocr]
+    python benchmark_ocr.py preprocess [files...] [--runs N] [--no-ocr]
+    python benchmark_ocr.py rescale [files...] [--runs N] [--no-ocr]
+    python benchmark_ocr.py render [pdfs...] [--runs N] [--no-ocr]
+    python benchmark_ocr.py sweep [files...] [--workers 1,2,4] [--threads 1,2,4]
+                                  [--mkldnn default,on,off] [--pin off,on] [--save]
+    python benchmark_ocr.py metadata [--size-mb 1] [--runs N]
+
+With no files, a synthetic ticket page is generated so the benchmark
+runs anywhere PaddleOCR is installed.
+"""
+
+import sys
+import math
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+SKILL_DIR = Path(__file__).parent
+sys.path.insert(0, str(SKILL_DIR))
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples):
+    """Mean/p50/p95 in milliseconds"""
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "mean_ms": sum(samples) / len(samples) * 1000,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000
+    }
+
+
+def make_synthetic_page(output_dir, width=1700, height=2200, font_scale=1.6, name="synthetic_ticket.png"):
+    """Render a plain ticket-like page with OpenCV and save it as PNG"""
+    import cv2
+    import numpy as np
+
+    img = np.full((height, width, 3), 255, dtype=np.uint8)
+    lines = [
+        "Ticket #13620086",
+        "Customer: Jody Bridge",
+        "Company: Singtech Inc",
+        "Trading Partner: Staples",
+        "Transaction: 856 ASN",
+        "Issue: ASN rejected by partner - missing SSCC label",
+    ]
+    step = int(70 * font_scale)
+    thickness = max(1, int(round(font_scale * 2)))
+    for i, line in enumerate(lines):
+        cv2.putText(img, line, (int(50 * font_scale), step * (i + 2)), cv2.FONT_HERSHEY_SIMPLEX,
+                    font_scale, (0, 0, 0), thickness)
+
+    path = Path(output_dir) / name
+    cv2.imwrite(str(path), img)
+    return path
+
+
+def bench_pipeline(args):
+    """Per-page latency with and without PNG round trips between stages"""
+    from ocr_processor import OCRProcessor
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="ocr_bench_"))
+    try:
+        files = [Path(f) for f in args.files] or [make_synthetic_page(tmp_dir)]
+        processor = OCRProcessor(data_dir=tmp_dir / "data")
+        run_ocr = not args.no_ocr
+
+        disk_samples = []
+        memory_samples = []
+
+        for file_path in files:
+            for _ in range(args.runs):
+                # Disk mode: render -> PNG -> imread -> preprocess -> PNG -> OCR reads PNG
+                start = time.perf_counter()
+                if file_path.suffix.lower() == '.pdf':
+                    page_paths = processor._pdf_to_images(file_path)
+                else:
+                    page_paths = [str(file_path)]
+                render_time = time.perf_counter() - start
+                for page_path in page_paths:
+                    page_start = time.perf_counter()
+                    processed = processor._preprocess_image(page_path)
+                    if run_ocr:
+                        processor.ocr.ocr(processed)
+                    disk_samples.append(time.perf_counter() - page_start + render_time / len(page_paths))
+
+                # Memory mode: render -> ndarray -> preprocess -> OCR on ndarray
+                start = time.perf_counter()
+                pages = processor._load_pages(file_path)
+                render_time = time.perf_counter() - start
+                for page in pages:
+                    page_start = time.perf_counter()
+                    if run_ocr:
+                        processor._ocr_page(page, preprocess=True)
+                    else:
+                        processor._preprocess_array(page)
+                    memory_samples.append(time.perf_counter() - page_start + render_time / len(pages))
+
+        results = {
+            "files": [str(f) for f in files],
+            "runs": args.runs,
+            "ocr_included": run_ocr,
+            "disk_round_trip": summarize(disk_samples),
+            "in_memory": summarize(memory_samples)
+        }
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print_comparison("Per-page latency", results["disk_round_trip"], results["in_memory"],
+                     "disk round trip", "in memory")
+    return results
+
+
+def bench_preprocess(args):
+    """Preprocess time and OCR confidence: full pipeline vs adaptive plan"""
+    from ocr_processor import OCRProcessor
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="ocr_bench_"))
+    try:
+        files = [Path(f) for f in args.files] or [make_synthetic_page(tmp_dir)]
+        processor = OCRProcessor(data_dir=tmp_dir / "data")
+        run_ocr = not args.no_ocr
+
+        samples = {"full": [], "adaptive": []}
+        confidences = {"full": [], "adaptive": []}
+        plans = []
+
+        for file_path in files:
+            for page_number, page in enumerate(processor._load_pages(file_path), 1):
+                for mode in ("full", "adaptive"):
+                    processor.preprocess_mode = mode
+                    for _ in range(args.runs):
+                        start = time.perf_counter()
+                        image, report = processor._preprocess_with_report(page)
+                        samples[mode].append(time.perf_counter() - start)
+                    if run_ocr:
+                        result = processor.ocr.ocr(processor._as_bgr(image))
+                        confidences[mode].append(processor._calculate_confidence([result]))
+                    if mode == "adaptive":
+                        plans.append({
+                            "file": str(file_path),
+                            "page": page_number,
+                            "quality": report.get("quality"),
+                            "stages_run": [name for name, stage in report["stages"].items() if stage["ran"]]
+                        })
+
+        results = {
+            "files": [str(f) for f in files],
+            "runs": args.runs,
+            "full": summarize(samples["full"]),
+            "adaptive": summarize(samples["adaptive"]),
+            "plans": plans
+        }
+        if run_ocr:
+            results["mean_confidence"] = {
+                mode: sum(values) / len(values) if values else 0.0
+                for mode, values in confidences.items()
+            }
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print_comparison("Preprocess latency per page", results["full"], results["adaptive"],
+                     "full pipeline", "adaptive")
+    if run_ocr:
+        print(f"Mean confidence: full={results['mean_confidence']['full']:.3f}  "
+              f"adaptive={results['mean_confidence']['adaptive']:.3f}")
+    return results
+
+
+# (width, height, font scale): screenshot, small crop, scanned letter page, phone photo
+MIXED_SIZES = [
+    (1920, 800, 0.7),
+    (800, 600, 0.6),
+    (1700, 2200, 1.6),
+    (4000, 3000, 4.0),
+]
+
+
+def bench_rescale(args):
+    """Pixels processed and latency: legacy 2x upscale vs glyph-height rescaling"""
+    from ocr_processor import OCRProcessor, DEFAULT_TARGET_GLYPH_PX
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="ocr_bench_"))
+    try:
+        files = [Path(f) for f in args.files] or [
+            make_synthetic_page(tmp_dir, w, h, scale, name=f"synthetic_{w}x{h}.png")
+            for w, h, scale in MIXED_SIZES
+        ]
+        processor = OCRProcessor(data_dir=tmp_dir / "data")
+        run_ocr = not args.no_ocr
+        modes = {"legacy": 0, "glyph": DEFAULT_TARGET_GLYPH_PX}
+
+        samples = {mode: [] for mode in modes}
+        pixels = {mode: 0 for mode in modes}
+        confidences = {mode: [] for mode in modes}
+        pages = []
+
+        for file_path in files:
+            for page_number, page in enumerate(processor._load_pages(file_path), 1):
+                row = {"file": str(file_path), "page": page_number,
+                       "input_pixels": int(page.shape[0] * page.shape[1])}
+                for mode, target in modes.items():
+                    processor.target_glyph_px = target
+                    for run in range(args.runs):
+                        start = time.perf_counter()
+                        image, report = processor._preprocess_with_report(page)
+                        if run_ocr:
+                            result = processor.ocr.ocr(processor._as_bgr(image))
+                        samples[mode].append(time.perf_counter() - start)
+                    pixels[mode] += report["output_pixels"]
+                    if run_ocr:
+                        confidences[mode].append(processor._calculate_confidence([result]))
+                    row[mode] = {"scale": report["scale"], "output_pixels": report["output_pixels"],
+                                 "glyph_height": report["quality"]["glyph_height"]}
+                pages.append(row)
+
+        results = {
+            "files": [str(f) for f in files],
+            "runs": args.runs,
+            "ocr_included": run_ocr,
+            "legacy": summarize(samples["legacy"]),
+            "glyph": summarize(samples["glyph"]),
+            "total_pixels": pixels,
+            "pages": pages
+        }
+        if run_ocr:
+            results["mean_confidence"] = {
+                mode: sum(values) / len(values) if values else 0.0
+                for mode, values in confidences.items()
+            }
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print_comparison("Per-page latency (preprocess" + (" + OCR)" if run_ocr else ")"),
+                     results["legacy"], results["glyph"], "legacy 2x upscale", "glyph rescale")
+    print(f"Total pixels: legacy={pixels['legacy']:,}  glyph={pixels['glyph']:,}")
+    for row in pages:
+        print(f"  {Path(row['file']).name:28s} glyph={row['glyph']['glyph_height']}px  "
+              f"scale legacy={row['legacy']['scale']} glyph={row['glyph']['scale']}")
+    if run_ocr:
+        print(f"Mean confidence: legacy={results['mean_confidence']['legacy']:.3f}  "
+              f"glyph={results['mean_confidence']['glyph']:.3f}")
+    return results
+
+
+def make_synthetic_pdf(output_dir, pages=4):
+    """Multi-page scanned-style PDF built from the synthetic page (via Pillow)"""
+    from PIL import Image
+
+    page_path = make_synthetic_page(output_dir)
+    with Image.open(page_path) as page:
+        page = page.convert("RGB")
+        path = Path(output_dir) / "synthetic_ticket.pdf"
+        page.save(path, save_all=True, append_images=[page] * (pages - 1), resolution=200)
+    return path
+
+
+def bench_render(args):
+    """Render latency and bytes per page: RGB at 200 DPI vs adaptive grayscale"""
+    import pdf2image
+    from ocr_processor import OCRProcessor
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="ocr_bench_"))
+    try:
+        files = [Path(f) for f in args.files] or [make_synthetic_pdf(tmp_dir)]
+        processor = OCRProcessor(data_dir=tmp_dir / "data")
+        run_ocr = not args.no_ocr
+
+        samples = {"baseline": [], "adaptive": []}
+        page_bytes = {"baseline": [], "adaptive": []}
+        confidences = {"baseline": [], "adaptive": []}
+        renders = []
+
+        for file_path in files:
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                baseline = [processor._pil_to_bgr(p) for p in pdf2image.convert_from_path(str(file_path))]
+                elapsed = time.perf_counter() - start
+                samples["baseline"].extend([elapsed / len(baseline)] * len(baseline))
+                page_bytes["baseline"].extend(page.nbytes for page in baseline)
+
+                render_info = {}
+                start = time.perf_counter()
+                _, numbered = processor._open_pages(file_path, render_info=render_info)
+                adaptive = [page for _, page in numbered]
+                elapsed = time.perf_counter() - start
+                samples["adaptive"].extend([elapsed / len(adaptive)] * len(adaptive))
+                page_bytes["adaptive"].extend(page.nbytes for page in adaptive)
+
+            renders.append({"file": str(file_path), **render_info})
+            if run_ocr:
+                for mode, pages in (("baseline", baseline), ("adaptive", adaptive)):
+                    layouts = [processor._ocr_page(page, preprocess=True)[0] for page in pages]
+                    confidences[mode].append(processor._calculate_confidence(layouts))
+
+        results = {
+            "files": [str(f) for f in files],
+            "runs": args.runs,
+            "baseline": summarize(samples["baseline"]),
+            "adaptive": summarize(samples["adaptive"]),
+            "mean_page_mb": {
+                mode: sum(values) / len(values) / (1024 * 1024) if values else 0.0
+                for mode, values in page_bytes.items()
+            },
+            "renders": renders
+        }
+        if run_ocr:
+            results["mean_confidence"] = {
+                mode: sum(values) / len(values) if values else 0.0
+                for mode, values in confidences.items()
+            }
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print_comparison("Render latency per page", results["baseline"], results["adaptive"],
+                     "RGB 200 DPI", "adaptive gray")
+    print(f"Mean page size: baseline={results['mean_page_mb']['baseline']:.1f} MB  "
+          f"adaptive={results['mean_page_mb']['adaptive']:.1f} MB")
+    for render in renders:
+        print(f"  {Path(render['file']).name:28s} dpi={render.get('dpi')} ({render.get('dpi_source')})")
+    if run_ocr:
+        print(f"Mean confidence: baseline={results['mean_confidence']['baseline']:.3f}  "
+              f"adaptive={results['mean_confidence']['adaptive']:.3f}")
+    return results
+
+
+def make_synthetic_tiff(output_dir, pages=8):
+    """Multi-frame TIFF of distinct synthetic pages (no poppler needed)"""
+    import cv2
+    from PIL import Image
+
+    frames = []
+    for number in range(pages):
+        page_path = make_synthetic_page(output_dir, name=f"sweep_page_{number}.png")
+        img = cv2.imread(str(page_path), cv2.IMREAD_GRAYSCALE)
+        # Vary each page so page deduplication never short-circuits OCR
+        cv2.putText(img, f"Page {number + 1} of {pages}", (80, 2000), cv2.FONT_HERSHEY_SIMPLEX, 1.6, 0, 3)
+        frames.append(Image.fromarray(img))
+    path = Path(output_dir) / "synthetic_ticket.tiff"
+    frames[0].save(path, save_all=True, append_images=frames[1:], compression="tiff_deflate")
+    return path
+
+
+def _parse_list(value, convert):
+    return [convert(item.strip()) for item in value.split(",") if item.strip()]
+
+
+def _parse_toggle(value):
+    """'on'/'off'/'default' -> True/False/None"""
+    return {"on": True, "off": False, "default": None}[value.lower()]
+
+
+def bench_sweep(args):
+    """Pages/sec per (workers, threads, MKL-DNN, pinning) configuration on this machine"""
+    from ocr_processor import OCRProcessor
+    from ocr_resources import available_cpus, save_resource_config
+
+    cores = len(available_cpus())
+    configs = [
+        {"workers": workers, "threads": threads, "enable_mkldnn": mkldnn, "pin_cpus": pin}
+        for workers in _parse_list(args.workers, int)
+        for threads in _parse_list(args.threads, int)
+        for mkldnn in _parse_list(args.mkldnn, _parse_toggle)
+        for pin in _parse_list(args.pin, _parse_toggle)
+        if workers * threads <= cores or args.oversubscribe
+        if not (pin and workers == 1)
+    ]
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="ocr_bench_"))
+    rows = []
+    try:
+        files = [Path(f) for f in args.files] or [make_synthetic_tiff(tmp_dir, args.pages)]
+        for config in configs:
+            label = (f"workers={config['workers']} threads={config['threads']} "
+                     f"mkldnn={config['enable_mkldnn']} pin={config['pin_cpus']}")
+            print(f"[*] {label}")
+            processor = OCRProcessor(
+                data_dir=tmp_dir / "data",
+                workers=config["workers"],
+                threads_per_worker=config["threads"],
+                cpu_threads=config["threads"],
+                enable_mkldnn=config["enable_mkldnn"],
+                pin_cpus=config["pin_cpus"],
+                dedup_pages=False,
+                cache_evictor=False
+            )
+            try:
+                # Warm-up run loads worker models, so only steady-state OCR is timed
+                processor.extract_text(files[0], use_cache=False)
+                pages = 0
+                start = time.perf_counter()
+                for _ in range(args.runs):
+                    for file_path in files:
+                        result = processor.extract_text(file_path, use_cache=False)
+                        pages += result.get("metadata", {}).get("pages", 0)
+                elapsed = time.perf_counter() - start
+            finally:
+                processor.close()
+            rows.append({**config, "pages": pages, "seconds": elapsed,
+                         "pages_per_sec": pages / elapsed if elapsed > 0 else 0.0})
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    rows.sort(key=lambda row: row["pages_per_sec"], reverse=True)
+    print("=" * 60)
+    print(f"OCR throughput by configuration ({cores} cores)")
+    print("=" * 60)
+    for row in rows:
+        print(f"workers={row['workers']:2d} threads={row['threads']:2d} "
+              f"mkldnn={str(row['enable_mkldnn']):5s} pin={str(row['pin_cpus']):5s} "
+              f"{row['pages_per_sec']:7.2f} pages/sec")
+    print("=" * 60)
+
+    results = {"cores": cores, "runs": args.runs, "configs": rows, "best": rows[0] if rows else None}
+    if args.save and rows:
+        best = rows[0]
+        path = save_resource_config({
+            "workers": best["workers"],
+            "worker_threads": best["threads"],
+            "cpu_threads": best["threads"],
+            "enable_mkldnn": best["enable_mkldnn"],
+            "pin_cpus": best["pin_cpus"]
+        })
+        print(f"[+] Best configuration saved to: {path}")
+    return results
+
+
+def make_ocr_dump(size_bytes, fields_at="first", seed=7):
+    """
+    Synthetic multi-page OCR text of about size_bytes, as pages
+
+    Pages are EDI segment dumps and prose with no field labels; the ticket
+    header page goes first, last, or nowhere ("none").
+    """
+    import random
+    from benchmark_corpus import _header_lines, _segment_lines, _ticket_fields
+
+    rng = random.Random(seed)
+    header = "\n".join(_header_lines(_ticket_fields(rng)))
+    prose = ["Please resend the file once the mapping is corrected.",
+             "Outbound documents were delayed by the carrier in the last batch.",
+             "See the attached segment dump for the affected shipments."]
+    pages, size = [], len(header) if fields_at != "none" else 0
+    while size < size_bytes:
+        page = "\n".join(_segment_lines(rng, 40) + [rng.choice(prose) for _ in range(5)])
+        pages.append(page)
+        size += len(page) + 2
+    if fields_at == "first":
+        pages.insert(0, header)
+    elif fields_at == "last":
+        pages.append(header)
+    return pages
+
+
+def bench_metadata(args):
+    """Metadata parsing on large OCR dumps: per-pattern re.search vs one-pass scanner"""
+    from metadata_parser import MetadataScanner, parse_metadata_from_text, _parse_metadata_regex
+
+    def incremental(pages):
+        scanner = MetadataScanner()
+        for i, page in enumerate(pages):
+            scanner.feed(page if i == 0 else "\n\n" + page)
+        return scanner.metadata()
+
+    results = {}
+    size = int(args.size_mb * 1024 * 1024)
+    for fields_at in ("first", "last", "none"):
+        pages = make_ocr_dump(size, fields_at)
+        text = "\n\n".join(pages)
+        expected = _parse_metadata_regex(text)
+        samples = {"regex": [], "scanner": [], "incremental": []}
+        for _ in range(args.runs):
+            for label, func, arg in (("regex", _parse_metadata_regex, text),
+                                     ("scanner", parse_metadata_from_text, text),
+                                     ("incremental", incremental, pages)):
+                start = time.perf_counter()
+                metadata = func(arg)
+                samples[label].append(time.perf_counter() - start)
+                if metadata != expected:
+                    print(f"[!] {label} result differs from the regex parser ({fields_at})")
+
+        stats = {label: summarize(values) for label, values in samples.items()}
+        results[fields_at] = stats
+        print_comparison(f"Metadata parsing, {len(text) / 1e6:.1f}MB over {len(pages)} pages, fields {fields_at}",
+                         stats["regex"], stats["scanner"], "per-pattern regex", "one-pass scanner")
+        print(f"Incremental (per page): mean={stats['incremental']['mean_ms']:.1f}ms")
+    return results
+
+
+def print_comparison(title, baseline, candidate, baseline_label, candidate_label):
+    """Print two latency summaries side by side"""
+    print("=" * 60)
+    print(title)
+    print("=" * 60)
+    for label, stats in ((baseline_label, baseline), (candidate_label, candidate)):
+        if stats.get("count"):
+            print(f"{label:20s} n={stats['count']:4d}  mean={stats['mean_ms']:9.1f}ms  "
+                  f"p50={stats['p50_ms']:9.1f}ms  p95={stats['p95_ms']:9.1f}ms")
+    if baseline.get("count") and candidate.get("count") and candidate["mean_ms"] > 0:
+        print(f"\nSpeedup: {baseline['mean_ms'] / candidate['mean_ms']:.2f}x")
+    print("=" * 60)
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description="OCR pipeline benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--output", help="Write results JSON to this file")
+
+    pipeline = subparsers.add_parser("pipeline", parents=[common],
+                                     help="Per-page latency with/without disk round trips")
+    pipeline.add_argument("files", nargs="*", help="PDF or image files (default: synthetic page)")
+    pipeline.add_argument("--runs", type=int, default=3, help="Repetitions per file")
+    pipeline.add_argument("--no-ocr", action="store_true", help="Skip inference to isolate I/O overhead")
+    pipeline.set_defaults(func=bench_pipeline)
+
+    preprocess = subparsers.add_parser("preprocess", parents=[common],
+                                       help="Full vs adaptive preprocessing time and confidence")
+    preprocess.add_argument("files", nargs="*", help="PDF or image files (default: synthetic page)")
+    preprocess.add_argument("--runs", type=int, default=3, help="Repetitions per page")
+    preprocess.add_argument("--no-ocr", action="store_true", help="Skip the confidence check")
+    preprocess.set_defaults(func=bench_preprocess)
+
+    rescale = subparsers.add_parser("rescale", parents=[common],
+                                    help="Legacy 2x upscale vs glyph-height rescaling on mixed sizes")
+    rescale.add_argument("files", nargs="*", help="PDF or image files (default: synthetic mixed sizes)")
+    rescale.add_argument("--runs", type=int, default=3, help="Repetitions per page")
+    rescale.add_argument("--no-ocr", action="store_true", help="Time preprocessing only")
+    rescale.set_defaults(func=bench_rescale)
+
+    render = subparsers.add_parser("render", parents=[common],
+                                   help="RGB 200 DPI vs adaptive grayscale PDF rendering")
+    render.add_argument("files", nargs="*", help="PDF files (default: synthetic 4-page PDF)")
+    render.add_argument("--runs", type=int, default=3, help="Repetitions per file")
+    render.add_argument("--no-ocr", action="store_true", help="Skip the confidence check")
+    render.set_defaults(func=bench_render)
+
+    sweep = subparsers.add_parser("sweep", parents=[common],
+                                  help="Pages/sec per thread, MKL-DNN and pinning configuration")
+    sweep.add_argument("files", nargs="*", help="PDF or image files (default: synthetic multi-page TIFF)")
+    sweep.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    sweep.add_argument("--threads", default="1,2,4", help="Comma-separated threads per process")
+    sweep.add_argument("--mkldnn", default="default,on,off", help="MKL-DNN settings to try")
+    sweep.add_argument("--pin", default="off,on", help="CPU pinning settings to try")
+    sweep.add_argument("--pages", type=int, default=8, help="Pages in the synthetic document")
+    sweep.add_argument("--runs", type=int, default=1, help="Timed passes per configuration")
+    sweep.add_argument("--oversubscribe", action="store_true",
+                       help="Also try workers x threads above the core count")
+    sweep.add_argument("--save", action="store_true", help="Write the fastest configuration to the resource file")
+    sweep.set_defaults(func=bench_sweep)
+
+    metadata = subparsers.add_parser("metadata", parents=[common],
+                                     help="Ticket metadata parsing speed on large OCR text dumps")
+    metadata.add_argument("--size-mb", type=float, default=1.0, help="Dump size in MB")
+    metadata.add_argument("--runs", type=int, default=5, help="Repetitions per dump")
+    metadata.set_defaults(func=bench_metadata)
+
+    args = parser.parse_args()
+    results = args.func(args)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"[+] Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,677 @@
+#!/usr/bin/env python3
+"""
+Durable Phase 0 Job Queue
+SQLite-backed staged queue: ingest -> extract -> parse -> artifacts
+
+Jobs survive crashes and restarts; nothing lives only in memory. Stages:
+    ingest     Wait until the file is fully written and hash it; inputs
+               already processed (ticket checkpoint) finish here
+    extract    OCR (documents) or Gemini (audio/video)
+    parse      Ticket metadata from the OCR text
+    artifacts  Processing folder, metadata.json, preliminary analysis
+
+Each stage has its own concurrency limit, enforced across processes by
+counting live leases. A worker leases a job for a visibility timeout and
+keeps extending it while it works; if the worker dies, the job becomes
+visible again when the lease expires. Failures retry with exponential
+backoff and jitter; after the last attempt the job is marked failed
+(dead letter) and the file copied to incoming/failed.
+
+Backpressure: ingest stops admitting jobs while the extract backlog
+(jobs waiting for or in OCR) is at its limit, so when OCR falls behind
+the queue holds file paths, not rendered pages.
+
+Throughput scales by adding worker threads (--workers) or more `run`
+processes on the same database; stage limits still hold across all of them.
+
+Standard library only (sqlite3 in WAL mode); one database per box.
+
+Configuration (environment):
+    PHASE0_QUEUE_DB         Database file (default: data/job_queue.sqlite3)
+    PHASE0_STAGE_LIMITS     Concurrent jobs per stage, e.g. "extract=2,parse=4"
+    PHASE0_EXTRACT_BACKLOG  Jobs at extract before ingest pauses (default: 32)
+
+Usage:
+    python job_queue.py enqueue <files or directories...>
+    python job_queue.py run [--workers 2] [--drain]
+    python job_queue.py status [--json]
+    python job_queue.py retry-failed
+"""
+
+import os
+import json
+import time
+import random
+import socket
+import sqlite3
+import threading
+from pathlib import Path
+
+from ticket_log import log_context
+
+DEFAULT_DB_PATH = Path(__file__).parent / "data" / "job_queue.sqlite3"
+
+STAGES = ("ingest", "extract", "parse", "artifacts")
+
+# Jobs leased at once per stage, across all workers and processes
+DEFAULT_STAGE_LIMITS = {"ingest": 4, "extract": 2, "parse": 4, "artifacts": 2}
+
+# Visibility timeout per stage (workers extend leases while a job runs)
+LEASE_SECONDS = {"ingest": 60.0, "extract": 300.0, "parse": 60.0, "artifacts": 120.0}
+
+DEFAULT_MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 5.0
+BACKOFF_MAX_SECONDS = 600.0
+DEFAULT_EXTRACT_BACKLOG = 32
+
+QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_path TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    state TEXT NOT NULL,                -- ready | leased | done | failed
+    payload TEXT NOT NULL DEFAULT '{}', -- stage outputs carried to the next stage
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (stage, state, available_at);
+
+-- At most one open job per file (enqueueing a queued file is a no-op)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_open_file ON jobs (file_path)
+    WHERE state IN ('ready', 'leased');
+"""
+
+
+class PermanentError(Exception):
+    """A job failure that retrying cannot fix (goes straight to failed)"""
+
+
+class Job:
+    """A leased job: the handler's view of one queue row"""
+
+    def __init__(self, job_id, file_path, stage, payload, attempts, owner):
+        self.id = job_id
+        self.file_path = file_path
+        self.stage = stage
+        self.payload = payload
+        self.attempts = attempts
+        self.owner = owner
+
+    def __repr__(self):
+        return f"Job({self.id}, {Path(self.file_path).name}, {self.stage}, attempt {self.attempts})"
+
+
+def _parse_limits(value):
+    """{"extract": 2, ...} from "extract=2,parse=4" """
+    limits = {}
+    for item in filter(None, (part.strip() for part in (value or "").split(","))):
+        stage, _, count = item.partition("=")
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage in limits: {stage}")
+        limits[stage] = max(1, int(count))
+    return limits
+
+
+class JobQueue:
+    """Persistent staged job queue with leases, retries and stage limits"""
+
+    def __init__(self, db_path=None, stage_limits=None, lease_seconds=None,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS, extract_backlog=None):
+        """
+        Args:
+            db_path: Database file (defaults to PHASE0_QUEUE_DB or data/job_queue.sqlite3)
+            stage_limits: {stage: max leased jobs} (defaults, then PHASE0_STAGE_LIMITS)
+            lease_seconds: {stage: visibility timeout}
+            max_attempts: Attempts per stage before a job is marked failed
+            extract_backlog: Jobs at extract before ingest pauses
+                (defaults to PHASE0_EXTRACT_BACKLOG, 32)
+        """
+        self.db_path = Path(db_path or os.environ.get("PHASE0_QUEUE_DB") or DEFAULT_DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.stage_limits = dict(DEFAULT_STAGE_LIMITS)
+        self.stage_limits.update(_parse_limits(os.environ.get("PHASE0_STAGE_LIMITS")))
+        self.stage_limits.update(stage_limits or {})
+        self.lease_seconds = {**LEASE_SECONDS, **(lease_seconds or {})}
+        self.max_attempts = max_attempts
+        self.extract_backlog = extract_backlog or int(
+            os.environ.get("PHASE0_EXTRACT_BACKLOG", DEFAULT_EXTRACT_BACKLOG))
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._conn.executescript(QUEUE_SCHEMA)
+
+    def _transaction(self, func):
+        """Run func() in a write transaction (BEGIN IMMEDIATE serializes writers across processes)"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func()
+                self._conn.execute("COMMIT")
+                return result
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def enqueue(self, file_path, payload=None):
+        """
+        Add a file at the ingest stage
+
+        Returns:
+            int: Job id, or None if the file already has an open job
+        """
+        now = time.time()
+        path = str(Path(file_path).resolve())
+
+        def insert():
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (file_path, stage, state, payload, available_at, created_at, updated_at) "
+                "VALUES (?, ?, 'ready', ?, ?, ?, ?)",
+                (path, STAGES[0], json.dumps(payload or {}), now, now, now)
+            )
+            return cursor.lastrowid if cursor.rowcount == 1 else None
+        return self._transaction(insert)
+
+    def claim(self, stage, owner):
+        """
+        Lease the next available job at a stage
+
+        Returns None when nothing is ready, the stage is at its limit, or
+        (for ingest) the extract backlog is full.
+
+        Args:
+            stage: Stage name
+            owner: Unique worker id (only the owner can complete the job)
+
+        Returns:
+            Job or None
+        """
+        now = time.time()
+
+        def lease():
+            leased = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE stage = ? AND state = 'leased' AND lease_expires >= ?",
+                (stage, now)
+            ).fetchone()[0]
+            if leased >= self.stage_limits[stage]:
+                return None
+            if stage == "ingest" and self._open_count("extract") >= self.extract_backlog:
+                return None
+
+            while True:
+                # Ready jobs, and leased jobs whose worker stopped renewing (visibility timeout)
+                row = self._conn.execute(
+                    "SELECT id, file_path, payload, attempts, state FROM jobs "
+                    "WHERE stage = ? AND ((state = 'ready' AND available_at <= ?) "
+                    "OR (state = 'leased' AND lease_expires < ?)) "
+                    "ORDER BY available_at, id LIMIT 1",
+                    (stage, now, now)
+                ).fetchone()
+                if row is None:
+                    return None
+                job_id, file_path, payload, attempts, state = row
+                if state == "leased" and attempts >= self.max_attempts:
+                    # Worker died on the last attempt
+                    self._conn.execute(
+                        "UPDATE jobs SET state = 'failed', lease_owner = NULL, lease_expires = NULL, "
+                        "last_error = ?, updated_at = ? WHERE id = ?",
+                        (f"lease expired on attempt {attempts}", now, job_id)
+                    )
+                    continue
+
+                self._conn.execute(
+                    "UPDATE jobs SET state = 'leased', lease_owner = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (owner, now + self.lease_seconds[stage], now, job_id)
+                )
+                return Job(job_id, file_path, stage, json.loads(payload), attempts + 1, owner)
+        return self._transaction(lease)
+
+    def _open_count(self, stage):
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE stage = ? AND state IN ('ready', 'leased')", (stage,)
+        ).fetchone()[0]
+
+    def extend(self, job):
+        """Renew a job's lease; False if the lease was lost"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+                (now + self.lease_seconds[job.stage], now, job.id, job.owner)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job, payload=None, finished=False):
+        """
+        Move a leased job to its next stage (or done)
+
+        Args:
+            job: Job from claim()
+            payload: Stage output carried to the next stage (replaces the old payload)
+            finished: End the job here even if stages remain
+
+        Returns:
+            bool: False if the lease was lost (another worker owns the job now)
+        """
+        now = time.time()
+        position = STAGES.index(job.stage)
+        done = finished or position == len(STAGES) - 1
+        next_stage = job.stage if done else STAGES[position + 1]
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET stage = ?, state = ?, payload = ?, attempts = 0, available_at = ?, "
+                "lease_owner = NULL, lease_expires = NULL, last_error = NULL, updated_at = ? "
+                "WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+                (next_stage, "done" if done else "ready", json.dumps(payload or {}, default=str),
+                 now, now, job.id, job.owner)
+            )
+            return cursor.rowcount == 1
+
+    def backoff(self, attempts):
+        """Retry delay after a failed attempt: exponential, capped, with jitter"""
+        delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def fail(self, job, error, retry=True):
+        """
+        Record a failed attempt: retry later, or mark failed after the last attempt
+
+        Returns:
+            str: "retry", "failed", or None if the lease was lost
+        """
+        now = time.time()
+        failed = not retry or job.attempts >= self.max_attempts
+        available_at = now if failed else now + self.backoff(job.attempts)
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = ?, available_at = ?, lease_owner = NULL, lease_expires = NULL, "
+                "last_error = ?, updated_at = ? WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+                ("failed" if failed else "ready", available_at, str(error), now, job.id, job.owner)
+            )
+            if cursor.rowcount != 1:
+                return None
+        return "failed" if failed else "retry"
+
+    def retry_failed(self):
+        """Requeue every failed job at the stage it failed in; returns the count"""
+        now = time.time()
+        return self._transaction(lambda: self._conn.execute(
+            "UPDATE jobs SET state = 'ready', attempts = 0, available_at = ?, updated_at = ? "
+            "WHERE state = 'failed' AND NOT EXISTS "
+            "(SELECT 1 FROM jobs AS other WHERE other.file_path = jobs.file_path "
+            "AND other.state IN ('ready', 'leased'))",
+            (now, now)
+        ).rowcount)
+
+    def pending(self):
+        """Jobs not yet done or failed"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state IN ('ready', 'leased')"
+            ).fetchone()[0]
+
+    def stats(self):
+        """
+        Queue depth per stage and state
+
+        Returns:
+            dict: {"stages": {stage: {state: count}}, "done", "failed", "pending",
+                   "oldest_ready_seconds", "limits", "extract_backlog"}
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, state, COUNT(*) FROM jobs GROUP BY stage, state"
+            ).fetchall()
+            oldest = self._conn.execute(
+                "SELECT MIN(available_at) FROM jobs WHERE state = 'ready' AND available_at <= ?", (now,)
+            ).fetchone()[0]
+
+        stages = {stage: {"ready": 0, "leased": 0} for stage in STAGES}
+        totals = {"done": 0, "failed": 0}
+        for stage, state, count in rows:
+            if state in totals:
+                totals[state] += count
+            stages.setdefault(stage, {})[state] = count
+        return {
+            "stages": stages,
+            "done": totals["done"],
+            "failed": totals["failed"],
+            "pending": sum(counts.get("ready", 0) + counts.get("leased", 0) for counts in stages.values()),
+            "oldest_ready_seconds": now - oldest if oldest else 0.0,
+            "limits": dict(self.stage_limits),
+            "extract_backlog": self.extract_backlog
+        }
+
+    def failed_jobs(self, limit=50):
+        """Most recent failed jobs: (file_path, stage, attempts, last_error)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT file_path, stage, attempts, last_error FROM jobs WHERE state = 'failed' "
+                "ORDER BY updated_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class QueueWorkers:
+    """Worker threads per stage, plus a lease keeper that renews running jobs"""
+
+    def __init__(self, queue, handlers, workers=None, on_failed=None, poll_interval=0.5):
+        """
+        Args:
+            queue: JobQueue
+            handlers: {stage: handler(job) -> payload}; a handler may set
+                payload["finished"] = True to end the job early, and raises
+                to fail the attempt (PermanentError: no retries)
+            workers: {stage: threads} (default: the stage's limit)
+            on_failed: Optional callback(job, error) once a job is marked failed
+            poll_interval: Seconds to wait when a stage has nothing to claim
+        """
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = {stage: (workers or {}).get(stage, queue.stage_limits[stage]) for stage in STAGES}
+        self.on_failed = on_failed
+        self.poll_interval = poll_interval
+
+        self._stop = threading.Event()
+        self._threads = []
+        self._active = {}
+        # Guards _active and the processed/failures counters (shared by all worker threads)
+        self._active_lock = threading.Lock()
+        self.processed = 0
+        self.failures = 0
+
+    def start(self):
+        """Start worker threads and the lease keeper"""
+        owner_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for stage in STAGES:
+            for number in range(self.workers[stage]):
+                owner = f"{owner_prefix}:{stage}-{number}"
+                thread = threading.Thread(target=self._work, args=(stage, owner), name=owner, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+        keeper = threading.Thread(target=self._keep_leases, name="lease-keeper", daemon=True)
+        keeper.start()
+        self._threads.append(keeper)
+        return self
+
+    def stop(self, wait=True):
+        """Stop claiming jobs; running handlers finish first when wait is set"""
+        self._stop.set()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def run_until_idle(self, timeout=None, idle_seconds=None):
+        """
+        Block until no jobs are pending (or timeout)
+
+        Returns:
+            bool: True if the queue drained
+        """
+        idle_seconds = self.poll_interval * 2 if idle_seconds is None else idle_seconds
+        deadline = time.time() + timeout if timeout else None
+        idle_since = None
+        while deadline is None or time.time() < deadline:
+            if self.queue.pending() == 0:
+                idle_since = idle_since or time.time()
+                if time.time() - idle_since >= idle_seconds:
+                    return True
+            else:
+                idle_since = None
+            time.sleep(min(self.poll_interval, 0.5))
+        return False
+
+    def _work(self, stage, owner):
+        handler = self.handlers[stage]
+        while not self._stop.is_set():
+            job = self.queue.claim(stage, owner)
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+
+            with self._active_lock:
+                self._active[job.id] = job
+            try:
+                with log_context(file=Path(job.file_path).name, stage=job.stage, job_id=job.id):
+                    payload = handler(job) or {}
+                if self.queue.complete(job, payload, finished=payload.get("finished", False)):
+                    with self._active_lock:
+                        self.processed += 1
+                else:
+                    # Lease expired and another worker took the job: this run's output is dropped
+                    with self._active_lock:
+                        self.failures += 1
+                    print(f"[!] {job} finished after its lease was lost; output dropped")
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                outcome = self.queue.fail(job, error, retry=not isinstance(e, PermanentError))
+                with self._active_lock:
+                    self.failures += 1
+                print(f"[!] {job} failed ({outcome or 'lease lost'}): {error}")
+                if outcome == "failed" and self.on_failed is not None:
+                    try:
+                        self.on_failed(job, error)
+                    except Exception as callback_error:
+                        print(f"[!] Failure handler error for {job}: {callback_error}")
+            finally:
+                with self._active_lock:
+                    self._active.pop(job.id, None)
+
+    def _keep_leases(self):
+        interval = min(self.queue.lease_seconds.values()) / 3
+        while not self._stop.wait(interval):
+            with self._active_lock:
+                jobs = list(self._active.values())
+            for job in jobs:
+                self.queue.extend(job)
+
+
+class Phase0Stages:
+    """Stage handlers that run the Phase 0 workflow steps on queued files"""
+
+    def __init__(self, workflow=None, settle_seconds=0.5):
+        """
+        Args:
+            workflow: TicketWorkflow (created if omitted); its OCR engine,
+                folders and checkpoints are used by every stage
+            settle_seconds: A file's size must hold this long before ingest
+        """
+        if workflow is None:
+            from workflow import TicketWorkflow
+            workflow = TicketWorkflow()
+        self.workflow = workflow
+        self.settle_seconds = settle_seconds
+        self._store = None
+
+    def handlers(self):
+        return {"ingest": self.ingest, "extract": self.extract, "parse": self.parse, "artifacts": self.artifacts}
+
+    def _checkpoint(self, file_path, input_hash):
+        if not self.workflow.checkpoints:
+            return None
+        if self._store is None:
+            from ticket_checkpoint import CheckpointStore
+            self._store = CheckpointStore(self.workflow.checkpoint_dir)
+        return self._store.open(file_path, input_hash)
+
+    def ingest(self, job):
+        """Wait for a complete file, hash it, finish early if already processed"""
+        from workflow import DOCUMENT_EXTENSIONS, AUDIO_VIDEO_EXTENSIONS
+        from ocr_cache import hash_file
+
+        file_path = Path(job.file_path)
+        if file_path.suffix.lower() not in DOCUMENT_EXTENSIONS + AUDIO_VIDEO_EXTENSIONS:
+            raise PermanentError(f"Unsupported file type: {file_path.suffix}")
+        size = file_path.stat().st_size
+        time.sleep(self.settle_seconds)
+        if size == 0 or file_path.stat().st_size != size:
+            raise RuntimeError("File still being written")
+
+        input_hash = hash_file(file_path)
+        checkpoint = self._checkpoint(file_path, input_hash)
+        if checkpoint is not None:
+            result = checkpoint.result
+            if result is not None and Path(result["metadata_file"]).exists():
+                self.workflow._log(f"[*] Unchanged input already processed: {file_path.name}")
+                return {"input_hash": input_hash, "result": result, "finished": True}
+            extracted = checkpoint.stage("extract")
+            if extracted is not None:
+                return {"input_hash": input_hash, "extracted": extracted}
+        return {"input_hash": input_hash}
+
+    def extract(self, job):
+        """OCR for documents, Gemini for audio/video"""
+        import asyncio
+        from workflow import DOCUMENT_EXTENSIONS
+        from metadata_parser import required_fields_found
+
+        payload = dict(job.payload)
+        if "extracted" in payload:
+            return payload
+
+        file_path = Path(job.file_path)
+        if file_path.suffix.lower() in DOCUMENT_EXTENSIONS:
+            stop_when = required_fields_found if self.workflow.early_exit else None
+            ocr_result = self.workflow._extract_document_text(file_path, stop_when=stop_when)
+            if not ocr_result.get("success"):
+                raise RuntimeError(f"OCR extraction failed: {ocr_result.get('error', 'Unknown error')}")
+            # Layout objects stay behind; parse needs only text, confidence and metadata
+            payload["ocr_result"] = {key: ocr_result.get(key) for key in ("text", "confidence", "metadata")}
+        else:
+            metadata = asyncio.run(self.workflow._extract_media_metadata(file_path))
+            if not isinstance(metadata, dict):
+                raise RuntimeError(f"Invalid metadata format: {type(metadata)}")
+            confidence = metadata.get("confidence", metadata.get("analysis_confidence", 0.0))
+            metadata["extraction_method"] = "gemini"
+            payload["extracted"] = {"metadata": metadata, "confidence": confidence, "extraction_method": "gemini"}
+        return payload
+
+    def parse(self, job):
+        """Ticket metadata from OCR text; checkpointed so later failures keep the OCR work"""
+        payload = dict(job.payload)
+        ocr_result = payload.pop("ocr_result", None)
+        if ocr_result is not None:
+            metadata, confidence, extraction_method = self.workflow._document_metadata(ocr_result)
+            metadata["extraction_method"] = extraction_method
+            payload["extracted"] = {"metadata": metadata, "confidence": confidence,
+                                    "extraction_method": extraction_method}
+
+        checkpoint = self._checkpoint(job.file_path, payload["input_hash"])
+        if checkpoint is not None and checkpoint.stage("extract") is None:
+            checkpoint.complete("extract", payload["extracted"])
+        return payload
+
+    def artifacts(self, job):
+        """Write the processing folder"""
+        extracted = job.payload["extracted"]
+        result = self.workflow._write_artifacts(Path(job.file_path), extracted["metadata"],
+                                                extracted["confidence"], extracted["extraction_method"])
+        checkpoint = self._checkpoint(job.file_path, job.payload["input_hash"])
+        if checkpoint is not None:
+            checkpoint.complete("artifacts", {"result": result})
+        return {"input_hash": job.payload["input_hash"], "result": result}
+
+    def on_failed(self, job, error):
+        """Dead letter: copy the file to incoming/failed with an error report"""
+        file_path = Path(job.file_path)
+        if file_path.exists():
+            self.workflow._write_failure(file_path, f"{job.stage}: {error}")
+
+
+def _print_status(queue):
+    stats = queue.stats()
+    print(f"Queue: {queue.db_path}")
+    print(f"{'Stage':12s} {'ready':>7s} {'leased':>7s} {'limit':>6s}")
+    for stage in STAGES:
+        counts = stats["stages"][stage]
+        print(f"{stage:12s} {counts.get('ready', 0):7d} {counts.get('leased', 0):7d} {stats['limits'][stage]:6d}")
+    print(f"\nPending: {stats['pending']}  Done: {stats['done']}  Failed: {stats['failed']}  "
+          f"Oldest ready: {stats['oldest_ready_seconds']:.0f}s")
+    if stats["failed"]:
+        print("\nRecent failures:")
+        for file_path, stage, attempts, error in queue.failed_jobs(10):
+            print(f"  {Path(file_path).name} [{stage}, {attempts} attempts]: {error}")
+
+
+def main():
+    """CLI entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Durable Phase 0 job queue")
+    parser.add_argument("--db", help="Queue database (default: PHASE0_QUEUE_DB or data/job_queue.sqlite3)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = subparsers.add_parser("enqueue", help="Queue files (directories: every file inside)")
+    enqueue.add_argument("paths", nargs="+")
+
+    run = subparsers.add_parser("run", help="Process queued jobs")
+    run.add_argument("--workers", type=int, help="Threads per stage (default: each stage's limit)")
+    run.add_argument("--drain", action="store_true", help="Exit once the queue is empty")
+
+    status = subparsers.add_parser("status", help="Queue depth per stage")
+    status.add_argument("--json", action="store_true", help="Print stats as JSON")
+
+    subparsers.add_parser("retry-failed", help="Requeue failed jobs")
+
+    args = parser.parse_args()
+    queue = JobQueue(args.db)
+
+    if args.command == "enqueue":
+        added = 0
+        for path in map(Path, args.paths):
+            files = sorted(p for p in path.iterdir() if p.is_file()) if path.is_dir() else [path]
+            added += sum(1 for file in files if queue.enqueue(file) is not None)
+        print(f"[+] Queued {added} new jobs ({queue.pending()} pending)")
+
+    elif args.command == "status":
+        if args.json:
+            print(json.dumps(queue.stats(), indent=2))
+        else:
+            _print_status(queue)
+
+    elif args.command == "retry-failed":
+        print(f"[+] Requeued {queue.retry_failed()} failed jobs")
+
+    elif args.command == "run":
+        stages = Phase0Stages()
+        workers = {stage: args.workers for stage in STAGES} if args.workers else None
+        pool = QueueWorkers(queue, stages.handlers(), workers=workers, on_failed=stages.on_failed).start()
+        print(f"[+] Queue workers running ({', '.join(f'{s}={n}' for s, n in pool.workers.items())})")
+        try:
+            if args.drain:
+                pool.run_until_idle()
+            else:
+                while True:
+                    time.sleep(1)
+        except KeyboardInterrupt:
+            print("[*] Stopping workers (finishing running jobs)...")
+        finally:
+            pool.stop()
+            import asyncio
+            asyncio.run(stages.workflow.close())
+        print(f"[+] Processed {pool.processed} stage runs, {pool.failures} failed attempts")
+
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()
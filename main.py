@@ -33,7 +33,7 @@ def analyze_file(file_path):
     print(f"[*] File type: {ext}")
 
     # Determine routing
-    if ext in ['.pdf', '.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.gif']:
+    if ext in ['.pdf', '.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.gif']:
         print(f"[*] Document/Image file detected")
         print(f"[*] Routing to: PaddleOCR (PRIMARY)")
         analyzer_type = "document"
@@ -47,7 +47,7 @@ def analyze_file(file_path):
             "status": "error",
             "message": f"Unsupported file type: {ext}",
             "supported_types": {
-                "documents": [".pdf", ".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".gif"],
+                "documents": [".pdf", ".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".gif"],
                 "audio_video": [".mp3", ".wav", ".m4a", ".mp4", ".mov", ".avi", ".webm"]
             }
         }
@@ -0,0 +1,359 @@
+"""
+Ticket Metadata Parser
+Extracts EDI ticket fields (ticket #, company, trading partner, ...) from OCR text
+
+Shared by the Phase 0 workflow and the OCR service (for header-first early exit).
+Standard library only.
+
+All field keywords are compiled into one literal alternation and the text
+is read in a single pass; at each keyword hit the rule's precompiled value
+pattern is tried in place. The scan resumes one character after each hit,
+so hits can overlap exactly as separate re.search calls would. Precedence
+is unchanged: within a field the earlier rule in the list wins, and for
+one rule the first occurrence wins.
+"""
+
+import re
+
+# Fields Phase 0 needs before OCR can stop early, with their "not found" values
+REQUIRED_FIELDS = {
+    "ticket_id": "UNKNOWN",
+    "company": "Unknown",
+    "trading_partner": "Unknown",
+    "transaction_type": "Unknown",
+}
+
+# (field, keywords, value pattern matched right after the keyword, capturing <v>)
+# Keywords are lowercase literals; order within a field is precedence order
+FIELD_RULES = [
+    ("ticket_id", ("#",), r'(?P<v>\d{7,8})'),
+    ("ticket_id", ("ticket",), r'[:\s#]+(?P<v>\d{7,8})'),
+    ("ticket_id", ("case",), r'[:\s#]+(?P<v>\d{7,8})'),
+    ("customer_name", ("customer",), r'[:\s]+(?P<v>[^\n]+)'),
+    ("customer_name", ("from",), r'[:\s]+(?P<v>[^\n]+)'),
+    ("customer_name", ("requester",), r'[:\s]+(?P<v>[^\n]+)'),
+    ("company", ("company",), r'[:\s]+(?P<v>[^\n]+)'),
+    ("company", ("organization",), r'[:\s]+(?P<v>[^\n]+)'),
+    ("trading_partner", ("trading partner",), r'[:\s]+(?P<v>[^\n]+)'),
+    ("trading_partner", ("partner",), r'[:\s]+(?P<v>[^\n]+)'),
+    ("trading_partner", ("vendor",), r'[:\s]+(?P<v>[^\n]+)'),
+    ("transaction_type", ("850", "810", "856", "997", "940", "945", "947", "204", "210", "214", "990"),
+     r'\s*(?P<v>po|invoice|asn|fa|warehouse|shipment|status|carrier|freight)?'),
+    ("transaction_type", ("transaction",), r'[:\s]+(?P<v>\d{3})'),
+    ("severity_high", ("urgent", "critical", "emergency", "down"), r'\b'),
+    ("severity_medium", ("important", "priority", "asap"), r'\b'),
+    ("issue_title", ("error",), r'(?P<v>[:\s]+[^\n]+)'),
+    ("issue_title", ("issue",), r'(?P<v>[:\s]+[^\n]+)'),
+    ("issue_title", ("problem",), r'(?P<v>[:\s]+[^\n]+)'),
+    ("issue_title", ("subject",), r'(?P<v>[:\s]+[^\n]+)'),
+]
+
+# Fields whose keywords must also start at a word boundary (\b...\b)
+_WHOLE_WORD_FIELDS = ("severity_high", "severity_medium")
+
+# re.IGNORECASE disables the regex engine's fast literal search, so the text
+# is case-folded once instead. The table maps every character that
+# IGNORECASE treats as an ASCII letter (including KELVIN SIGN, LONG S and the
+# Turkish i's) and keeps offsets, so values are still cut from the original.
+_CASE_FOLD = str.maketrans({**{chr(c): chr(c + 32) for c in range(ord("A"), ord("Z") + 1)},
+                            "\u0130": "i", "\u0131": "i", "\u212a": "k", "\u017f": "s"})
+
+_KEYWORD_RULE = {keyword: i for i, (_, keywords, _) in enumerate(FIELD_RULES) for keyword in keywords}
+_KEYWORDS = re.compile("|".join(re.escape(keyword) for keyword in sorted(_KEYWORD_RULE, key=len, reverse=True)))
+_VALUES = [re.compile(value) for _, _, value in FIELD_RULES]
+
+# Rule precedence within its field (0 = highest)
+_RULE_PRIORITY = [
+    sum(1 for other in FIELD_RULES[:i] if other[0] == field)
+    for i, (field, _, _) in enumerate(FIELD_RULES)
+]
+
+# Characters a value pattern can skip before reaching its value ([:\s#]+)
+_SKIPPABLE = ":#"
+
+
+def _default_metadata():
+    return {
+        "ticket_id": "UNKNOWN",
+        "customer_name": "Unknown",
+        "company": "Unknown",
+        "trading_partner": "Unknown",
+        "transaction_type": "Unknown",
+        "message_id": "N/A",
+        "severity": "NORMAL",
+        "issue_title": "Issue extracted from OCR",
+        "root_cause": "Pending investigation",
+        "recommended_actions": []
+    }
+
+
+class MetadataScanner:
+    """
+    Single-pass, incremental ticket metadata extraction
+
+    Feed text page by page; metadata() can be read at any point and equals
+    parse_metadata_from_text() of everything fed so far. Only the last
+    unsettled lines (whose values could still change with more text) are
+    kept and rescanned, so total work stays linear in the text length.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._offset = 0        # Position of _buffer[0] in the full text
+        self._resume = 0        # Full-text position where the next scan starts
+        self._best = {}         # field -> (priority, value)
+
+    def feed(self, text):
+        """Add text (e.g. one OCR page, including any page separator)"""
+        self._buffer += text
+        settled = self._settled_end()
+        start = self._resume - self._offset
+        if settled > start:
+            self._scan(self._best, start, settled)
+            self._resume = self._offset + settled
+            # Keep one character before the resume point for \b
+            keep = max(0, settled - 1)
+            self._buffer = self._buffer[keep:]
+            self._offset += keep
+        return self
+
+    def metadata(self):
+        """Metadata dict for all text fed so far"""
+        best = dict(self._best)
+        self._scan(best, self._resume - self._offset, len(self._buffer))
+
+        metadata = _default_metadata()
+        for field in ("ticket_id", "customer_name", "company", "trading_partner",
+                      "transaction_type", "issue_title"):
+            if field in best:
+                metadata[field] = best[field][1]
+        if "severity_high" in best:
+            metadata["severity"] = "HIGH"
+        elif "severity_medium" in best:
+            metadata["severity"] = "MEDIUM"
+        return metadata
+
+    def missing_required(self):
+        """Required fields not found yet"""
+        return missing_required_fields(self.metadata())
+
+    def _settled_end(self):
+        """
+        Buffer index before which every match is final
+
+        A value can run on from the last line (it may be incomplete) or from
+        the line before it when only whitespace, ':' or '#' separate them, so
+        both stay unsettled.
+        """
+        end = self._last_content(len(self._buffer))
+        if end == 0:
+            return 0
+        last_line = self._buffer.rfind("\n", 0, end) + 1
+        previous_end = self._last_content(last_line)
+        if previous_end == 0:
+            return 0
+        return self._buffer.rfind("\n", 0, previous_end) + 1
+
+    def _last_content(self, end):
+        """Index after the last character a lookahead cannot skip, before end"""
+        buffer = self._buffer
+        while end > 0 and (buffer[end - 1].isspace() or buffer[end - 1] in _SKIPPABLE):
+            end -= 1
+        return end
+
+    def _scan(self, best, start, end):
+        """Record matches whose keyword starts in buffer[start:end] into best"""
+        buffer = self._buffer
+        text = buffer.translate(_CASE_FOLD)
+        search = _KEYWORDS.search
+        match = search(text, start)
+        while match is not None and match.start() < end:
+            rule = _KEYWORD_RULE[match.group()]
+            field = FIELD_RULES[rule][0]
+            priority = _RULE_PRIORITY[rule]
+            current = best.get(field)
+            if current is None or current[0] > priority:
+                value = _VALUES[rule].match(text, match.end())
+                if value is not None and (field not in _WHOLE_WORD_FIELDS or _word_start(text, match.start())):
+                    best[field] = (priority, self._value(buffer, field, rule, match, value))
+            match = search(text, match.start() + 1)
+
+    @staticmethod
+    def _value(buffer, field, rule, keyword_match, value_match):
+        """Field value cut from the original (not case-folded) text"""
+        keyword = buffer[keyword_match.start():keyword_match.end()]
+        value = None
+        if "v" in value_match.re.groupindex and value_match.start("v") >= 0:
+            value = buffer[value_match.start("v"):value_match.end("v")]
+        if field == "transaction_type":
+            if _RULE_PRIORITY[rule] == 0:
+                return f"{keyword} {value or ''}".strip()
+            return value
+        if field == "issue_title":
+            return (keyword + value).strip()
+        if field.startswith("severity"):
+            return True
+        return value.strip()
+
+
+def _word_start(text, index):
+    """True if a word starts at text[index] (as re's \\b: no word character before it)"""
+    return index == 0 or not (text[index - 1].isalnum() or text[index - 1] == "_")
+
+
+def parse_metadata_from_text(text):
+    """
+    Parse ticket metadata from OCR-extracted text
+
+    Looks for patterns like:
+    - Ticket #XXXXXXX
+    - Customer: Name
+    - Company: Name
+    - Trading Partner: Name
+    - etc.
+    """
+    return MetadataScanner().feed(text).metadata()
+
+
+def _parse_metadata_regex(text):
+    """
+    Reference implementation: one re.search per pattern, field group by field group
+    Kept for equivalence tests and benchmarks; use parse_metadata_from_text
+
+    Looks for patterns like:
+    - Ticket #XXXXXXX
+    - Customer: Name
+    - Company: Name
+    - Trading Partner: Name
+    - etc.
+    """
+    metadata = {
+        "ticket_id": "UNKNOWN",
+        "customer_name": "Unknown",
+        "company": "Unknown",
+        "trading_partner": "Unknown",
+        "transaction_type": "Unknown",
+        "message_id": "N/A",
+        "severity": "NORMAL",
+        "issue_title": "Issue extracted from OCR",
+        "root_cause": "Pending investigation",
+        "recommended_actions": []
+    }
+
+    # Extract ticket number (#XXXXXXX or Ticket: XXXXXXX)
+    ticket_patterns = [
+        r'#(\d{7,8})',
+        r'Ticket[:\s#]+(\d{7,8})',
+        r'Case[:\s#]+(\d{7,8})',
+    ]
+    for pattern in ticket_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            metadata["ticket_id"] = match.group(1)
+            break
+
+    # Extract customer/company name
+    customer_patterns = [
+        r'Customer[:\s]+([^\n]+)',
+        r'From[:\s]+([^\n]+)',
+        r'Requester[:\s]+([^\n]+)',
+    ]
+    for pattern in customer_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            metadata["customer_name"] = match.group(1).strip()
+            break
+
+    # Extract company
+    company_patterns = [
+        r'Company[:\s]+([^\n]+)',
+        r'Organization[:\s]+([^\n]+)',
+    ]
+    for pattern in company_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            metadata["company"] = match.group(1).strip()
+            break
+
+    # Extract trading partner
+    partner_patterns = [
+        r'Trading Partner[:\s]+([^\n]+)',
+        r'Partner[:\s]+([^\n]+)',
+        r'Vendor[:\s]+([^\n]+)',
+    ]
+    for pattern in partner_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            metadata["trading_partner"] = match.group(1).strip()
+            break
+
+    # Extract transaction type (850, 810, 856, etc.)
+    transaction_patterns = [
+        r'(850|810|856|997|940|945|947|204|210|214|990)\s*(PO|Invoice|ASN|FA|Warehouse|Shipment|Status|Carrier|Freight)?',
+        r'Transaction[:\s]+(\d{3})',
+    ]
+    for pattern in transaction_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            trans_code = match.group(1)
+            trans_type = match.group(2) if match.lastindex > 1 else ""
+            metadata["transaction_type"] = f"{trans_code} {trans_type}".strip()
+            break
+
+    # Extract severity keywords
+    if re.search(r'\b(urgent|critical|emergency|down)\b', text, re.IGNORECASE):
+        metadata["severity"] = "HIGH"
+    elif re.search(r'\b(important|priority|asap)\b', text, re.IGNORECASE):
+        metadata["severity"] = "MEDIUM"
+
+    # Extract issue title (first line with "error", "issue", "problem", etc.)
+    issue_patterns = [
+        r'(Error[:\s]+[^\n]+)',
+        r'(Issue[:\s]+[^\n]+)',
+        r'(Problem[:\s]+[^\n]+)',
+        r'(Subject[:\s]+[^\n]+)',
+    ]
+    for pattern in issue_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            metadata["issue_title"] = match.group(1).strip()
+            break
+
+    return metadata
+
+
+def missing_required_fields(metadata):
+    """Required fields still at their default value"""
+    return [field for field, default in REQUIRED_FIELDS.items() if metadata.get(field, default) == default]
+
+
+def required_fields_found(text):
+    """
+    Early-exit predicate for OCR: True once the text so far yields every required field
+    Module-level so it can be pickled and sent to the OCR service
+    """
+    return not missing_required_fields(parse_metadata_from_text(text))
+
+
+class RequiredFieldsCheck:
+    """
+    Page-by-page form of required_fields_found
+
+    Call with each page's text in order; True once the pages so far (joined
+    by blank lines, as OCR combines them) yield every required field. One
+    MetadataScanner is fed as pages arrive, so each page is scanned once.
+    """
+
+    def __init__(self):
+        self._scanner = MetadataScanner()
+        self._pages = 0
+
+    def __call__(self, page_text):
+        self._scanner.feed("\n\n" + page_text if self._pages else page_text)
+        self._pages += 1
+        return not self._scanner.missing_required()
+
+
+# OCR asks stop_when for a per-page check through this attribute (see
+# OCRProcessor.extract_text); it survives pickling to the OCR service
+required_fields_found.incremental = RequiredFieldsCheck
@@ -0,0 +1,585 @@
+"""
+Content-Addressed OCR Result Cache
+Stores finished OCR results keyed by input bytes + OCR settings
+
+Entries are gzip-compressed JSON files under data/ocr_cache/results/.
+A SQLite manifest tracks every entry's size and last access, so stats
+are O(1) reads of a running total and LRU/TTL eviction never has to walk
+the directory. The manifest is shared by every process using the same
+cache (WAL mode), and can also track other cache files (debug images).
+Lookups only read: their hit/miss counts and access order are buffered
+and written in batches, so other processes' stats lag by a few seconds.
+
+Configuration (environment):
+    OCR_RESULT_CACHE_MB        Byte budget (default: 256)
+    OCR_RESULT_CACHE_TTL_DAYS  Drop entries unused for this long (default: 30, 0 = never)
+    OCR_CACHE_EVICT_INTERVAL   Seconds between background eviction passes (default: 300)
+"""
+
+import os
+import gzip
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+
+DEFAULT_MAX_MB = 256
+DEFAULT_TTL_DAYS = 30
+DEFAULT_EVICT_INTERVAL = 300
+MANIFEST_NAME = "manifest.sqlite3"
+
+# Temp files older than this are leftovers from a crashed writer
+STALE_TMP_SECONDS = 3600
+
+# Lookups (hit/miss counts, access order) are written in batches: after this
+# many, after this many seconds, or with the next write transaction
+TOUCH_BATCH = 256
+TOUCH_FLUSH_SECONDS = 5
+
+MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    access_seq INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_lru ON entries (access_seq);
+CREATE INDEX IF NOT EXISTS idx_entries_access ON entries (last_access);
+
+-- Running totals per kind, maintained by triggers (stats never scan entries)
+CREATE TABLE IF NOT EXISTS totals (
+    kind TEXT PRIMARY KEY,
+    entries INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS counters (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0,
+    seq INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO counters (id) VALUES (1);
+
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    INSERT INTO totals (kind) SELECT NEW.kind
+        WHERE NOT EXISTS (SELECT 1 FROM totals WHERE kind = NEW.kind);
+    UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.size WHERE kind = NEW.kind;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size WHERE kind = OLD.kind;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size, kind ON entries BEGIN
+    UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size WHERE kind = OLD.kind;
+    INSERT INTO totals (kind) SELECT NEW.kind
+        WHERE NOT EXISTS (SELECT 1 FROM totals WHERE kind = NEW.kind);
+    UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.size WHERE kind = NEW.kind;
+END;
+"""
+
+
+def hash_file(file_path, chunk_size=1024 * 1024):
+    """SHA-256 of a file's bytes (streamed, constant memory)"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_cache_key(content_hash, settings):
+    """Combine a content hash with the settings that affect OCR output"""
+    settings_blob = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha256(f"{content_hash}:{settings_blob}".encode("utf-8")).hexdigest()
+
+
+def remove_entry_file(path, mtime_ns):
+    """Unlink a cache file if it is still the version the manifest recorded"""
+    try:
+        if path.stat().st_mtime_ns != mtime_ns:
+            return False  # Rewritten since it was recorded
+        path.unlink()
+        return True
+    except OSError:
+        return False
+
+
+def read_manifest_totals(manifest_path):
+    """
+    Entry count and bytes straight from a manifest file (for status tools)
+
+    Returns:
+        dict or None if there is no manifest yet
+    """
+    manifest_path = Path(manifest_path)
+    if not manifest_path.exists():
+        return None
+    conn = sqlite3.connect(str(manifest_path), timeout=5)
+    try:
+        entries, total_bytes = conn.execute(
+            "SELECT COALESCE(SUM(entries), 0), COALESCE(SUM(bytes), 0) FROM totals"
+        ).fetchone()
+        hits, misses = conn.execute("SELECT hits, misses FROM counters WHERE id = 1").fetchone()
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+    lookups = hits + misses
+    return {
+        "entries": entries,
+        "total_size_mb": total_bytes / (1024 * 1024),
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / lookups if lookups else 0.0
+    }
+
+
+class CacheManifest:
+    """SQLite index of cache files: size, kind and last access per entry"""
+
+    def __init__(self, db_path):
+        """
+        Args:
+            db_path: Manifest file; entry paths are stored relative to its directory
+        """
+        self.db_path = Path(db_path)
+        self.root = self.db_path.parent
+        self.root.mkdir(exist_ok=True, parents=True)
+
+        self._lock = threading.Lock()
+        # (key, mtime_ns) of rows whose file is gone; deleted by the next write
+        self._stale = []
+        # Lookups not yet written: hit key -> access time (in access order), counts
+        self._pending_hits = {}
+        self._pending_counts = [0, 0]  # hits, misses
+        self._pending_since = None
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._conn.executescript(MANIFEST_SCHEMA)
+
+    def _relative(self, path):
+        return os.path.relpath(Path(path), self.root)
+
+    def resolve(self, relative_path):
+        """Absolute path of a manifest entry"""
+        return self.root / relative_path
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction (BEGIN IMMEDIATE) that also writes pending lookups and stale rows"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                stale = self._stale
+                if stale:
+                    # Only the version that went missing; a newer put() keeps its row
+                    self._conn.executemany("DELETE FROM entries WHERE key = ? AND mtime_ns = ?", stale)
+                self._write_lookups()
+                yield
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            if stale:
+                del self._stale[:len(stale)]
+            self._pending_hits = {}
+            self._pending_counts = [0, 0]
+            self._pending_since = None
+
+    def _write_lookups(self):
+        """Apply pending hit/miss counts and access order (inside a write transaction)"""
+        hits = self._pending_hits
+        hit_count, miss_count = self._pending_counts
+        if not hit_count and not miss_count:
+            return
+        self._conn.execute("UPDATE counters SET hits = hits + ?, misses = misses + ?, seq = seq + ? WHERE id = 1",
+                           (hit_count, miss_count, len(hits)))
+        last_seq = self._conn.execute("SELECT seq FROM counters WHERE id = 1").fetchone()[0]
+        first_seq = last_seq - len(hits) + 1
+        self._conn.executemany(
+            "UPDATE entries SET last_access = ?, access_seq = ? WHERE key = ?",
+            [(accessed, first_seq + i, key) for i, (key, accessed) in enumerate(hits.items())]
+        )
+
+    def _next_seq(self):
+        self._conn.execute("UPDATE counters SET seq = seq + 1 WHERE id = 1")
+        return self._conn.execute("SELECT seq FROM counters WHERE id = 1").fetchone()[0]
+
+    def record(self, key, path, kind="result", place=None):
+        """
+        Add or replace an entry for a file that was just written
+
+        Args:
+            place: Optional callable that moves the file into place. It runs
+                inside the write transaction, so an eviction pass (which
+                holds the same lock while unlinking) cannot run between the
+                file landing and its row being written.
+        """
+        now = time.time()
+        with self._transaction():
+            if place is not None:
+                place()
+            stat = Path(path).stat()
+            seq = self._next_seq()
+            self._conn.execute(
+                "INSERT INTO entries (key, path, kind, size, mtime_ns, created, last_access, access_seq) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET path = excluded.path, kind = excluded.kind, "
+                "size = excluded.size, mtime_ns = excluded.mtime_ns, "
+                "last_access = excluded.last_access, access_seq = excluded.access_seq",
+                (key, self._relative(path), kind, stat.st_size, stat.st_mtime_ns, now, now, seq)
+            )
+
+    def touch(self, key, hit=True):
+        """
+        Mark an entry as just used and count the lookup
+
+        Buffered, not written: a lookup takes no write lock, so readers in
+        other processes are not serialized behind it. Pending lookups are
+        written every TOUCH_BATCH lookups or TOUCH_FLUSH_SECONDS, and with
+        any other write (eviction sees this process's access order).
+        """
+        now = time.time()
+        with self._lock:
+            if hit:
+                # Re-insert so the dict stays in access order
+                self._pending_hits.pop(key, None)
+                self._pending_hits[key] = now
+            self._pending_counts[0 if hit else 1] += 1
+            if self._pending_since is None:
+                self._pending_since = now
+            due = (sum(self._pending_counts) >= TOUCH_BATCH
+                   or now - self._pending_since >= TOUCH_FLUSH_SECONDS)
+        if due:
+            self.flush()
+
+    def _has_pending(self):
+        return bool(self._stale or any(self._pending_counts))
+
+    def flush(self):
+        """Write pending lookups and stale-row deletes now"""
+        with self._transaction():
+            pass
+
+    def forget(self, key):
+        """
+        Drop an entry whose file is gone, with the next write transaction
+
+        Costs a read now (most misses have no row at all) and no write
+        transaction of its own.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT mtime_ns FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._stale.append((key, row[0]))
+
+    def totals(self, kind=None):
+        """
+        Entry count, bytes and lookup counters from the running totals
+        (one row per kind, so this is O(1) in the number of entries)
+        """
+        kind_filter, args = (" WHERE kind = ?", (kind,)) if kind else ("", ())
+        if self._has_pending():
+            self.flush()
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(entries), 0), COALESCE(SUM(bytes), 0) FROM totals" + kind_filter, args
+            ).fetchone()
+            hits, misses = self._conn.execute("SELECT hits, misses FROM counters WHERE id = 1").fetchone()
+        return {"entries": entries, "bytes": total_bytes, "hits": hits, "misses": misses}
+
+    def _remove_rows(self, rows, remove):
+        """
+        Delete rows (key, path, size, mtime_ns) whose file remove() deleted
+
+        A file remove() could not delete keeps its row so a later pass can
+        retry it: still tracked in the totals, never orphaned on disk. If the
+        file is gone anyway the row goes; if it was rewritten outside the
+        manifest the row takes its current size and mtime. Runs inside a
+        write transaction.
+
+        Returns:
+            list: The rows whose file remove() deleted
+        """
+        removed = []
+        for row in rows:
+            key, relative_path, _, mtime_ns = row
+            path = self.resolve(relative_path)
+            if remove(path, mtime_ns):
+                removed.append(row)
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                self._conn.execute("DELETE FROM entries WHERE key = ? AND mtime_ns = ?", (key, mtime_ns))
+                continue
+            except OSError:
+                continue
+            if stat.st_mtime_ns != mtime_ns:
+                self._conn.execute("UPDATE entries SET size = ?, mtime_ns = ? WHERE key = ?",
+                                   (stat.st_size, stat.st_mtime_ns, key))
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", [(row[0],) for row in removed])
+        return removed
+
+    def take_victims(self, max_bytes=None, expire_before=None, kind=None, remove=None):
+        """
+        Remove rows for expired and least-recently-used entries
+
+        Rows are deleted in the same transaction that picks them, so two
+        evictors never pick the same entry and stats update immediately.
+
+        Args:
+            remove: Optional callable(path, mtime_ns) -> bool that deletes a
+                victim's file. It runs inside the transaction, so no
+                record() can land a file for a victim while it is removed,
+                and only rows of files it deleted are dropped (see
+                _remove_rows). Without it every victim's row is dropped and
+                the caller deletes the files.
+
+        Returns:
+            list of (relative path, size, mtime_ns): every victim, or with
+            remove only those whose file it deleted
+        """
+        kind_filter = " AND kind = ?" if kind else ""
+        kind_args = (kind,) if kind else ()
+        victims = []
+        with self._transaction():
+            if expire_before is not None:
+                rows = self._conn.execute(
+                    "SELECT key, path, size, mtime_ns FROM entries WHERE last_access < ?" + kind_filter,
+                    (expire_before,) + kind_args
+                ).fetchall()
+                victims.extend(rows)
+
+            if max_bytes is not None:
+                total = self._conn.execute(
+                    "SELECT COALESCE(SUM(bytes), 0) FROM totals" + (" WHERE kind = ?" if kind else ""),
+                    kind_args
+                ).fetchone()[0]
+                total -= sum(row[2] for row in victims)
+                if total > max_bytes:
+                    taken = {row[0] for row in victims}
+                    for row in self._conn.execute(
+                            "SELECT key, path, size, mtime_ns FROM entries WHERE 1 = 1" + kind_filter +
+                            " ORDER BY access_seq", kind_args):
+                        if total <= max_bytes:
+                            break
+                        if row[0] in taken:
+                            continue
+                        victims.append(row)
+                        total -= row[2]
+
+            if remove is not None:
+                victims = self._remove_rows(victims, remove)
+            else:
+                self._conn.executemany("DELETE FROM entries WHERE key = ?", [(row[0],) for row in victims])
+        return [(path, size, mtime_ns) for _, path, size, mtime_ns in victims]
+
+    def clear(self, kind=None, remove=remove_entry_file):
+        """
+        Remove entries (all, or one kind) and their files
+
+        Args:
+            remove: callable(path, mtime_ns) -> bool deleting one file; rows
+                of files it could not delete are kept (see _remove_rows)
+
+        Returns:
+            list: Relative paths of the files removed
+        """
+        kind_filter, args = (" WHERE kind = ?", (kind,)) if kind else ("", ())
+        with self._transaction():
+            rows = self._conn.execute(
+                "SELECT key, path, size, mtime_ns FROM entries" + kind_filter, args
+            ).fetchall()
+            removed = self._remove_rows(rows, remove)
+        return [row[1] for row in removed]
+
+    def close(self):
+        if self._has_pending():
+            self.flush()
+        with self._lock:
+            self._conn.close()
+
+
+class OCRResultCache:
+    """Size-capped LRU cache of OCR results with TTL expiry"""
+
+    def __init__(self, cache_dir, max_bytes=None, ttl_seconds=None, manifest_path=None):
+        """
+        Args:
+            cache_dir: Directory for cache entries (created if missing)
+            max_bytes: Byte budget; defaults to OCR_RESULT_CACHE_MB (256 MB)
+            ttl_seconds: Expire entries unused for this long; defaults to
+                OCR_RESULT_CACHE_TTL_DAYS (30 days), 0 = never
+            manifest_path: SQLite manifest (defaults to cache_dir/manifest.sqlite3)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(exist_ok=True, parents=True)
+
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get("OCR_RESULT_CACHE_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        if ttl_seconds is None:
+            ttl_seconds = float(os.environ.get("OCR_RESULT_CACHE_TTL_DAYS", DEFAULT_TTL_DAYS)) * 86400
+        self.ttl_seconds = ttl_seconds
+
+        self.manifest = CacheManifest(manifest_path or self.cache_dir / MANIFEST_NAME)
+        self.hits = 0
+        self.misses = 0
+
+        self._evictor = None
+        self._evictor_stop = threading.Event()
+
+        if self.manifest.totals(kind="result")["entries"] == 0:
+            self._import_existing()
+
+    def _entry_path(self, key):
+        return self.cache_dir / f"{key}.json.gz"
+
+    def _import_existing(self):
+        """One-time adoption of entries written before the manifest existed"""
+        entries = []
+        for path in self.cache_dir.glob("*.json.gz"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        for _, path in sorted(entries):
+            try:
+                self.manifest.record(path.name[:-len(".json.gz")], path, kind="result")
+            except OSError:
+                continue
+
+    def get(self, key):
+        """Return the cached entry dict, or None on a miss"""
+        path = self._entry_path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            # Entry removed (or corrupted) behind our back: its row goes with
+            # the next write (which also writes this miss's count)
+            self.manifest.forget(key)
+            self.manifest.touch(key, hit=False)
+            return None
+
+        self.hits += 1
+        self.manifest.touch(key, hit=True)
+        return entry
+
+    def put(self, key, entry):
+        """Store an entry (atomically) and evict LRU entries over budget"""
+        path = self._entry_path(key)
+        tmp_path = path.with_name(f".{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+        data = gzip.compress(json.dumps(entry, ensure_ascii=False, default=str).encode("utf-8"))
+        if len(data) > self.max_bytes:
+            return False
+
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        try:
+            self.manifest.record(key, path, kind="result", place=lambda: os.replace(tmp_path, path))
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        # Budget covers everything the manifest tracks (results + debug images)
+        if self.manifest.totals()["bytes"] > self.max_bytes:
+            self.evict(expire=False)
+        return True
+
+    def evict(self, expire=True):
+        """
+        Drop expired entries and least-recently-used entries over budget
+
+        Safe while other processes read and write: rows are claimed and
+        files unlinked in one transaction, which put() also needs to land a
+        file, and a file is only unlinked if it is still the version the
+        manifest recorded (a rewrite of the same key wins).
+
+        Returns:
+            dict: {"removed": count, "freed_mb": float}
+        """
+        expire_before = time.time() - self.ttl_seconds if expire and self.ttl_seconds else None
+        removed = self.manifest.take_victims(max_bytes=self.max_bytes, expire_before=expire_before,
+                                             remove=self._remove_file)
+        freed = sum(size for _, size, _ in removed)
+        return {"removed": len(removed), "freed_mb": freed / (1024 * 1024)}
+
+    _remove_file = staticmethod(remove_entry_file)
+
+    def _sweep_stale_tmp(self):
+        """Remove temp files left by writers that crashed mid-put"""
+        cutoff = time.time() - STALE_TMP_SECONDS
+        for path in self.cache_dir.glob(".*.tmp"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+    def start_evictor(self, interval=None):
+        """Run evict() in a daemon thread every interval seconds"""
+        if self._evictor is not None:
+            return
+        if interval is None:
+            interval = float(os.environ.get("OCR_CACHE_EVICT_INTERVAL", DEFAULT_EVICT_INTERVAL))
+
+        def run():
+            while not self._evictor_stop.wait(interval):
+                try:
+                    result = self.evict()
+                    self._sweep_stale_tmp()
+                    if result["removed"]:
+                        print(f"[*] OCR cache evicted {result['removed']} entries "
+                              f"({result['freed_mb']:.1f} MB)")
+                except Exception as e:
+                    print(f"[!] OCR cache eviction error: {e}")
+
+        self._evictor_stop.clear()
+        self._evictor = threading.Thread(target=run, name="ocr-cache-evictor", daemon=True)
+        self._evictor.start()
+
+    def stop_evictor(self):
+        """Stop the background evictor"""
+        if self._evictor is not None:
+            self._evictor_stop.set()
+            self._evictor.join()
+            self._evictor = None
+
+    def clear(self):
+        """Remove all result entries, returns count removed"""
+        return len(self.manifest.clear(kind="result", remove=self._remove_file))
+
+    def get_stats(self):
+        """Result entry count, size and hit rate (O(1), shared by all processes)"""
+        totals = self.manifest.totals(kind="result")
+        lookups = totals["hits"] + totals["misses"]
+        return {
+            "entries": totals["entries"],
+            "total_size_mb": totals["bytes"] / (1024 * 1024),
+            "max_size_mb": self.max_bytes / (1024 * 1024),
+            "ttl_days": self.ttl_seconds / 86400,
+            "hits": totals["hits"],
+            "misses": totals["misses"],
+            "hit_rate": totals["hits"] / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        """Stop the evictor and release the manifest"""
+        self.stop_evictor()
+        self.manifest.close()
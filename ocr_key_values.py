@@ -0,0 +1,170 @@
+"""
+Key-Value Pairing from OCR Layout
+Pairs form labels with their values using line boxes
+
+Handles the three layouts seen on ticket scans and forms:
+    "Key: Value" on one line        -> split on the separator
+    "Key:"  "Value" on one row      -> value is the nearest line to the right
+    "Key:" with "Value" underneath  -> value is the nearest line below
+
+Neighbour lookups go through a uniform grid over the page, so pairing
+stays near-linear on dense forms. Pages without boxes (embedded PDF
+text, or layout collection turned off) fall back to line order: a bare
+label takes the next line as its value.
+"""
+
+import re
+from collections import defaultdict
+from ocr_layout import NO_BOX
+
+# "Key: Value" / "Key = Value"; keys need a letter so times like 10:30 are not split
+PAIR_PATTERN = re.compile(r'^\s*(?P<key>[^:=]*[A-Za-z][^:=]*?)\s*[:=]\s*(?P<value>.*?)\s*$')
+
+RIGHT_MAX_GAP = 12.0    # Max gap to a value on the right, in label line heights
+BELOW_MAX_GAP = 1.5     # Max gap to a value below, in label line heights
+ROW_OVERLAP = 0.5       # Vertical overlap (of the shorter line) to count as one row
+GRID_CELL_LINES = 4     # Grid cell size, in median line heights
+
+
+def split_pair(text):
+    """(key, value) for "Key: Value"/"Key = Value" text, value '' for a bare label; None otherwise"""
+    match = PAIR_PATTERN.match(text)
+    if not match or len(match.group("key")) > 60:
+        return None
+    return match.group("key"), match.group("value")
+
+
+class SpatialGrid:
+    """Uniform grid of boxes for rectangle queries"""
+
+    def __init__(self, cell_size):
+        self.cell_size = max(1.0, float(cell_size))
+        self._cells = defaultdict(list)
+
+    def _cell_range(self, x0, y0, x1, y1):
+        size = self.cell_size
+        for cx in range(int(x0 // size), int(x1 // size) + 1):
+            for cy in range(int(y0 // size), int(y1 // size) + 1):
+                yield cx, cy
+
+    def insert(self, item, box):
+        for cell in self._cell_range(*box):
+            self._cells[cell].append(item)
+
+    def query(self, x0, y0, x1, y1):
+        """Items whose cells intersect the rectangle (callers filter exactly)"""
+        found = set()
+        for cell in self._cell_range(x0, y0, x1, y1):
+            found.update(self._cells.get(cell, ()))
+        return found
+
+
+def _vertical_overlap(a, b):
+    overlap = min(a[3], b[3]) - max(a[1], b[1])
+    return overlap / max(1, min(a[3] - a[1], b[3] - b[1]))
+
+
+def _pairs_from_boxes(texts, boxes):
+    """Pair labels with values on one page using box geometry"""
+    pairs = []
+    labels, values = [], []
+    for i, (text, box) in enumerate(zip(texts, boxes)):
+        pair = split_pair(text)
+        if pair is None:
+            values.append(i)
+        elif pair[1]:
+            pairs.append((box[1], box[0], pair[0], pair[1]))
+        else:
+            labels.append(i)
+    if labels and values:
+        pairs.extend(_pair_labels(texts, boxes, labels, values))
+
+    # Reading order, so later duplicates of a key win as with plain text
+    return [(key, value) for _, _, key, value in sorted(pairs, key=lambda p: (p[0], p[1]))]
+
+
+def _pair_labels(texts, boxes, labels, values):
+    """(y, x, key, value) for each bare label that has a nearby value line"""
+    pairs = []
+    heights = sorted(boxes[i][3] - boxes[i][1] for i in values)
+    grid = SpatialGrid(GRID_CELL_LINES * max(1, heights[len(heights) // 2]))
+    for i in values:
+        grid.insert(i, boxes[i])
+
+    used = set()
+    for label in sorted(labels, key=lambda i: (boxes[i][1], boxes[i][0])):
+        lx0, ly0, lx1, ly1 = boxes[label]
+        height = max(1, ly1 - ly0)
+        tolerance = height / 2.0
+        best = None
+
+        # Same row, to the right: smallest horizontal gap
+        for i in grid.query(lx1 - tolerance, ly0, lx1 + RIGHT_MAX_GAP * height, ly1):
+            if i in used:
+                continue
+            box = boxes[i]
+            gap = box[0] - lx1
+            if -tolerance <= gap <= RIGHT_MAX_GAP * height and _vertical_overlap(boxes[label], box) >= ROW_OVERLAP:
+                if best is None or gap < best[0]:
+                    best = (gap, 0, i)
+
+        # Underneath: smallest vertical gap, then closest left edge
+        if best is None:
+            for i in grid.query(lx0 - 2 * height, ly1 - tolerance, lx1, ly1 + BELOW_MAX_GAP * height):
+                if i in used:
+                    continue
+                box = boxes[i]
+                gap = box[1] - ly1
+                aligned = box[0] < lx1 and box[2] > lx0 or abs(box[0] - lx0) <= 2 * height
+                if -tolerance <= gap <= BELOW_MAX_GAP * height and aligned:
+                    key = (gap, abs(box[0] - lx0), i)
+                    if best is None or key < best:
+                        best = key
+
+        if best is not None:
+            value = best[2]
+            used.add(value)
+            pairs.append((ly0, lx0, split_pair(texts[label])[0], texts[value].strip()))
+    return pairs
+
+
+def _pairs_from_text(texts):
+    """Pair labels with values by line order (no geometry available)"""
+    pairs = []
+    pending = None
+    for text in texts:
+        pair = split_pair(text)
+        if pair is None:
+            if pending is not None and text.strip():
+                pairs.append((pending, text.strip()))
+            pending = None
+        elif pair[1]:
+            pairs.append(pair)
+            pending = None
+        else:
+            pending = pair[0]
+    return pairs
+
+
+def extract_key_value_pairs(layouts):
+    """
+    Key-value pairs over all pages of a document
+
+    Args:
+        layouts: OCRLayout per page
+
+    Returns:
+        dict: {key: value}; a key seen again later in the document wins
+    """
+    key_value_pairs = {}
+    for layout in layouts:
+        if layout is None or not len(layout):
+            continue
+        boxes = layout.boxes
+        if boxes is not None and len(boxes) and not (boxes[:, 0] == NO_BOX).any():
+            pairs = _pairs_from_boxes(layout.texts, boxes.tolist())
+        else:
+            pairs = _pairs_from_text(layout.texts)
+        for key, value in pairs:
+            key_value_pairs[key] = value
+    return key_value_pairs
@@ -0,0 +1,144 @@
+"""
+Compact OCR Layout
+Boxes, texts and scores of one page as parallel arrays
+
+Replaces raw PaddleX OCRResult objects (which keep input images and
+intermediate arrays alive) in extract_text results. Layouts are small,
+picklable (pool workers and the OCR service send them back as-is) and
+convert to JSON-safe [bbox, text, score] lines on demand.
+"""
+
+import numpy as np
+
+# Marks a line without a known box in OCRLayout.boxes
+NO_BOX = -1
+
+
+class OCRLayout:
+    """One page of OCR lines as parallel arrays"""
+
+    __slots__ = ("texts", "scores", "boxes")
+
+    def __init__(self, texts=(), scores=(), boxes=None):
+        """
+        Args:
+            texts: Line texts
+            scores: Recognition score per line
+            boxes: Optional (n, 4) [x_min, y_min, x_max, y_max] per line,
+                rows of NO_BOX where unknown; None if layout was skipped
+        """
+        self.texts = list(texts)
+        self.scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+        self.boxes = None if boxes is None else np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+
+    @classmethod
+    def from_ocr_result(cls, result, with_boxes=True):
+        """
+        Build from a PaddleOCR result (PaddleX OCRResult pages or the legacy
+        list of [box, (text, score)] lines)
+
+        Args:
+            result: Return value of PaddleOCR.ocr() for one image
+            with_boxes: Also collect line boxes (False = texts and scores only)
+        """
+        texts, scores, boxes = [], [], []
+        try:
+            for page in result or []:
+                if not page:
+                    continue
+                if hasattr(page, 'str') and isinstance(page.str, dict):
+                    res = page.str.get('res', {})
+                    page_texts = list(res.get('rec_texts', []))
+                    texts.extend(page_texts)
+                    scores.append(np.asarray(res.get('rec_scores', []), dtype=np.float64).reshape(-1))
+                    if with_boxes:
+                        boxes.append(_page_boxes(res, len(page_texts)))
+                elif isinstance(page, list):
+                    for line in page:
+                        if line and len(line) >= 2:
+                            texts.append(line[1][0])
+                            scores.append(np.array([line[1][1]], dtype=np.float64))
+                            if with_boxes:
+                                boxes.append(_boxes_from_points([line[0]]))
+        except (IndexError, TypeError, KeyError, ValueError) as e:
+            print(f"[!] OCR parse warning: {e}")
+
+        scores = np.concatenate(scores) if scores else np.empty(0)
+        if with_boxes:
+            boxes = np.concatenate(boxes) if boxes else np.empty((0, 4), dtype=np.int32)
+        else:
+            boxes = None
+        return cls(texts, scores, boxes)
+
+    @classmethod
+    def from_lines(cls, lines):
+        """Build from JSON-safe [bbox, text, score] lines (cache entries, text layer)"""
+        boxes = [bbox if bbox is not None else [NO_BOX] * 4 for bbox, _, _ in lines]
+        return cls([line[1] for line in lines], [line[2] for line in lines],
+                   boxes if lines else np.empty((0, 4), dtype=np.int32))
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __repr__(self):
+        return f"OCRLayout(lines={len(self)}, boxes={self.boxes is not None})"
+
+    @property
+    def text(self):
+        """Page text, one recognized line per line"""
+        return "\n".join(self.texts)
+
+    @property
+    def mean_score(self):
+        """Mean recognition score (0.0 for an empty page)"""
+        return float(self.scores.mean()) if self.scores.size else 0.0
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the arrays and strings"""
+        boxes = self.boxes.nbytes if self.boxes is not None else 0
+        return self.scores.nbytes + boxes + sum(len(t) for t in self.texts)
+
+    def to_lines(self):
+        """JSON-safe [[x_min, y_min, x_max, y_max] or None, text, score] lines"""
+        boxes = self.boxes.tolist() if self.boxes is not None else [None] * len(self)
+        return [
+            [None if box is None or box[0] == NO_BOX else box, text, score]
+            for box, text, score in zip(boxes, self.texts, self.scores.tolist())
+        ]
+
+
+def mean_confidence(layouts):
+    """
+    Mean line score over all pages
+    Serial, parallel and cached paths all use this, so they agree exactly
+    """
+    scores = [layout.scores for layout in layouts if layout is not None and layout.scores.size]
+    if not scores:
+        return 0.0
+    return float(np.concatenate(scores).mean())
+
+
+def _page_boxes(res, count):
+    """Axis-aligned boxes for a PaddleX result page (NO_BOX rows if absent)"""
+    boxes = res.get('rec_boxes')
+    if boxes is not None and len(boxes) == count:
+        boxes = np.asarray(boxes)
+        if boxes.ndim == 2 and boxes.shape[1] == 4:
+            return boxes.astype(np.int32)
+    polys = res.get('rec_polys')
+    if polys is not None and len(polys) == count:
+        return _boxes_from_points(polys)
+    return np.full((count, 4), NO_BOX, dtype=np.int32)
+
+
+def _boxes_from_points(polygons):
+    """Axis-aligned boxes from a sequence of point lists"""
+    boxes = np.full((len(polygons), 4), NO_BOX, dtype=np.int32)
+    for i, polygon in enumerate(polygons):
+        if polygon is None:
+            continue
+        points = np.asarray(polygon, dtype=float).reshape(-1, 2)
+        boxes[i, :2] = points.min(axis=0)
+        boxes[i, 2:] = points.max(axis=0)
+    return boxes
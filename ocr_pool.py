@@ -0,0 +1,139 @@
+"""
+Page-Parallel OCR Worker Pool
+Spreads the pages of one document over a bounded pool of OCR processes
+
+Each worker process loads its own PaddleOCR model once (in the pool
+initializer) and then OCRs in-memory page arrays. Math-library thread
+counts are capped per worker so N workers x M threads never exceeds the
+machine's cores.
+
+Workers are started with "spawn", never fork: by the time the pool starts
+the parent has PaddleOCR/OpenMP loaded and background threads running (the
+cache evictor, the log listener), and forking that state can deadlock.
+
+Configuration: workers, worker_threads and pin_cpus from ocr_resources
+(OCR_WORKERS, OCR_WORKER_THREADS, OCR_PIN_CPUS or the resource file)
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from ocr_resources import (load_resource_config, available_cpus, cap_threads, cpu_blocks, pin_to_cpus,
+                           thread_capped_context)
+
+# Per-process OCR engine (one per worker)
+_worker_processor = None
+
+
+def default_workers():
+    """Worker count from the resource settings (1 disables the pool)"""
+    return load_resource_config()["workers"]
+
+
+def default_threads_per_worker(workers):
+    """Inference threads per worker from the resource settings, else an even split of cores"""
+    configured = load_resource_config()["worker_threads"]
+    if configured:
+        return configured
+    return max(1, len(available_cpus()) // max(1, workers))
+
+
+def _init_worker(data_dir, threads_per_worker, processor_options, blocks=None, next_slot=None):
+    """Pool initializer: pin and cap OpenCV threads, then load the OCR model once"""
+    global _worker_processor
+
+    if blocks and next_slot is not None:
+        # Each new worker takes the next block (replacement workers wrap around)
+        with next_slot.get_lock():
+            slot = next_slot.value
+            next_slot.value += 1
+        pin_to_cpus(blocks[slot % len(blocks)])
+
+    cap_threads(threads_per_worker)
+
+    from ocr_processor import OCRProcessor
+    _worker_processor = OCRProcessor(
+        data_dir=data_dir,
+        cpu_threads=threads_per_worker,
+        workers=1,
+        **processor_options
+    )
+
+
+def _ocr_page_task(image, preprocess, debug_name):
+    """Worker task: OCR one page, return only the compact layout (never raw results)"""
+    layout, report = _worker_processor._ocr_page(image, preprocess, debug_name=debug_name)
+    return _worker_processor._page_dict(layout, report)
+
+
+class OCRWorkerPool:
+    """Bounded pool of OCR worker processes, each with its own loaded model"""
+
+    def __init__(self, workers=None, threads_per_worker=None, data_dir=None, processor_options=None,
+                 pin_cpus=None):
+        self.workers = workers or default_workers()
+        self.threads_per_worker = threads_per_worker or default_threads_per_worker(self.workers)
+        self.pin_cpus = load_resource_config()["pin_cpus"] if pin_cpus is None else pin_cpus
+        self.data_dir = data_dir
+        # Extra OCRProcessor arguments so workers match the parent's settings
+        self.processor_options = processor_options or {}
+        self._executor = None
+
+    def _get_executor(self):
+        # Started lazily so model loading is only paid when a multi-page job arrives
+        if self._executor is None:
+            # Spawned with the thread caps already in their environment
+            context = thread_capped_context(self.threads_per_worker)
+            blocks, next_slot = None, None
+            if self.pin_cpus:
+                blocks = cpu_blocks(self.workers, self.threads_per_worker)
+                next_slot = context.Value("i", 0)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self.data_dir, self.threads_per_worker, self.processor_options, blocks, next_slot)
+            )
+        return self._executor
+
+    def imap_pages(self, numbered_images, preprocess=True, debug_name=None, max_in_flight=None):
+        """
+        OCR pages in parallel, yielding results in page order
+
+        Pages are pulled from numbered_images only as slots free up, so at
+        most max_in_flight pages (default: 2 per worker) are held at once.
+
+        Args:
+            numbered_images: Iterable of (page_number, image array)
+            preprocess: Apply preprocessing in the workers
+            debug_name: Optional callable page_number -> debug image name
+            max_in_flight: Bound on queued pages
+
+        Yields:
+            tuple: (page_number, page dict; has_result is False if OCR found nothing)
+        """
+        executor = self._get_executor()
+        max_in_flight = max_in_flight or self.workers * 2
+        in_flight = deque()
+
+        try:
+            for page_number, image in numbered_images:
+                name = debug_name(page_number) if debug_name else None
+                in_flight.append((page_number, executor.submit(_ocr_page_task, image, preprocess, name)))
+                if len(in_flight) >= max_in_flight:
+                    done_number, future = in_flight.popleft()
+                    yield done_number, future.result()
+
+            while in_flight:
+                done_number, future = in_flight.popleft()
+                yield done_number, future.result()
+        finally:
+            # Caller stopped early (e.g. early exit): drop pages not yet started
+            for _, future in in_flight:
+                future.cancel()
+
+    def shutdown(self):
+        """Stop worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
@@ -7,42 +7,211 @@ BMAD-EDI Media Analysis Integration
 """
 
 import os
+import re
+import time
 import cv2
 import numpy as np
 from pathlib import Path
 from PIL import Image
 from paddleocr import PaddleOCR
 
+from ocr_cache import OCRResultCache, MANIFEST_NAME, hash_file, make_cache_key
+from ocr_pool import OCRWorkerPool, default_workers
+from ocr_resources import load_resource_config, engine_options
+from pdf_text_layer import extract_text_layer, is_usable_text, text_layer_lines
+from ocr_layout import OCRLayout, mean_confidence
+from ocr_key_values import extract_key_value_pairs
+from page_hash import PageDeduplicator, page_signature
+
+# Bump when preprocessing or result parsing changes output for the same input
+PIPELINE_VERSION = 4
+
+# Adaptive preprocessing thresholds (see _plan_preprocessing)
+NOISE_SIGMA_THRESHOLD = 3.0     # Estimated noise std-dev (grey levels) worth denoising
+LOW_CONTRAST_SPREAD = 96        # Paper/ink grey level gap below which CLAHE runs
+PHOTO_COLOUR_COUNT = 1024       # Distinct (quantized) colours typical of scans/photos
+MIN_SIDE_PX = 1000              # Legacy rule: upscale 2x when either side is smaller
+DEFAULT_TARGET_GLYPH_PX = 20    # Median glyph height that detection + recognition read well
+RESCALE_TOLERANCE = 1.33        # Leave images alone within this factor of the target
+MIN_SCALE, MAX_SCALE = 0.25, 4.0
+MIN_GLYPHS = 20                 # Components needed for a trustworthy glyph estimate
+PREPROCESS_STAGES = ("downscale", "clahe", "denoise", "binarize", "upscale")
+
+# PDF rendering (see _plan_render)
+DEFAULT_RENDER_DPI = 200        # pdf2image's default; used when no estimate is possible
+PROBE_DPI = 100                 # Low-resolution render used to measure glyph size
+MIN_RENDER_DPI, MAX_RENDER_DPI = 100, 400
+MAX_RENDER_SIDE_PX = 5000       # Cap for oversized pages (drawings, posters)
+
 
 class OCRProcessor:
-    def __init__(self, data_dir=None):
-        """Initialize PaddleOCR with English language support"""
+    def __init__(self, data_dir=None, result_cache_bytes=None, debug_images=None,
+                 workers=None, threads_per_worker=None, cpu_threads=None, render_window=None,
+                 preprocess_mode=None, use_text_layer=None, target_glyph_px=None,
+                 build_layout=None, cache_evictor=None, render_dpi=None, render_threads=None,
+                 dedup_pages=None, enable_mkldnn=None, pin_cpus=None):
+        """
+        Initialize PaddleOCR with English language support
+
+        Args:
+            data_dir: Data directory (defaults to ./data)
+            result_cache_bytes: Byte budget for the OCR result cache
+            debug_images: Write rendered and preprocessed pages to the cache
+                directory (defaults to OCR_DEBUG_IMAGES=1). Off by default:
+                pages otherwise stay in memory from render to OCR.
+            workers: OCR worker processes for multi-page documents
+                (defaults to OCR_WORKERS or the resource file; 1 = serial)
+            threads_per_worker: Inference threads per worker process
+                (defaults to OCR_WORKER_THREADS, else cores / workers)
+            cpu_threads: Inference threads for this process's own model
+                (defaults to OCR_CPU_THREADS, else Paddle's default)
+            render_window: PDF pages rasterized per pdf2image call
+                (defaults to OCR_RENDER_WINDOW, 4); bounds memory on long PDFs
+            preprocess_mode: "adaptive" picks stages per image from a quick
+                quality check, "full" always runs every stage
+                (defaults to OCR_PREPROCESS_MODE, adaptive)
+            use_text_layer: Take embedded text from digital PDF pages instead
+                of OCRing them (defaults to OCR_TEXT_LAYER, on)
+            target_glyph_px: Rescale pages so the median glyph is this tall
+                (defaults to OCR_TARGET_GLYPH_PX, 20; 0 = legacy 2x upscale
+                of images under 1000px)
+            build_layout: Collect line boxes and return per-page OCRLayout
+                objects as structured_data (defaults to OCR_BUILD_LAYOUT, on).
+                Off = text and confidence only, structured_data is empty.
+            cache_evictor: Run the background cache evictor (TTL + byte
+                budget) in this process (defaults to OCR_CACHE_EVICTOR, on)
+            render_dpi: PDF render DPI, or "auto" to pick one per document from
+                page size and measured glyph size (defaults to OCR_RENDER_DPI, auto)
+            render_threads: poppler threads per render window
+                (defaults to OCR_RENDER_THREADS, else min(4, cores))
+            dedup_pages: Reuse the OCR result of repeated pages, matched by
+                perceptual hash within a document and against the result
+                cache (defaults to OCR_PAGE_DEDUP, on)
+            enable_mkldnn: Use Paddle's MKL-DNN (oneDNN) CPU kernels
+                (defaults to OCR_MKLDNN; unset keeps Paddle's default)
+            pin_cpus: Pin each pool worker to its own block of cores
+                (defaults to OCR_PIN_CPUS, off)
+
+        Thread, MKL-DNN and pinning defaults may also come from the resource
+        file (see ocr_resources).
+        """
         self.data_dir = data_dir or Path(__file__).parent / "data"
         self.cache_dir = self.data_dir / "ocr_cache"
         self.cache_dir.mkdir(exist_ok=True, parents=True)
 
+        if debug_images is None:
+            debug_images = os.environ.get("OCR_DEBUG_IMAGES", "0") == "1"
+        self.debug_images = debug_images
+        self.render_window = max(1, render_window or int(os.environ.get("OCR_RENDER_WINDOW", "4")))
+        self.render_dpi = render_dpi or os.environ.get("OCR_RENDER_DPI", "auto")
+        self.render_threads = max(1, render_threads or int(
+            os.environ.get("OCR_RENDER_THREADS", min(4, os.cpu_count() or 1))))
+        self.preprocess_mode = preprocess_mode or os.environ.get("OCR_PREPROCESS_MODE", "adaptive")
+        if use_text_layer is None:
+            use_text_layer = os.environ.get("OCR_TEXT_LAYER", "1") == "1"
+        self.use_text_layer = use_text_layer
+        if target_glyph_px is None:
+            target_glyph_px = int(os.environ.get("OCR_TARGET_GLYPH_PX", DEFAULT_TARGET_GLYPH_PX))
+        self.target_glyph_px = target_glyph_px
+        if build_layout is None:
+            build_layout = os.environ.get("OCR_BUILD_LAYOUT", "1") == "1"
+        self.build_layout = build_layout
+        if dedup_pages is None:
+            dedup_pages = os.environ.get("OCR_PAGE_DEDUP", "1") == "1"
+        self.dedup_pages = dedup_pages
+
+        # Settings that change OCR output; part of every result cache key
+        self.ocr_settings = {
+            "use_angle_cls": True,
+            "lang": "en"
+        }
+
+        # Runtime-only engine options (do not change output, not part of cache keys)
+        resources = load_resource_config()
+        if enable_mkldnn is None:
+            enable_mkldnn = resources["enable_mkldnn"]
+        self.enable_mkldnn = enable_mkldnn
+        self.engine_settings = engine_options(cpu_threads or resources["cpu_threads"], enable_mkldnn)
+
         # Initialize PaddleOCR (English only)
         # Note: show_log parameter removed for compatibility with current PaddleOCR version
-        self.ocr = PaddleOCR(
-            use_angle_cls=True,
-            lang='en'
+        self.ocr = PaddleOCR(**self.ocr_settings, **self.engine_settings)
+
+        # Page-parallel pool for multi-page documents (workers load their own models)
+        self.workers = workers or default_workers()
+        self.pool = None
+        if self.workers > 1:
+            self.pool = OCRWorkerPool(
+                workers=self.workers,
+                threads_per_worker=threads_per_worker,
+                data_dir=self.data_dir,
+                processor_options={
+                    "preprocess_mode": self.preprocess_mode,
+                    "target_glyph_px": self.target_glyph_px,
+                    "build_layout": self.build_layout,
+                    "enable_mkldnn": self.enable_mkldnn,
+                    "cache_evictor": False
+                },
+                pin_cpus=pin_cpus
+            )
+
+        # Finished results keyed by content hash + settings. The manifest also
+        # tracks debug images, so one budget and one evictor cover the cache dir.
+        self.result_cache = OCRResultCache(
+            self.cache_dir / "results",
+            max_bytes=result_cache_bytes,
+            manifest_path=self.cache_dir / MANIFEST_NAME
         )
+        if cache_evictor is None:
+            cache_evictor = os.environ.get("OCR_CACHE_EVICTOR", "1") == "1"
+        if cache_evictor:
+            self.result_cache.start_evictor()
+
+    def _cache_settings(self, preprocess, pages=None):
+        """Settings fingerprint for the result cache key"""
+        settings = {
+            "pipeline_version": PIPELINE_VERSION,
+            "ocr": self.ocr_settings,
+            "preprocess": preprocess,
+            "preprocess_mode": self.preprocess_mode,
+            "text_layer": self.use_text_layer,
+            "target_glyph_px": self.target_glyph_px,
+            "layout": self.build_layout,
+            "render_dpi": self.render_dpi
+        }
+        if pages is not None:
+            settings["pages"] = sorted(pages)
+        return settings
 
-    def extract_text(self, file_path, preprocess=True):
+    def extract_text(self, file_path, preprocess=True, use_cache=True, stop_when=None, pages=None,
+                     key_values=False):
         """
         Extract text from image or PDF
 
         Args:
-            file_path: Path to file (PDF, PNG, JPG, JPEG)
+            file_path: Path to file (PDF, PNG, JPG, JPEG, multi-frame TIFF/GIF)
             preprocess: Apply image preprocessing for better accuracy
+            use_cache: Return a cached result for identical input bytes + settings
+            stop_when: Optional early-exit predicate called with the text so far
+                after each page; OCR stops once it returns True. If it has an
+                `incremental` factory (see metadata_parser.RequiredFieldsCheck),
+                a fresh check is called with each new page's text instead, so
+                earlier pages are not rejoined and rescanned
+            pages: Optional 1-based page numbers to OCR (default: all)
+            key_values: Also pair form labels with values from the same OCR
+                pass (adds "key_value_pairs", see ocr_key_values)
+
+        Pages left unread (early exit or page selection) are listed in
+        metadata["pages_skipped"] and metadata["partial"] is True.
 
         Returns:
             dict: {
                 "success": bool,
                 "confidence": float,
                 "text": str,
-                "structured_data": list,
-                "metadata": dict
+                "structured_data": list of OCRLayout per page,
+                "metadata": dict,
+                "key_value_pairs": dict (only with key_values=True)
             }
         """
         file_path = Path(file_path)
@@ -58,49 +227,95 @@ class OCRProcessor:
             }
 
         try:
-            # Convert PDF to images if needed
-            if file_path.suffix.lower() == '.pdf':
-                images = self._pdf_to_images(file_path)
-            else:
-                images = [str(file_path)]
-
-            # Extract text from each image
-            all_text = []
-            all_results = []
-
-            for img_path in images:
-                try:
-                    if preprocess:
-                        img_path = self._preprocess_image(img_path)
-
-                    # Note: cls parameter removed for compatibility with current PaddleOCR version
-                    result = self.ocr.ocr(img_path)
-
-                    if result:
-                        text = self._parse_ocr_result(result)
-                        all_text.append(text)
-                        all_results.append(result)
-                    else:
-                        print(f"[!] No OCR result for {img_path}")
-                except Exception as e:
-                    print(f"[!] Error processing image {img_path}: {e}")
-                    raise
+            content_hash = hash_file(file_path)
+            cache_key = make_cache_key(content_hash, self._cache_settings(preprocess, pages))
+
+            if use_cache:
+                cached = self.result_cache.get(cache_key)
+                if cached is not None:
+                    return self._result_from_cache(cached, file_path, key_values)
+
+            # Debug images are named by content, so same-named uploads never collide
+            name_prefix = content_hash[:16]
+
+            # Pages stream from render to OCR in page order (serial or parallel)
+            render_info = {}
+            page_count, page_results = self._open_page_results(file_path, preprocess, name_prefix, pages,
+                                                               render_info=render_info, use_cache=use_cache)
+            parallel = self.pool is not None and page_count > 1
+
+            ocr_pages = []
+            pages_processed = []
+            page_details = []
+            stopped_early = False
+            stop_check = self._page_stop_check(stop_when)
+            for page in page_results:
+                pages_processed.append(page["page"])
+                detail = {
+                    "page": page["page"],
+                    "source": page["source"],
+                    "preprocess": page.get("preprocess")
+                }
+                if "duplicate_of" in page:
+                    detail["duplicate_of"] = page["duplicate_of"]
+                page_details.append(detail)
+                if page["has_result"]:
+                    ocr_pages.append(page)
+                    if stop_check is not None and stop_check(page["text"]):
+                        page_results.close()
+                        stopped_early = True
+                        break
+                else:
+                    print(f"[!] No OCR result for page {page['page']} of {file_path.name}")
+
+            processed = set(pages_processed)
+            pages_skipped = [n for n in range(1, page_count + 1) if n not in processed]
 
             # Combine results
-            combined_text = "\n\n".join(all_text)
-            confidence = self._calculate_confidence(all_results)
+            combined_text = "\n\n".join(page["text"] for page in ocr_pages)
+            layouts = [page["layout"] for page in ocr_pages]
+            confidence = mean_confidence(layouts)
+            sources = [detail["source"] for detail in page_details]
+            metadata = {
+                "extraction_method": self._extraction_method(sources),
+                "text_layer_pages": sources.count("text_layer"),
+                "ocr_pages": sources.count("ocr"),
+                "pages_deduplicated": [detail["page"] for detail in page_details
+                                       if detail["source"] in ("duplicate", "page_cache")],
+                "pages": page_count,
+                "total_chars": len(combined_text),
+                "file_type": file_path.suffix.lower(),
+                "content_sha256": content_hash,
+                "ocr_workers": self.workers if parallel else 1,
+                "partial": bool(pages_skipped),
+                "pages_skipped": pages_skipped,
+                "preprocess_ms": self._total_preprocess_ms(page_details),
+                "render": render_info or None,
+                "page_details": page_details
+            }
 
-            return {
+            # Early-exit results depend on the predicate, so only complete runs are cached
+            if use_cache and not stopped_early:
+                self.result_cache.put(cache_key, {
+                    "text": combined_text,
+                    "confidence": confidence,
+                    "layout": [layout.to_lines() for layout in layouts],
+                    "metadata": metadata
+                })
+            metadata["cache"] = "miss" if use_cache else "disabled"
+
+            structured_data = layouts if self.build_layout else []
+
+            result = {
                 "success": True,
                 "confidence": confidence,
                 "text": combined_text,
-                "structured_data": all_results,
-                "metadata": {
-                    "pages": len(images),
-                    "total_chars": len(combined_text),
-                    "file_type": file_path.suffix.lower()
-                }
+                "structured_data": structured_data,
+                "metadata": metadata
             }
+            if key_values:
+                result["key_value_pairs"] = extract_key_value_pairs(layouts)
+            return result
         except Exception as e:
             import traceback
             error_detail = f"{type(e).__name__}: {str(e)}\n{traceback.format_exc()}"
@@ -114,7 +329,556 @@ class OCRProcessor:
                 "metadata": {}
             }
 
-    def _pdf_to_images(self, pdf_path):
+    def extract_text_iter(self, file_path, preprocess=True, pages=None):
+        """
+        Yield per-page OCR results as each page finishes
+
+        PDF pages are rasterized in small windows (render_window pages per
+        pdf2image call) and released after OCR, so memory stays roughly flat
+        regardless of page count and the first page arrives right away.
+        Results are not read from or written to the result cache.
+
+        Args:
+            file_path: Path to file (PDF, PNG, JPG, JPEG, multi-frame TIFF/GIF)
+            preprocess: Apply image preprocessing for better accuracy
+            pages: Optional 1-based page numbers to OCR (default: all)
+
+        Yields:
+            dict: {
+                "page": int (1-based),
+                "has_result": bool,
+                "text": str,
+                "confidence": float,
+                "layout": OCRLayout (boxes is None without build_layout),
+                "preprocess": preprocessing report (see _preprocess_with_report),
+                "source": "text_layer" (embedded PDF text), "ocr", or
+                    "duplicate" (copy of page "duplicate_of")
+            }
+        """
+        file_path = Path(file_path)
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        name_prefix = hash_file(file_path)[:16] if self.debug_images else None
+        _, page_results = self._open_page_results(file_path, preprocess, name_prefix, pages)
+        for page in page_results:
+            page["confidence"] = page["layout"].mean_score
+            yield page
+
+    @staticmethod
+    def _page_stop_check(stop_when):
+        """Per-page form of a stop_when predicate: called with each new page's text"""
+        if stop_when is None:
+            return None
+        incremental = getattr(stop_when, "incremental", None)
+        if incremental is not None:
+            return incremental()
+
+        # Plain predicate: it needs the whole text so far
+        texts = []
+
+        def check(page_text):
+            texts.append(page_text)
+            return stop_when("\n\n".join(texts))
+        return check
+
+    def _open_page_results(self, file_path, preprocess, name_prefix=None, page_numbers=None,
+                           render_info=None, use_cache=False):
+        """
+        Start lazy render + OCR of a document
+
+        Args:
+            render_info: Optional dict, filled with the PDF render settings used
+            use_cache: Look up and store individual pages in the result cache
+
+        Returns:
+            tuple: (total page count, generator of page dicts in page order)
+        """
+        file_path = Path(file_path)
+        text_pages = {}
+        if self.use_text_layer and file_path.suffix.lower() == '.pdf':
+            text_pages = self._usable_text_pages(file_path, page_numbers)
+
+        if not text_pages:
+            page_count, numbered_pages = self._open_pages(file_path, page_numbers, render_info)
+            return page_count, self._iter_page_results(file_path, page_count, numbered_pages,
+                                                       preprocess, name_prefix, use_cache)
+
+        # Only image-only pages are rasterized and OCR'd
+        page_count = self._pdf_page_count(file_path)
+        selected = range(1, page_count + 1) if page_numbers is None else sorted(set(page_numbers))
+        selected = [n for n in selected if 1 <= n <= page_count]
+        ocr_numbers = [n for n in selected if n not in text_pages]
+        ocr_results = iter(())
+        if ocr_numbers:
+            _, numbered_pages = self._open_pages(file_path, ocr_numbers, render_info)
+            ocr_results = self._iter_page_results(file_path, page_count, numbered_pages,
+                                                  preprocess, name_prefix, use_cache)
+        return page_count, self._merge_text_layer(selected, text_pages, ocr_results)
+
+    def _usable_text_pages(self, pdf_path, page_numbers=None):
+        """{page_number: text} for pages whose embedded text can replace OCR"""
+        text_pages = {}
+        for page_number, text in extract_text_layer(pdf_path).items():
+            if page_numbers is not None and page_number not in page_numbers:
+                continue
+            if is_usable_text(text):
+                text_pages[page_number] = text
+        return text_pages
+
+    @staticmethod
+    def _merge_text_layer(selected, text_pages, ocr_results):
+        """Interleave text-layer pages with OCR'd pages, keeping page order"""
+        try:
+            for page_number in selected:
+                if page_number in text_pages:
+                    text = text_pages[page_number]
+                    layout = OCRLayout.from_lines(text_layer_lines(text))
+                    yield {
+                        "page": page_number,
+                        "has_result": bool(len(layout)),
+                        "text": layout.text,
+                        "layout": layout,
+                        "preprocess": None,
+                        "source": "text_layer"
+                    }
+                else:
+                    page = next(ocr_results, None)
+                    if page is None:
+                        return  # Rendering failed for the remaining pages
+                    yield page
+        finally:
+            close = getattr(ocr_results, "close", None)
+            if close:
+                close()
+
+    @staticmethod
+    def _extraction_method(sources):
+        """Summarize per-page sources as one extraction method label"""
+        if sources and all(source == "text_layer" for source in sources):
+            return "pdf_text_layer"
+        if "text_layer" in sources:
+            return "pdf_text_layer+paddleocr"
+        return "paddleocr"
+
+    def _iter_page_results(self, file_path, page_count, numbered_pages, preprocess, name_prefix=None,
+                           use_cache=False):
+        """
+        Render and OCR pages lazily, yielding page dicts in page order
+
+        With dedup_pages, repeated pages never reach OCR: a page matching an
+        earlier page of the document is yielded as a copy of it (source
+        "duplicate"), one found in the result cache as the cached lines
+        (source "page_cache").
+        """
+        prefix = name_prefix or file_path.stem
+
+        def debug_name(page_number):
+            return f"{prefix}_page_{page_number}.png"
+
+        reused = {}      # page_number -> cached page dict, or original page number
+        page_keys = {}   # page_number -> page cache key of pages sent to OCR
+        if self.dedup_pages:
+            numbered_pages = self._skip_repeated_pages(numbered_pages, preprocess, use_cache,
+                                                       reused, page_keys)
+
+        if self.pool is not None and page_count > 1:
+            results = self.pool.imap_pages(numbered_pages, preprocess, debug_name)
+        else:
+            results = self._imap_pages_serial(numbered_pages, preprocess, debug_name, file_path.name)
+
+        # Skipped pages are recorded before any later page is sent to OCR, so
+        # they can be slotted back in just ahead of the next OCR'd page
+        done = {}
+        for page_number, page in results:
+            yield from self._reused_pages(reused, done, before=page_number)
+            page["page"] = page_number
+            page["source"] = "ocr"
+            done[page_number] = page
+            key = page_keys.pop(page_number, None)
+            if key is not None:
+                self.result_cache.put(key, {"layout": page["layout"].to_lines()})
+            yield page
+        yield from self._reused_pages(reused, done)
+
+    def _skip_repeated_pages(self, numbered_pages, preprocess, use_cache, reused, page_keys):
+        """Pass through (page_number, image) pairs whose content has not been OCR'd yet"""
+        seen = PageDeduplicator()
+        settings = self._cache_settings(preprocess)
+        for page_number, image in numbered_pages:
+            signature = page_signature(image)
+            original = seen.find(signature)
+            if original is not None:
+                reused[page_number] = original
+                continue
+            seen.add(signature, page_number)
+
+            if use_cache:
+                key = make_cache_key(f"page:{signature.key}", settings)
+                cached = self.result_cache.get(key)
+                if cached is not None:
+                    layout = OCRLayout.from_lines(cached["layout"])
+                    if not self.build_layout:
+                        layout.boxes = None
+                    page = self._page_dict(layout, None)
+                    page["source"] = "page_cache"
+                    reused[page_number] = page
+                    continue
+                page_keys[page_number] = key
+            yield page_number, image
+
+    @staticmethod
+    def _reused_pages(reused, done, before=None):
+        """Yield skipped pages numbered below `before` (all if None), in order"""
+        for page_number in sorted(n for n in reused if before is None or n < before):
+            entry = reused.pop(page_number)
+            if isinstance(entry, dict):
+                page = entry
+            else:
+                original = done[entry]
+                page = dict(original, source="duplicate", duplicate_of=entry, preprocess=None)
+            page["page"] = page_number
+            done[page_number] = page
+            yield page
+
+    def _result_from_cache(self, cached, file_path, key_values=False):
+        """Rebuild an extract_text result from a cache entry"""
+        metadata = dict(cached.get("metadata", {}))
+        metadata["file_type"] = file_path.suffix.lower()
+        metadata["cache"] = "hit"
+        layouts = [OCRLayout.from_lines(lines) for lines in cached.get("layout", [])]
+        result = {
+            "success": True,
+            "confidence": cached.get("confidence", 0.0),
+            "text": cached.get("text", ""),
+            "structured_data": layouts if self.build_layout else [],
+            "metadata": metadata
+        }
+        if key_values:
+            result["key_value_pairs"] = extract_key_value_pairs(layouts)
+        return result
+
+    def _imap_pages_serial(self, numbered_pages, preprocess, debug_name, file_name):
+        """OCR pages one after another in this process, yielding (page_number, page)"""
+        for page_number, image in numbered_pages:
+            try:
+                layout, report = self._ocr_page(image, preprocess, debug_name=debug_name(page_number))
+            except Exception as e:
+                print(f"[!] Error processing page {page_number} of {file_name}: {e}")
+                raise
+
+            yield page_number, self._page_dict(layout, report)
+
+    @staticmethod
+    def _page_dict(layout, report):
+        """Per-page result shared by the serial path and pool workers"""
+        return {
+            "has_result": bool(len(layout)),
+            "text": layout.text,
+            "layout": layout,
+            "preprocess": report
+        }
+
+    @staticmethod
+    def _total_preprocess_ms(page_details):
+        """Sum of stage timings over all pages"""
+        total = 0.0
+        for detail in page_details:
+            report = detail.get("preprocess") or {}
+            total += report.get("total_ms", 0.0)
+        return round(total, 2)
+
+    def _ocr_page(self, image, preprocess=True, debug_name=None):
+        """
+        OCR one in-memory page
+
+        Args:
+            image: BGR or grayscale numpy array
+            preprocess: Apply the preprocessing pipeline first
+            debug_name: File name for debug copies (only used with debug_images)
+
+        Returns:
+            tuple: (OCRLayout, preprocessing report or None)
+        """
+        if self.debug_images and debug_name:
+            self._save_debug_image(image, debug_name)
+
+        report = None
+        if preprocess:
+            image, report = self._preprocess_with_report(image)
+            if self.debug_images and debug_name:
+                self._save_debug_image(image, f"processed_{debug_name}")
+
+        # Note: cls parameter removed for compatibility with current PaddleOCR version
+        # The raw result holds input images and intermediate arrays; only the
+        # compact layout outlives this call
+        result = self.ocr.ocr(self._as_bgr(image))
+        return OCRLayout.from_ocr_result(result, with_boxes=self.build_layout), report
+
+    @staticmethod
+    def _as_bgr(image):
+        """PaddleOCR expects 3-channel BGR arrays (what cv2.imread would give)"""
+        if image.ndim == 2:
+            return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        return image
+
+    def _save_debug_image(self, image, name):
+        """Write a page image to the cache directory for inspection"""
+        path = self.cache_dir / name
+        if not cv2.imwrite(str(path), image):
+            print(f"[!] Failed to write debug image: {path}")
+            return
+        self._record_artifact(path)
+
+    def _record_artifact(self, path):
+        """Track an intermediate image in the cache manifest (budget, TTL, stats)"""
+        try:
+            self.result_cache.manifest.record(f"artifact:{Path(path).name}", path, kind="artifact")
+        except OSError as e:
+            print(f"[!] Could not record cache file {path}: {e}")
+
+    def _load_pages(self, file_path):
+        """
+        Decode a document into a list of page arrays (BGR, or grayscale for PDFs)
+        (holds every page at once; the OCR path streams via _open_pages)
+        """
+        _, numbered_pages = self._open_pages(file_path)
+        return [image for _, image in numbered_pages]
+
+    def _open_pages(self, file_path, page_numbers=None, render_info=None):
+        """
+        Open a document for lazy page decoding
+
+        Args:
+            file_path: Document path
+            page_numbers: Optional 1-based page numbers to decode (default: all)
+            render_info: Optional dict, filled with the PDF render settings used
+
+        Returns:
+            tuple: (total page count, iterator of (page_number, image array));
+                   images are BGR, PDF pages are rendered straight to grayscale.
+                   Multi-frame TIFF/GIF files count one page per frame.
+        """
+        file_path = Path(file_path)
+        if file_path.suffix.lower() == '.pdf':
+            info = self._pdf_info(file_path)
+            page_count = self._pdf_page_count(file_path, info)
+            render = self._plan_render(file_path, info, page_count, page_numbers)
+            if render_info is not None:
+                render_info.update(render)
+            return page_count, self._iter_pdf_pages(file_path, page_count, page_numbers, render)
+        frame_count = self._image_frame_count(file_path)
+        if frame_count > 1:
+            return frame_count, self._iter_image_frames(file_path, frame_count, page_numbers)
+        return 1, self._iter_image_pages(file_path, page_numbers)
+
+    @staticmethod
+    def _image_frame_count(file_path):
+        """Frames in a multi-frame image (fax TIFFs, animated GIFs); 1 otherwise"""
+        try:
+            with Image.open(file_path) as pil_image:
+                return max(1, getattr(pil_image, "n_frames", 1))
+        except Exception:
+            return 1  # Left to the single-image decoder to report
+
+    def _iter_image_frames(self, file_path, frame_count, page_numbers=None):
+        """
+        Decode frames one at a time, yielding (page_number, image array)
+
+        PIL only decodes the frame it is positioned on, so memory is bounded by
+        one frame (plus pages in flight) however many frames the file has.
+        Bilevel and grayscale frames stay single-channel.
+        """
+        selected = range(1, frame_count + 1) if page_numbers is None else sorted(set(page_numbers))
+        with Image.open(file_path) as pil_image:
+            for page_number in selected:
+                if not 1 <= page_number <= frame_count:
+                    continue
+                pil_image.seek(page_number - 1)
+                yield page_number, self._pil_to_array(pil_image)
+
+    def _iter_image_pages(self, file_path, page_numbers=None):
+        """Decode a single-frame image"""
+        if page_numbers is not None and 1 not in page_numbers:
+            return
+        image = cv2.imread(str(file_path))
+        if image is None:
+            # Formats OpenCV cannot decode (e.g. GIF) go through PIL
+            with Image.open(file_path) as pil_image:
+                image = self._pil_to_bgr(pil_image)
+        yield 1, image
+
+    @staticmethod
+    def _pil_to_bgr(pil_image):
+        """Convert a PIL image to a BGR numpy array"""
+        rgb = np.asarray(pil_image.convert("RGB"))
+        return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+    @classmethod
+    def _pil_to_array(cls, pil_image):
+        """Grayscale PIL pages stay single-channel (1/3 the bytes); others become BGR"""
+        if pil_image.mode == "L":
+            return np.array(pil_image)
+        if pil_image.mode == "1":
+            return np.array(pil_image.convert("L"))
+        return cls._pil_to_bgr(pil_image)
+
+    @staticmethod
+    def _import_pdf2image():
+        """Return the pdf2image module, or None with install hints"""
+        try:
+            import pdf2image
+            return pdf2image
+        except ImportError:
+            print("[!] pdf2image not installed. Run: pip install pdf2image")
+            print("[!] Also ensure poppler is installed:")
+            print("    Windows: choco install poppler")
+            print("    Mac: brew install poppler")
+            print("    Linux: apt-get install poppler-utils")
+            return None
+
+    def _pdf_info(self, pdf_path):
+        """pdfinfo output as a dict ({} if it cannot be read)"""
+        pdf2image = self._import_pdf2image()
+        if pdf2image is None:
+            return {}
+        try:
+            return pdf2image.pdfinfo_from_path(str(pdf_path))
+        except Exception as e:
+            print(f"[!] Error reading PDF info: {e}")
+            return {}
+
+    def _pdf_page_count(self, pdf_path, info=None):
+        """Number of pages in a PDF (0 if it cannot be read)"""
+        if info is None:
+            info = self._pdf_info(pdf_path)
+        try:
+            return int(info.get("Pages", 0))
+        except (TypeError, ValueError):
+            return 0
+
+    @staticmethod
+    def _page_size_pts(info):
+        """(width, height) in points from pdfinfo's "Page size", or None"""
+        match = re.match(r"\s*([\d.]+) x ([\d.]+) pts", str(info.get("Page size", "")))
+        if not match:
+            return None
+        return float(match.group(1)), float(match.group(2))
+
+    def _plan_render(self, pdf_path, info, page_count, page_numbers=None):
+        """
+        Pick the render DPI for a document
+
+        "auto": render the first selected page at PROBE_DPI, measure the
+        median glyph height and choose the lowest DPI whose glyphs are within
+        RESCALE_TOLERANCE of target_glyph_px (so the rescale stage has
+        nothing left to do).
+        Falls back to DEFAULT_RENDER_DPI when nothing glyph-like is found.
+        The DPI is clamped to MIN/MAX_RENDER_DPI and to MAX_RENDER_SIDE_PX
+        for the page size. Pages are always rendered in grayscale.
+
+        Returns:
+            dict: {"dpi", "dpi_source", "grayscale", "thread_count",
+                   "page_size_pts", "probe_glyph_px"}
+        """
+        page_size = self._page_size_pts(info)
+        render = {
+            "dpi": DEFAULT_RENDER_DPI,
+            "dpi_source": "default",
+            "grayscale": True,
+            "thread_count": self.render_threads,
+            "page_size_pts": list(page_size) if page_size else None,
+            "probe_glyph_px": None
+        }
+
+        if str(self.render_dpi).lower() != "auto":
+            render["dpi"] = int(self.render_dpi)
+            render["dpi_source"] = "fixed"
+            return render
+
+        if self.target_glyph_px and page_count:
+            probe_page = min(page_numbers) if page_numbers else 1
+            glyph_px = self._probe_glyph_height(pdf_path, probe_page)
+            if glyph_px:
+                render["probe_glyph_px"] = glyph_px
+                # Lowest DPI whose glyphs the rescale stage accepts without resampling
+                min_glyph_px = self.target_glyph_px / RESCALE_TOLERANCE
+                render["dpi"] = int(round(min_glyph_px * PROBE_DPI / glyph_px / 10.0) * 10)
+                render["dpi_source"] = "glyph"
+
+        dpi = min(MAX_RENDER_DPI, max(MIN_RENDER_DPI, render["dpi"]))
+        if page_size:
+            max_side_dpi = int(MAX_RENDER_SIDE_PX * 72 / max(page_size))
+            if max_side_dpi < dpi:
+                dpi = max_side_dpi
+                render["dpi_source"] += "+page_size"
+        render["dpi"] = dpi
+        return render
+
+    def _probe_glyph_height(self, pdf_path, page_number):
+        """Median glyph height (px at PROBE_DPI) of one page, or None"""
+        pdf2image = self._import_pdf2image()
+        if pdf2image is None:
+            return None
+        try:
+            probe = pdf2image.convert_from_path(
+                str(pdf_path), dpi=PROBE_DPI, first_page=page_number, last_page=page_number,
+                grayscale=True
+            )
+        except Exception as e:
+            print(f"[!] PDF probe render failed: {e}")
+            return None
+        if not probe:
+            return None
+        return self._estimate_glyph_height(np.asarray(probe[0]))
+
+    def _iter_pdf_pages(self, pdf_path, page_count, page_numbers=None, render=None):
+        """
+        Rasterize a PDF in windows of render_window pages
+        Only one window of PIL images is alive at a time
+        """
+        pdf2image = self._import_pdf2image()
+        if pdf2image is None or page_count == 0:
+            return
+        render = render or {"dpi": DEFAULT_RENDER_DPI, "grayscale": True,
+                            "thread_count": self.render_threads}
+
+        for first_page, last_page in self._page_windows(page_count, page_numbers):
+            try:
+                window = pdf2image.convert_from_path(
+                    str(pdf_path), first_page=first_page, last_page=last_page,
+                    dpi=render["dpi"], grayscale=render["grayscale"],
+                    thread_count=min(render["thread_count"], last_page - first_page + 1)
+                )
+            except Exception as e:
+                print(f"[!] Error converting PDF pages {first_page}-{last_page}: {e}")
+                return
+
+            for offset in range(len(window)):
+                image = self._pil_to_array(window[offset])
+                window[offset] = None  # release the PIL page as soon as it is converted
+                yield first_page + offset, image
+
+    def _page_windows(self, page_count, page_numbers=None):
+        """
+        Split the selected pages into (first_page, last_page) render windows
+        of consecutive pages, at most render_window pages each
+        """
+        if page_numbers is None:
+            selected = list(range(1, page_count + 1))
+        else:
+            selected = sorted(n for n in set(page_numbers) if 1 <= n <= page_count)
+
+        windows = []
+        for page_number in selected:
+            if windows and page_number == windows[-1][1] + 1 \
+                    and windows[-1][1] - windows[-1][0] + 1 < self.render_window:
+                windows[-1][1] = page_number
+            else:
+                windows.append([page_number, page_number])
+        return [tuple(window) for window in windows]
+
+    def _pdf_to_images(self, pdf_path, name_prefix=None):
         """
         Convert PDF to images for OCR processing
         Returns list of image paths
@@ -133,9 +897,11 @@ class OCRProcessor:
             images = convert_from_path(pdf_path)
             image_paths = []
 
+            prefix = name_prefix or Path(pdf_path).stem
             for i, img in enumerate(images):
-                img_path = self.cache_dir / f"{Path(pdf_path).stem}_page_{i+1}.png"
+                img_path = self.cache_dir / f"{prefix}_page_{i+1}.png"
                 img.save(img_path)
+                self._record_artifact(img_path)
                 image_paths.append(str(img_path))
 
             return image_paths
@@ -143,13 +909,10 @@ class OCRProcessor:
             print(f"[!] Error converting PDF: {e}")
             return []
 
-    def _preprocess_image(self, img_path):
+    def _preprocess_image(self, img_path, name_prefix=None):
         """
-        Preprocess image for better OCR accuracy
-        - Enhance contrast
-        - Upscale if low resolution
-        - Denoise
-        - Binarize
+        Preprocess an image file and write the result to the cache directory
+        Returns the processed image path (file-based variant of _preprocess_array)
         """
         try:
             img = cv2.imread(str(img_path))
@@ -158,216 +921,357 @@ class OCRProcessor:
                 print(f"[!] Could not read image: {img_path}")
                 return str(img_path)
 
-            # Convert to grayscale
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-            # Apply CLAHE (Contrast Limited Adaptive Histogram Equalization)
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-            enhanced = clahe.apply(gray)
-
-            # Denoise
-            denoised = cv2.fastNlMeansDenoising(enhanced)
-
-            # Binarize (Otsu's method)
-            _, binary = cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-
-            # Upscale if needed (< 300 DPI equivalent)
-            h, w = binary.shape
-            if h < 1000 or w < 1000:
-                scale = 2.0
-                binary = cv2.resize(binary, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+            binary = self._preprocess_array(img)
 
             # Save preprocessed image
-            processed_path = self.cache_dir / f"processed_{Path(img_path).name}"
+            name = Path(img_path).name
+            if name_prefix and not name.startswith(name_prefix):
+                name = f"{name_prefix}_{name}"
+            processed_path = self.cache_dir / f"processed_{name}"
             success = cv2.imwrite(str(processed_path), binary)
 
             if not success:
                 print(f"[!] Failed to write preprocessed image: {processed_path}")
                 return str(img_path)
+            self._record_artifact(processed_path)
 
             return str(processed_path)
         except Exception as e:
             print(f"[!] Preprocessing error: {e}. Using original image.")
             return str(img_path)
 
-    def _parse_ocr_result(self, result):
-        """Parse PaddleOCR result into plain text"""
-        if not result:
-            return ""
+    def _preprocess_array(self, img):
+        """
+        Preprocess an in-memory image for better OCR accuracy
+        Returns a grayscale array (the input unchanged on failure)
+        """
+        image, _ = self._preprocess_with_report(img)
+        return image
+
+    def _preprocess_with_report(self, img):
+        """
+        Preprocess an in-memory image, running only the stages it needs
+        - Downscale if glyphs are larger than needed (before the costly stages)
+        - Enhance contrast (CLAHE)
+        - Denoise (non-local means, the expensive stage)
+        - Binarize (Otsu)
+        - Upscale if glyphs are too small to read
 
-        text_lines = []
+        Returns:
+            tuple: (grayscale array, report dict with the quality check,
+                    per-stage {"ran": bool, "ms": float} and total_ms)
+        """
+        report = {"mode": self.preprocess_mode, "stages": {}}
+        start = time.perf_counter()
         try:
-            # PaddleOCR (PaddleX) returns OCRResult objects
-            for page in result:
-                if page:
-                    # Check if it's an OCRResult object with 'rec_texts' attribute
-                    if hasattr(page, 'str') and isinstance(page.str, dict):
-                        # PaddleX OCRResult structure
-                        rec_texts = page.str.get('res', {}).get('rec_texts', [])
-                        text_lines.extend(rec_texts)
-                    elif isinstance(page, list):
-                        # Legacy structure: list of [bbox, (text, conf)]
-                        for line in page:
-                            if line and len(line) >= 2:
-                                text_lines.append(line[1][0])
-        except (IndexError, TypeError, KeyError) as e:
-            print(f"[!] OCR parse warning: {e}")
-            return ""
+            # Convert to grayscale
+            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
 
-        return "\n".join(text_lines)
+            stage_start = time.perf_counter()
+            quality = self._assess_image(img, gray)
+            report["quality"] = quality
+            report["assess_ms"] = round((time.perf_counter() - stage_start) * 1000, 2)
+            plan = self._plan_preprocessing(quality)
 
-    def _calculate_confidence(self, results):
+            report["scale"] = plan["scale"]
+
+            def run_stage(name, func, image):
+                stage_start = time.perf_counter()
+                if plan[name]:
+                    image = func(image)
+                report["stages"][name] = {
+                    "ran": plan[name],
+                    "ms": round((time.perf_counter() - stage_start) * 1000, 2)
+                }
+                return image
+
+            def resize(image):
+                interpolation = cv2.INTER_AREA if plan["scale"] < 1.0 else cv2.INTER_CUBIC
+                return cv2.resize(image, None, fx=plan["scale"], fy=plan["scale"],
+                                  interpolation=interpolation)
+
+            # Shrink oversized pages first so every later stage sees fewer pixels
+            image = run_stage("downscale", resize, gray)
+
+            # Apply CLAHE (Contrast Limited Adaptive Histogram Equalization)
+            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+            image = run_stage("clahe", clahe.apply, image)
+            image = run_stage("denoise", cv2.fastNlMeansDenoising, image)
+            image = run_stage("binarize", lambda im: cv2.threshold(
+                im, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1], image)
+
+            # Enlarge small text last (cheaper than denoising the larger image)
+            image = run_stage("upscale", resize, image)
+            report["output_pixels"] = int(image.shape[0] * image.shape[1])
+        except Exception as e:
+            print(f"[!] Preprocessing error: {e}. Using original image.")
+            report["error"] = str(e)
+            image = img
+
+        report["total_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return image, report
+
+    def _assess_image(self, img, gray):
         """
-        Calculate overall confidence score
-        Based on individual character confidences
+        Cheap image-quality check used to plan preprocessing
+
+        Returns:
+            dict: {
+                "width", "height": pixels,
+                "noise_sigma": estimated noise std-dev in flat regions (grey levels),
+                "contrast": paper minus ink mean grey level,
+                "colours": distinct colours after quantizing a thumbnail
+            }
         """
-        if not results:
+        h, w = gray.shape[:2]
+
+        # Work on a thumbnail for the global stats and a full-resolution
+        # centre crop for noise (downscaling would average the noise away)
+        thumb_scale = min(1.0, 512.0 / max(h, w))
+        thumb = cv2.resize(img, None, fx=thumb_scale, fy=thumb_scale,
+                           interpolation=cv2.INTER_AREA) if thumb_scale < 1.0 else img
+        thumb_gray = cv2.cvtColor(thumb, cv2.COLOR_BGR2GRAY) if thumb.ndim == 3 else thumb
+
+        # Ink vs paper: mean grey level on each side of the Otsu threshold
+        # (percentiles would only see paper, text covers a few % of a page)
+        threshold, _ = cv2.threshold(thumb_gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        dark = thumb_gray[thumb_gray <= threshold]
+        light = thumb_gray[thumb_gray > threshold]
+        contrast = float(light.mean() - dark.mean()) if dark.size and light.size else 0.0
+
+        if thumb.ndim == 3:
+            quantized = (thumb >> 3).reshape(-1, 3).astype(np.int32)
+            packed = (quantized[:, 0] << 10) | (quantized[:, 1] << 5) | quantized[:, 2]
+        else:
+            packed = (thumb >> 3).ravel()
+        colours = int(np.unique(packed).size)
+
+        glyph_height = self._estimate_glyph_height(gray) if self.target_glyph_px else None
+
+        return {
+            "width": int(w),
+            "height": int(h),
+            "noise_sigma": round(self._estimate_noise(gray), 2),
+            "contrast": round(contrast, 1),
+            "colours": colours,
+            "glyph_height": glyph_height
+        }
+
+    @staticmethod
+    def _estimate_glyph_height(gray, max_side=1600):
+        """
+        Median text glyph height in pixels from connected components
+
+        Runs on a copy downsampled to at most max_side pixels (heights are
+        scaled back). Returns None when too few glyph-like components are
+        found (blank pages, photos), so callers can fall back.
+        """
+        h, w = gray.shape[:2]
+        factor = min(1.0, float(max_side) / max(h, w))
+        small = cv2.resize(gray, None, fx=factor, fy=factor,
+                           interpolation=cv2.INTER_AREA) if factor < 1.0 else gray
+
+        # Dark text on light background becomes foreground
+        _, ink = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        if cv2.countNonZero(ink) > ink.size // 2:
+            ink = cv2.bitwise_not(ink)  # Light text on dark background
+
+        count, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+        if count <= 1:
+            return None
+        comp_w = stats[1:, cv2.CC_STAT_WIDTH]
+        comp_h = stats[1:, cv2.CC_STAT_HEIGHT]
+        area = stats[1:, cv2.CC_STAT_AREA]
+
+        # Drop specks, rules/underlines, table borders and images
+        max_h = small.shape[0] * 0.2
+        glyphs = (comp_h >= 3) & (comp_h <= max_h) & (area >= 6) \
+            & (comp_w <= comp_h * 4) & (comp_h <= comp_w * 8)
+        heights = comp_h[glyphs]
+        if heights.size < MIN_GLYPHS:
+            return None
+        return round(float(np.median(heights)) / factor, 1)
+
+    @staticmethod
+    def _estimate_noise(gray, crop=768):
+        """
+        Immerkaer's fast noise estimate over non-edge pixels of a centre crop
+        Text edges are masked out so sharp digital glyphs don't read as noise
+        """
+        h, w = gray.shape[:2]
+        y0, x0 = max(0, (h - crop) // 2), max(0, (w - crop) // 2)
+        patch = gray[y0:y0 + crop, x0:x0 + crop]
+        if patch.shape[0] < 3 or patch.shape[1] < 3:
             return 0.0
 
-        total_conf = 0.0
-        count = 0
+        kernel = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+        response = np.abs(cv2.filter2D(patch.astype(np.float32), -1, kernel))
 
-        try:
-            for page_result in results:
-                if page_result:
-                    # Check if it's a PaddleX OCRResult object (has 'str' attribute)
-                    if hasattr(page_result, 'str'):
-                        # PaddleX OCRResult structure
-                        res_dict = page_result.str
-                        if isinstance(res_dict, dict):
-                            rec_scores = res_dict.get('res', {}).get('rec_scores')
-                            if rec_scores is not None and len(rec_scores) > 0:
-                                # Handle numpy array
-                                import numpy as np
-                                if isinstance(rec_scores, np.ndarray):
-                                    total_conf += float(np.sum(rec_scores))
-                                    count += len(rec_scores)
-                                else:
-                                    total_conf += sum(rec_scores)
-                                    count += len(rec_scores)
-                    elif isinstance(page_result, list):
-                        # Legacy structure: list of [bbox, (text, conf)]
-                        for line in page_result:
-                            if line and isinstance(line, (list, tuple)) and len(line) >= 2:
-                                # line[1] should be tuple (text, conf)
-                                if isinstance(line[1], (list, tuple)) and len(line[1]) >= 2:
-                                    conf = line[1][1]  # Confidence score
-                                    total_conf += conf
-                                    count += 1
-        except (IndexError, TypeError, KeyError) as e:
-            import traceback
-            print(f"[!] Confidence calculation warning: {e}")
-            print(f"[!] Traceback: {traceback.format_exc()}")
+        edges = cv2.dilate(cv2.Canny(patch, 100, 200), np.ones((3, 3), np.uint8))
+        flat = response[edges == 0]
+        if flat.size == 0:
             return 0.0
+        return float(np.sqrt(np.pi / 2.0) * flat.mean() / 6.0)
+
+    def _plan_preprocessing(self, quality):
+        """
+        Decide which preprocessing stages to run for one image
+
+        Clean digital renders and screenshots (low noise, few colours, high
+        contrast) skip CLAHE and denoising; scans and photos get the full
+        pipeline. Binarization always runs. "full" mode runs every stage.
+        """
+        scale = self._plan_scale(quality)
+        rescale = {"scale": scale, "downscale": scale < 1.0, "upscale": scale > 1.0}
+        if self.preprocess_mode == "full":
+            return {"clahe": True, "denoise": True, "binarize": True, **rescale}
+
+        photographic = quality["colours"] > PHOTO_COLOUR_COUNT
+        return {
+            "clahe": quality["contrast"] < LOW_CONTRAST_SPREAD or photographic,
+            "denoise": quality["noise_sigma"] >= NOISE_SIGMA_THRESHOLD,
+            "binarize": True,
+            **rescale
+        }
+
+    def _plan_scale(self, quality):
+        """
+        Resize factor that brings the median glyph to target_glyph_px
+
+        Shrinks as well as enlarges; images already within RESCALE_TOLERANCE
+        of the target are left alone. Without a glyph estimate (or with
+        target_glyph_px = 0) the legacy rule applies: 2x under 1000px.
+        """
+        glyph_height = quality.get("glyph_height")
+        if not self.target_glyph_px or not glyph_height:
+            small = quality["height"] < MIN_SIDE_PX or quality["width"] < MIN_SIDE_PX
+            return 2.0 if small else 1.0
+
+        scale = self.target_glyph_px / glyph_height
+        if 1.0 / RESCALE_TOLERANCE <= scale <= RESCALE_TOLERANCE:
+            return 1.0
+        return round(min(MAX_SCALE, max(MIN_SCALE, scale)), 3)
+
+    def _parse_ocr_result(self, result):
+        """Parse PaddleOCR result (or an OCRLayout) into plain text"""
+        if not result:
+            return ""
+        if not isinstance(result, OCRLayout):
+            result = OCRLayout.from_ocr_result(result, with_boxes=False)
+        return result.text
 
-        return total_conf / count if count > 0 else 0.0
+    def _calculate_confidence(self, results):
+        """
+        Calculate overall confidence score
+        Mean recognition score over every line of every page
 
-    def extract_structured_data(self, file_path):
+        Args:
+            results: OCRLayout objects or raw PaddleOCR results, one per page
+        """
+        if not results:
+            return 0.0
+        return mean_confidence(
+            result if isinstance(result, OCRLayout) else OCRLayout.from_ocr_result(result, with_boxes=False)
+            for result in results
+        )
+
+    def extract_structured_data(self, file_path, preprocess=True, use_cache=True):
         """
         Extract structured data (tables, forms, key-value pairs)
-        Uses layout analysis
+        Text, layout and key-value pairs all come from one OCR pass
 
         Returns:
             dict: {
                 "success": bool,
                 "tables": list,
                 "key_value_pairs": dict,
-                "layout": list
+                "layout": list,
+                "text": str,
+                "confidence": float,
+                "metadata": dict
             }
         """
-        # Advanced: Use PaddleOCR layout analysis
-        # This is a placeholder for future enhancement
-        result = self.extract_text(file_path, preprocess=True)
+        result = self.extract_text(file_path, preprocess=preprocess, use_cache=use_cache, key_values=True)
 
         if not result["success"]:
             return {
                 "success": False,
                 "tables": [],
                 "key_value_pairs": {},
-                "layout": []
+                "layout": [],
+                "text": "",
+                "confidence": 0.0,
+                "metadata": {}
             }
 
-        # Simple key-value extraction from text
-        key_value_pairs = self._extract_key_value_pairs(result["text"])
-
         return {
             "success": True,
             "tables": [],  # Future: implement table detection
-            "key_value_pairs": key_value_pairs,
-            "layout": result["structured_data"]
+            "key_value_pairs": result["key_value_pairs"],
+            "layout": result["structured_data"],
+            "text": result["text"],
+            "confidence": result["confidence"],
+            "metadata": result["metadata"]
         }
 
-    def _extract_key_value_pairs(self, text):
-        """
-        Extract key-value pairs from text
-        Looks for patterns like "Key: Value" or "Key = Value"
-        """
-        key_value_pairs = {}
-        lines = text.split("\n")
-
-        for line in lines:
-            # Pattern: "Key: Value" or "Key = Value"
-            if ':' in line:
-                parts = line.split(':', 1)
-                if len(parts) == 2:
-                    key = parts[0].strip()
-                    value = parts[1].strip()
-                    if key and value:
-                        key_value_pairs[key] = value
-            elif '=' in line:
-                parts = line.split('=', 1)
-                if len(parts) == 2:
-                    key = parts[0].strip()
-                    value = parts[1].strip()
-                    if key and value:
-                        key_value_pairs[key] = value
-
-        return key_value_pairs
+    def close(self):
+        """Stop OCR worker processes (if a pool was started) and the cache evictor"""
+        if self.pool is not None:
+            self.pool.shutdown()
+        self.result_cache.stop_evictor()
 
     def clear_cache(self):
-        """Clear OCR cache directory"""
-        count = 0
-        for file in self.cache_dir.glob("*"):
-            if file.is_file():
-                file.unlink()
-                count += 1
+        """Clear OCR cache directory (intermediate images and cached results)"""
+        count = self.result_cache.clear()
+        count += len(self.result_cache.manifest.clear(kind="artifact"))
+
+        # Images written before the manifest existed
+        for file in self.cache_dir.glob("*.png"):
+            file.unlink()
+            count += 1
         return count
 
     def get_cache_size(self):
-        """Get cache directory size in MB"""
-        total_size = sum(f.stat().st_size for f in self.cache_dir.glob("*") if f.is_file())
-        return total_size / (1024 * 1024)
+        """Get cache size in MB (from the manifest totals, no directory walk)"""
+        return self.result_cache.manifest.totals()["bytes"] / (1024 * 1024)
 
     def get_cache_stats(self):
-        """Get detailed cache statistics"""
-        files = list(self.cache_dir.glob("*"))
-        file_count = len([f for f in files if f.is_file()])
-        total_size = sum(f.stat().st_size for f in files if f.is_file())
-
+        """Get detailed cache statistics (from the manifest totals, no directory walk)"""
+        totals = self.result_cache.manifest.totals()
         return {
-            "file_count": file_count,
-            "total_size_mb": total_size / (1024 * 1024),
-            "cache_dir": str(self.cache_dir)
+            "file_count": totals["entries"],
+            "total_size_mb": totals["bytes"] / (1024 * 1024),
+            "cache_dir": str(self.cache_dir),
+            "result_cache": self.result_cache.get_stats()
         }
 
 
+# Shared processor: PaddleOCR models are loaded once per process
+_shared_processor = None
+
+
+def get_processor():
+    """Return the process-wide OCRProcessor, creating it on first use"""
+    global _shared_processor
+    if _shared_processor is None:
+        _shared_processor = OCRProcessor()
+    return _shared_processor
+
+
 # Convenience functions
 def extract_text(file_path):
     """Quick text extraction"""
-    processor = OCRProcessor()
-    return processor.extract_text(file_path)
+    return get_processor().extract_text(file_path)
 
 
 def extract_from_image(image_path):
     """Image-specific extraction"""
-    processor = OCRProcessor()
-    return processor.extract_text(image_path, preprocess=True)
+    return get_processor().extract_text(image_path, preprocess=True)
 
 
 def extract_from_pdf(pdf_path):
     """PDF-specific extraction"""
-    processor = OCRProcessor()
-    return processor.extract_text(pdf_path, preprocess=True)
+    return get_processor().extract_text(pdf_path, preprocess=True)
 
 
 # CLI Testing interface
@@ -375,11 +1279,19 @@ if __name__ == "__main__":
     import sys
 
     if len(sys.argv) < 2:
-        print("Usage: python ocr_processor.py <file_path>")
+        print("Usage: python ocr_processor.py <file_path> [--stream]")
         sys.exit(1)
 
     file_path = sys.argv[1]
 
+    if "--stream" in sys.argv[2:]:
+        # Print each page as soon as it is OCR'd
+        print(f"[+] Streaming pages from: {file_path}")
+        for page in get_processor().extract_text_iter(file_path):
+            print(f"\n--- Page {page['page']} (confidence: {page['confidence']:.2%}) ---")
+            print(page["text"])
+        sys.exit(0)
+
     print(f"[+] Extracting text from: {file_path}")
     result = extract_text(file_path)
 
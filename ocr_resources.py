@@ -0,0 +1,224 @@
+"""
+OCR CPU Resource Settings
+Thread caps, MKL-DNN (oneDNN) and CPU pinning for OCR processes
+
+Several OCR processes on one machine (watcher subprocesses, the OCR
+service, pool workers) each default to one math thread per core, so they
+oversubscribe the CPU and throughput drops. These settings cap threads
+per process, toggle Paddle's MKL-DNN kernels and optionally pin each pool
+worker to its own block of cores.
+
+Settings are read from a JSON file, then overridden by the environment:
+    workers          OCR_WORKERS          Pool worker processes (1 = serial)
+    worker_threads   OCR_WORKER_THREADS   Inference threads per worker (default: cores / workers)
+    cpu_threads      OCR_CPU_THREADS      Inference threads for the main process's model
+    enable_mkldnn    OCR_MKLDNN           1/0; unset keeps Paddle's default
+    pin_cpus         OCR_PIN_CPUS         1 = pin each worker to its own cores (Linux)
+
+The file is OCR_RESOURCE_CONFIG, else data/ocr_resources.json; write it by
+hand or with `python benchmark_ocr.py sweep --save`.
+"""
+
+import os
+import json
+import threading
+import multiprocessing.context
+from pathlib import Path
+
+DEFAULT_CONFIG_PATH = Path(__file__).parent / "data" / "ocr_resources.json"
+
+DEFAULTS = {
+    "workers": 1,
+    "worker_threads": None,
+    "cpu_threads": None,
+    "enable_mkldnn": None,
+    "pin_cpus": False
+}
+
+ENV_VARS = {
+    "workers": "OCR_WORKERS",
+    "worker_threads": "OCR_WORKER_THREADS",
+    "cpu_threads": "OCR_CPU_THREADS",
+    "enable_mkldnn": "OCR_MKLDNN",
+    "pin_cpus": "OCR_PIN_CPUS"
+}
+
+# Read by OpenMP/MKL/OpenBLAS when Paddle and NumPy load, so they must be
+# set before ocr_processor is imported (see thread_capped_context)
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+def config_path():
+    """Settings file location (OCR_RESOURCE_CONFIG, else data/ocr_resources.json)"""
+    return Path(os.environ.get("OCR_RESOURCE_CONFIG") or DEFAULT_CONFIG_PATH)
+
+
+def _parse(key, value):
+    """Convert a file or environment value to the setting's type"""
+    if value is None:
+        return None
+    if key in ("enable_mkldnn", "pin_cpus"):
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        return bool(value)
+    return max(1, int(value))
+
+
+def load_resource_config(path=None):
+    """
+    Resolve resource settings: defaults < settings file < environment
+
+    Args:
+        path: Settings file (defaults to config_path())
+
+    Returns:
+        dict: Keys of DEFAULTS
+    """
+    config = dict(DEFAULTS)
+    path = Path(path) if path else config_path()
+    if path.exists():
+        try:
+            file_config = json.loads(path.read_text(encoding="utf-8"))
+            for key in DEFAULTS:
+                if key in file_config:
+                    config[key] = _parse(key, file_config[key])
+        except (OSError, ValueError, TypeError) as e:
+            print(f"[!] Ignoring unreadable OCR resource config {path}: {e}")
+
+    for key, var in ENV_VARS.items():
+        value = os.environ.get(var)
+        if value:
+            config[key] = _parse(key, value)
+    return config
+
+
+def save_resource_config(config, path=None):
+    """Write settings (only keys of DEFAULTS) to the settings file"""
+    path = Path(path) if path else config_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({key: config.get(key, DEFAULTS[key]) for key in DEFAULTS}, f, indent=2)
+    return path
+
+
+def engine_options(cpu_threads=None, enable_mkldnn=None):
+    """PaddleOCR keyword arguments for thread count and MKL-DNN (only those set)"""
+    options = {}
+    if cpu_threads:
+        options["cpu_threads"] = int(cpu_threads)
+    if enable_mkldnn is not None:
+        options["enable_mkldnn"] = bool(enable_mkldnn)
+    return options
+
+
+def cap_threads(threads):
+    """
+    Cap math-library and OpenCV threads for this process
+
+    The environment variables only reach libraries loaded after this call;
+    OpenMP/MKL/OpenBLAS already loaded keep their thread count. Start
+    worker processes with thread_capped_context so the caps are in place
+    before anything imports NumPy or Paddle.
+    """
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+
+    import cv2
+    cv2.setNumThreads(threads)
+
+
+# Serializes the environment swap in _ThreadCappedProcess.start
+_spawn_lock = threading.Lock()
+
+
+class _ThreadCappedProcess(multiprocessing.context.SpawnProcess):
+    """Spawned process whose environment carries the thread caps from the start"""
+
+    threads = None
+
+    def start(self):
+        # The child copies this process's environment when it is created, so
+        # set the caps only for the duration of the launch
+        with _spawn_lock:
+            saved = {var: os.environ.get(var) for var in THREAD_ENV_VARS}
+            os.environ.update({var: str(self.threads) for var in THREAD_ENV_VARS})
+            try:
+                super().start()
+            finally:
+                for var, value in saved.items():
+                    if value is None:
+                        os.environ.pop(var, None)
+                    else:
+                        os.environ[var] = value
+
+
+class _ThreadCappedContext(multiprocessing.context.SpawnContext):
+
+    def __init__(self, threads):
+        self.threads = threads
+
+    def Process(self, *args, **kwargs):
+        process = _ThreadCappedProcess(*args, **kwargs)
+        process.threads = self.threads
+        return process
+
+
+def thread_capped_context(threads):
+    """
+    Spawn multiprocessing context whose processes start with thread caps set
+
+    The caps are in each child's environment before its interpreter
+    imports anything (including the parent's main module, which may import
+    Paddle), so OpenMP/MKL/OpenBLAS initialize with them. This process's
+    environment is left as it was.
+
+    Args:
+        threads: Math-library threads per child
+
+    Returns:
+        multiprocessing context (pass as mp_context to ProcessPoolExecutor)
+    """
+    return _ThreadCappedContext(max(1, int(threads)))
+
+
+def available_cpus():
+    """CPUs this process may run on, in order"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def cpu_blocks(workers, threads_per_worker, cpus=None):
+    """
+    Split CPUs into one contiguous block per worker
+
+    Blocks wrap around when workers x threads exceeds the CPU count, so
+    every worker still gets threads_per_worker CPUs (shared, not exclusive).
+
+    Returns:
+        list: One list of CPU ids per worker
+    """
+    cpus = list(cpus) if cpus is not None else available_cpus()
+    size = max(1, min(threads_per_worker, len(cpus)))
+    return [
+        [cpus[(slot * size + i) % len(cpus)] for i in range(size)]
+        for slot in range(workers)
+    ]
+
+
+def pin_to_cpus(cpus):
+    """Restrict this process to the given CPUs; False where unsupported"""
+    if not hasattr(os, "sched_setaffinity"):
+        print("[*] CPU pinning not supported on this platform")
+        return False
+    try:
+        os.sched_setaffinity(0, cpus)
+        return True
+    except OSError as e:
+        print(f"[!] CPU pinning failed: {e}")
+        return False
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Persistent PaddleOCR Worker Service
+Loads and warms the OCR models once per host, then serves extraction jobs
+over a local authenticated socket (multiprocessing.connection)
+
+Usage:
+    python ocr_service.py serve       # Run the worker in the foreground
+    python ocr_service.py stats       # Show cold-start and per-request latency
+    python ocr_service.py stop        # Ask a running worker to shut down
+    python ocr_service.py submit <file_path>
+
+Configuration (environment):
+    OCR_SERVICE_HOST     Bind/connect host (default: 127.0.0.1)
+    OCR_SERVICE_PORT     Bind/connect port (default: 47800)
+    OCR_SERVICE_AUTHKEY  Shared secret for the connection handshake (default:
+                         a random per-install key, see below)
+    OCR_SERVICE_KEY_FILE Where that key is kept (default: data/ocr_service.key)
+
+The connection unpickles what clients send (including the stop_when
+callable), so the handshake key is the only thing keeping other local
+processes out. There is no built-in default: the first `serve` generates a
+random key into a file only the owner can read (0600), and clients read
+it from there.
+"""
+
+import os
+import sys
+import time
+import secrets
+import threading
+from pathlib import Path
+from multiprocessing.connection import Listener, Client
+
+SERVICE_HOST = os.environ.get("OCR_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.environ.get("OCR_SERVICE_PORT", "47800"))
+SERVICE_KEY_FILE = Path(os.environ.get("OCR_SERVICE_KEY_FILE",
+                                       Path(__file__).parent / "data" / "ocr_service.key"))
+
+
+def service_authkey(create=False):
+    """
+    Connection secret: OCR_SERVICE_AUTHKEY if set, else the per-install key file
+
+    Args:
+        create: Generate the key file if it does not exist yet (the service does this)
+
+    Returns:
+        bytes: The key
+
+    Raises:
+        ConnectionError: No key configured and create is False (no service has run)
+    """
+    configured = os.environ.get("OCR_SERVICE_AUTHKEY")
+    if configured:
+        return configured.encode("utf-8")
+
+    if SERVICE_KEY_FILE.exists():
+        if create and os.name != 'nt' and SERVICE_KEY_FILE.stat().st_mode & 0o077:
+            os.chmod(SERVICE_KEY_FILE, 0o600)
+        return SERVICE_KEY_FILE.read_bytes().strip()
+    if not create:
+        raise ConnectionError(f"No OCR service key at {SERVICE_KEY_FILE} (start the service first)")
+
+    # Write the key privately under a temp name, then link it into place:
+    # a concurrent reader never sees an empty file, and the first writer wins
+    SERVICE_KEY_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = SERVICE_KEY_FILE.with_name(f".{SERVICE_KEY_FILE.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(secrets.token_hex(32).encode("ascii"))
+    try:
+        os.link(tmp_path, SERVICE_KEY_FILE)
+    except FileExistsError:
+        pass
+    finally:
+        os.unlink(tmp_path)
+    return SERVICE_KEY_FILE.read_bytes().strip()
+
+
+class OCRService:
+    """Long-lived OCR worker that owns a single warmed-up OCRProcessor"""
+
+    def __init__(self, address=None, authkey=None):
+        self.address = address or (SERVICE_HOST, SERVICE_PORT)
+        self.authkey = authkey
+        self.processor = None
+        self.listener = None
+
+        # Models are not thread-safe; jobs from concurrent clients run one at a time
+        self._ocr_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._running = False
+
+        self.stats = {
+            "started_at": None,
+            "cold_start_seconds": None,
+            "requests": 0,
+            "failures": 0,
+            "total_request_seconds": 0.0,
+            "first_request_seconds": None,
+            "last_request_seconds": None
+        }
+
+    def start(self):
+        """Load and warm the OCR models (the one-time cold start)"""
+        from ocr_processor import OCRProcessor
+
+        start = time.perf_counter()
+        print("[*] Loading PaddleOCR models...")
+        self.processor = OCRProcessor()
+        self._warm_up()
+        elapsed = time.perf_counter() - start
+
+        self.stats["started_at"] = time.time()
+        self.stats["cold_start_seconds"] = elapsed
+        print(f"[+] OCR service warm (cold start: {elapsed:.2f}s)")
+
+    def _warm_up(self):
+        """Run one inference so predictor initialization is paid before the first job"""
+        import numpy as np
+        import cv2
+
+        img = np.full((160, 640, 3), 255, dtype=np.uint8)
+        cv2.putText(img, "Ticket #1234567", (20, 100), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 3)
+        try:
+            self.processor.ocr.ocr(img)
+        except Exception as e:
+            print(f"[!] Warm-up inference failed (continuing): {e}")
+
+    def serve_forever(self):
+        """Accept client connections until a shutdown request arrives"""
+        if self.processor is None:
+            self.start()
+
+        if self.authkey is None:
+            self.authkey = service_authkey(create=True)
+        self.listener = Listener(self.address, authkey=self.authkey)
+        self._running = True
+        print(f"[+] OCR service listening on {self.address[0]}:{self.address[1]}")
+
+        try:
+            while self._running:
+                try:
+                    conn = self.listener.accept()
+                except OSError:
+                    # Listener closed by a shutdown request
+                    break
+                except Exception as e:
+                    print(f"[!] Rejected connection: {e}")
+                    continue
+
+                thread = threading.Thread(target=self._handle_connection, args=(conn,), daemon=True)
+                thread.start()
+        finally:
+            self._running = False
+            try:
+                self.listener.close()
+            except Exception:
+                pass
+            print("[*] OCR service stopped")
+
+    def _handle_connection(self, conn):
+        """Serve requests on one client connection"""
+        try:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    break
+
+                response = self._dispatch(request)
+                conn.send(response)
+
+                if request.get("op") == "shutdown":
+                    self._shutdown()
+                    break
+        finally:
+            conn.close()
+
+    def _dispatch(self, request):
+        """Route a single request dict to its handler"""
+        op = request.get("op")
+
+        if op == "ping":
+            return {"success": True, "pid": os.getpid()}
+        if op == "stats":
+            return {"success": True, "stats": self.get_stats()}
+        if op == "shutdown":
+            return {"success": True}
+        if op == "extract_text":
+            return self._extract_text(request)
+
+        return {"success": False, "error": f"Unknown operation: {op}"}
+
+    def _extract_text(self, request):
+        """Run OCR for one job and attach service latency details"""
+        received = time.perf_counter()
+
+        with self._ocr_lock:
+            started = time.perf_counter()
+            try:
+                result = self.processor.extract_text(
+                    request["file_path"],
+                    preprocess=request.get("preprocess", True),
+                    stop_when=request.get("stop_when"),
+                    pages=request.get("pages"),
+                    key_values=request.get("key_values", False)
+                )
+            except Exception as e:
+                result = {
+                    "success": False,
+                    "error": f"{type(e).__name__}: {e}",
+                    "confidence": 0.0,
+                    "text": "",
+                    "structured_data": [],
+                    "metadata": {}
+                }
+            finished = time.perf_counter()
+
+        request_seconds = finished - started
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            if not result.get("success"):
+                self.stats["failures"] += 1
+            self.stats["total_request_seconds"] += request_seconds
+            self.stats["last_request_seconds"] = request_seconds
+            if self.stats["first_request_seconds"] is None:
+                self.stats["first_request_seconds"] = request_seconds
+            request_number = self.stats["requests"]
+
+        result.setdefault("metadata", {})["service"] = {
+            "pid": os.getpid(),
+            "request_number": request_number,
+            "queue_seconds": started - received,
+            "request_seconds": request_seconds,
+            "cold_start_seconds": self.stats["cold_start_seconds"]
+        }
+        return result
+
+    def get_stats(self):
+        """Cold-start cost versus warm per-request latency"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+
+        requests = stats["requests"]
+        stats["avg_request_seconds"] = stats["total_request_seconds"] / requests if requests else None
+        stats["uptime_seconds"] = time.time() - stats["started_at"] if stats["started_at"] else 0.0
+        return stats
+
+    def _shutdown(self):
+        """Stop accepting connections"""
+        self._running = False
+        try:
+            self.listener.close()
+        except Exception:
+            pass
+
+
+class OCRServiceClient:
+    """
+    Client for a running OCRService
+
+    Mirrors OCRProcessor.extract_text so callers can use either interchangeably.
+    Raises ConnectionError if the service cannot be reached.
+    """
+
+    def __init__(self, address=None, authkey=None):
+        self.address = address or (SERVICE_HOST, SERVICE_PORT)
+        self.authkey = authkey
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            try:
+                self._conn = Client(self.address, authkey=self.authkey or service_authkey())
+            except Exception as e:
+                raise ConnectionError(f"OCR service not reachable at {self.address[0]}:{self.address[1]}: {e}")
+        return self._conn
+
+    def _request(self, payload):
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.send(payload)
+                return conn.recv()
+            except (EOFError, OSError) as e:
+                self.close()
+                raise ConnectionError(f"OCR service connection lost: {e}")
+
+    def is_available(self):
+        """Return True if a service answers a ping"""
+        try:
+            return self._request({"op": "ping"}).get("success", False)
+        except ConnectionError:
+            return False
+
+    def extract_text(self, file_path, preprocess=True, stop_when=None, pages=None, key_values=False):
+        """
+        Submit an extraction job; returns the OCRProcessor.extract_text result dict
+
+        stop_when is pickled by reference, so it must be a module-level
+        function the service can import (e.g. metadata_parser.required_fields_found).
+        """
+        start = time.perf_counter()
+        result = self._request({
+            "op": "extract_text",
+            "file_path": str(Path(file_path).resolve()),
+            "preprocess": preprocess,
+            "stop_when": stop_when,
+            "pages": list(pages) if pages is not None else None,
+            "key_values": key_values
+        })
+        service = result.setdefault("metadata", {}).setdefault("service", {})
+        service["round_trip_seconds"] = time.perf_counter() - start
+        return result
+
+    def get_stats(self):
+        """Fetch service statistics"""
+        return self._request({"op": "stats"}).get("stats", {})
+
+    def shutdown(self):
+        """Ask the service to stop"""
+        try:
+            self._request({"op": "shutdown"})
+        finally:
+            self.close()
+
+    def close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+
+def connect_if_running():
+    """Return a connected OCRServiceClient, or None if no service is running"""
+    client = OCRServiceClient()
+    if client.is_available():
+        return client
+    client.close()
+    return None
+
+
+def _print_stats(stats):
+    def fmt(value):
+        return f"{value:.3f}s" if isinstance(value, (int, float)) else "n/a"
+
+    print(f"Cold start:        {fmt(stats.get('cold_start_seconds'))}")
+    print(f"Requests:          {stats.get('requests', 0)} ({stats.get('failures', 0)} failed)")
+    print(f"First request:     {fmt(stats.get('first_request_seconds'))}")
+    print(f"Last request:      {fmt(stats.get('last_request_seconds'))}")
+    print(f"Avg warm request:  {fmt(stats.get('avg_request_seconds'))}")
+    print(f"Uptime:            {fmt(stats.get('uptime_seconds'))}")
+
+
+def main():
+    """CLI entry point"""
+    if len(sys.argv) < 2 or sys.argv[1] not in ("serve", "stats", "stop", "submit"):
+        print("Usage: python ocr_service.py serve|stats|stop|submit <file_path>")
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "serve":
+        service = OCRService()
+        try:
+            service.serve_forever()
+        except KeyboardInterrupt:
+            print("\n[*] Interrupted by user")
+        return
+
+    client = OCRServiceClient()
+    try:
+        if command == "stats":
+            _print_stats(client.get_stats())
+        elif command == "stop":
+            client.shutdown()
+            print("[+] Shutdown requested")
+        elif command == "submit":
+            if len(sys.argv) < 3:
+                print("Usage: python ocr_service.py submit <file_path>")
+                sys.exit(1)
+            result = client.extract_text(sys.argv[2])
+            service = result.get("metadata", {}).get("service", {})
+            if result.get("success"):
+                print(f"[+] Confidence: {result['confidence']:.2%}")
+                print(f"[+] Request: {service.get('request_seconds', 0.0):.3f}s "
+                      f"(round trip {service.get('round_trip_seconds', 0.0):.3f}s)")
+                print("\n--- Extracted Text ---")
+                print(result["text"])
+            else:
+                print(f"[!] Error: {result.get('error', 'Unknown error')}")
+                sys.exit(1)
+    except ConnectionError as e:
+        print(f"[!] {e}")
+        print("[*] Start the service with: python ocr_service.py serve")
+        sys.exit(1)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Perceptual Page Hashing
+Finds repeated pages (signatures, disclaimers, quoted headers) so their
+OCR result can be reused instead of recomputed
+
+A page signature is a 64-bit difference hash (dHash) for fast candidate
+lookup plus a small grayscale thumbnail. Two pages only count as the same
+when the hashes are close AND no region of the thumbnails differs, so a
+template page with a changed ticket number is never treated as a repeat.
+"""
+
+import hashlib
+import zlib
+import cv2
+import numpy as np
+
+HASH_SIZE = 8                   # dHash grid (64 bits)
+THUMB_WIDTH = 512               # Confirmation thumbnail width (a 9pt digit stays visible)
+MAX_HASH_DISTANCE = 6           # Hamming distance for a candidate match
+MAX_PIXEL_DIFF = 20             # Largest local grey-level difference allowed
+
+
+class PageSignature:
+    """dHash + thumbnail of one rendered page"""
+
+    __slots__ = ("dhash", "thumb")
+
+    def __init__(self, dhash, thumb):
+        self.dhash = dhash
+        self.thumb = thumb
+
+    @property
+    def key(self):
+        """Exact content key (quantized thumbnail) for cross-document caching"""
+        digest = hashlib.sha256()
+        digest.update(f"{self.thumb.shape}".encode("ascii"))
+        digest.update((self.thumb >> 4).tobytes())
+        return digest.hexdigest()
+
+
+def _gray(image):
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+
+def dhash(gray, size=HASH_SIZE):
+    """Difference hash: sign of horizontal gradients on a (size+1) x size grid"""
+    small = cv2.resize(gray, (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def page_signature(image):
+    """Signature of a page image (BGR or grayscale array)"""
+    gray = _gray(image)
+    h, w = gray.shape[:2]
+    thumb_h = max(1, int(round(h * THUMB_WIDTH / float(w))))
+    thumb = cv2.resize(gray, (THUMB_WIDTH, thumb_h), interpolation=cv2.INTER_AREA)
+    return PageSignature(dhash(gray), thumb)
+
+
+def hamming(a, b):
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count("1")
+
+
+def same_page(a, b):
+    """True if two signatures show the same page content"""
+    if hamming(a.dhash, b.dhash) > MAX_HASH_DISTANCE:
+        return False
+    if a.thumb.shape != b.thumb.shape:
+        return False
+    # Blur first so re-rendering noise is ignored but a changed word still shows
+    diff = cv2.absdiff(cv2.GaussianBlur(a.thumb, (3, 3), 0), cv2.GaussianBlur(b.thumb, (3, 3), 0))
+    return int(diff.max()) <= MAX_PIXEL_DIFF
+
+
+class PageDeduplicator:
+    """
+    Remembers the pages of one document and finds earlier copies
+
+    Thumbnails are kept zlib-compressed (a few KB for a clean render)
+    and only decompressed for pages whose hash is already close.
+    """
+
+    def __init__(self):
+        self._pages = []  # (dhash, compressed thumbnail, shape, page_number)
+
+    def find(self, signature):
+        """Page number of an earlier identical page, or None"""
+        for seen_hash, packed, shape, page_number in self._pages:
+            if hamming(signature.dhash, seen_hash) > MAX_HASH_DISTANCE or shape != signature.thumb.shape:
+                continue
+            thumb = np.frombuffer(zlib.decompress(packed), dtype=np.uint8).reshape(shape)
+            if same_page(signature, PageSignature(seen_hash, thumb)):
+                return page_number
+        return None
+
+    def add(self, signature, page_number):
+        thumb = signature.thumb
+        self._pages.append((signature.dhash, zlib.compress(thumb.tobytes(), 1), thumb.shape, page_number))
@@ -0,0 +1,82 @@
+"""
+PDF Text Layer Extraction
+Reads embedded text from digital PDFs so OCR only runs on image-only pages
+
+Uses poppler's pdftotext (already required by pdf2image), one call per
+document. Pages come back separated by form feeds.
+
+pdftotext runs in its default reading-order mode, not -layout: -layout
+keeps side-by-side columns on shared lines ("Company: X    Partner: Y"),
+and the metadata patterns read a value up to the end of its line.
+"""
+
+import shutil
+import subprocess
+from pathlib import Path
+
+# A page's text layer is used only if it has at least this much real text
+MIN_TEXT_CHARS = 20
+MIN_ALNUM_RATIO = 0.5       # Letters/digits among non-space characters
+MAX_REPLACEMENT_RATIO = 0.05  # U+FFFD / unmapped glyphs from broken font encodings
+
+
+def find_pdftotext():
+    """Path to the pdftotext binary, or None if poppler is not installed"""
+    return shutil.which("pdftotext")
+
+
+def extract_text_layer(pdf_path, first_page=None, last_page=None, timeout=30):
+    """
+    Extract the embedded text of each page
+
+    Args:
+        pdf_path: PDF file
+        first_page, last_page: Optional 1-based page range
+        timeout: Seconds before giving up (the caller then falls back to OCR)
+
+    Returns:
+        dict: {page_number: text} (empty if pdftotext is unavailable or fails)
+    """
+    pdftotext = find_pdftotext()
+    if pdftotext is None:
+        return {}
+
+    command = [pdftotext, "-enc", "UTF-8"]
+    if first_page:
+        command += ["-f", str(first_page)]
+    if last_page:
+        command += ["-l", str(last_page)]
+    command += [str(Path(pdf_path)), "-"]
+
+    try:
+        completed = subprocess.run(command, capture_output=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"[!] pdftotext failed: {e}")
+        return {}
+    if completed.returncode != 0:
+        return {}
+
+    text = completed.stdout.decode("utf-8", errors="replace")
+    # Every page ends with a form feed, so the last split is empty
+    page_texts = text.split("\f")[:-1] if text.endswith("\f") else text.split("\f")
+    start = first_page or 1
+    return {start + i: page_text for i, page_text in enumerate(page_texts)}
+
+
+def is_usable_text(text):
+    """
+    True if a page's text layer is real text rather than empty, a scanned
+    page's invisible OCR junk or a font with no Unicode mapping
+    """
+    chars = [c for c in text if not c.isspace()]
+    if len(chars) < MIN_TEXT_CHARS:
+        return False
+    alnum = sum(1 for c in chars if c.isalnum())
+    replacement = sum(1 for c in chars if c == "�" or not c.isprintable())
+    return (alnum / len(chars) >= MIN_ALNUM_RATIO
+            and replacement / len(chars) <= MAX_REPLACEMENT_RATIO)
+
+
+def text_layer_lines(text):
+    """Layout lines for a text-layer page: [bbox, text, score] with no bbox"""
+    return [[None, line.strip(), 1.0] for line in text.splitlines() if line.strip()]
@@ -19,6 +19,8 @@ from pathlib import Path
 from datetime import datetime, timedelta
 import importlib.util
 
+from ticket_log import read_records, summarize
+
 # Colors for terminal output (Windows compatible)
 class Colors:
     GREEN = '\033[92m'
@@ -144,22 +146,21 @@ def analyze_logs():
         return
 
     try:
-        with open(log_file, 'r') as f:
-            lines = f.readlines()
-
-        total_lines = len(lines)
-        recent_lines = lines[-100:] if len(lines) > 100 else lines
+        # Structured records (ticket_log); no scraping of message text
+        summary = summarize(read_records(log_file), recent=100)
+        levels = summary["levels"]
+        events = summary["events"]
 
-        # Count message types
-        info_count = sum(1 for line in recent_lines if "INFO" in line)
-        warning_count = sum(1 for line in recent_lines if "WARNING" in line)
-        error_count = sum(1 for line in recent_lines if "ERROR" in line)
+        info_count = levels.get("INFO", 0)
+        warning_count = levels.get("WARNING", 0)
+        error_count = levels.get("ERROR", 0)
 
-        # Find recent processing
-        processed_count = sum(1 for line in recent_lines if "Processing file:" in line)
-        success_count = sum(1 for line in recent_lines if "Metadata extracted" in line)
+        processed_count = events.get("ticket_started", 0)
+        success_count = events.get("ticket_succeeded", 0) + events.get("ticket_reused", 0)
+        failed_count = events.get("ticket_failed", 0)
 
-        print_status("Total Log Lines", "INFO", f"{total_lines}")
+        print_status("Total Log Records", "INFO", f"{summary['total']}")
+        print_status("Last Activity", "INFO", f"{summary['last_activity'] or 'never'}")
         print_status("Recent INFO", "OK", f"{info_count}")
         if warning_count > 0:
             print_status("Recent WARNINGS", "WARNING", f"{warning_count}")
@@ -173,6 +174,8 @@ def analyze_logs():
         print(f"\n{Colors.BOLD}Processing Stats:{Colors.END}")
         print_status("Files Processed", "INFO", f"{processed_count}")
         print_status("Successful Extractions", "INFO", f"{success_count}")
+        if failed_count > 0:
+            print_status("Failed Tickets", "WARNING", f"{failed_count}")
         if processed_count > 0:
             success_rate = (success_count / processed_count) * 100
             if success_rate >= 90:
@@ -203,18 +206,23 @@ def check_performance():
     except Exception as e:
         print_status("Disk Space", "ERROR", f"Failed to check: {e}")
 
-    # Check OCR cache size
+    # Check OCR cache size (manifest totals; the evictor enforces the budget)
     ocr_cache = Path("data/ocr_cache")
     if ocr_cache.exists():
         try:
-            cache_size = sum(f.stat().st_size for f in ocr_cache.rglob('*') if f.is_file())
-            cache_mb = cache_size / (1024 * 1024)
-            if cache_mb < 100:
-                print_status("OCR Cache Size", "OK", f"{cache_mb:.1f} MB")
-            elif cache_mb < 500:
-                print_status("OCR Cache Size", "WARNING", f"{cache_mb:.1f} MB - consider clearing")
+            from ocr_cache import read_manifest_totals, MANIFEST_NAME, DEFAULT_MAX_MB
+            budget_mb = float(os.environ.get("OCR_RESULT_CACHE_MB", DEFAULT_MAX_MB))
+            totals = read_manifest_totals(ocr_cache / MANIFEST_NAME)
+            if totals is None:
+                print_status("OCR Cache", "INFO", "No manifest yet (created on next OCR run)")
             else:
-                print_status("OCR Cache Size", "ERROR", f"{cache_mb:.1f} MB - CLEAR RECOMMENDED")
+                cache_mb = totals["total_size_mb"]
+                details = (f"{cache_mb:.1f} / {budget_mb:.0f} MB, {totals['entries']} entries, "
+                           f"hit rate {totals['hit_rate']:.0%}")
+                if cache_mb <= budget_mb:
+                    print_status("OCR Cache Size", "OK", details)
+                else:
+                    print_status("OCR Cache Size", "WARNING", f"{details} - over budget until next eviction pass")
         except Exception as e:
             print_status("OCR Cache", "ERROR", f"Failed to check: {e}")
     else:
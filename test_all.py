@@ -83,6 +83,19 @@ def main():
         # Component Tests
         ("OCR Verification", "verify_ocr.py"),
         ("OCR Test Suite", "test_ocr.py"),
+        ("OCR Result Cache", "test_ocr_cache.py"),
+        ("PDF Text Layer", "test_pdf_text_layer.py"),
+        ("OCR Layout", "test_ocr_layout.py"),
+        ("Page Hash", "test_page_hash.py"),
+        ("OCR Resource Settings", "test_ocr_resources.py"),
+        ("Key-Value Pairing", "test_ocr_key_values.py"),
+        ("Metadata Parser", "test_metadata_parser.py"),
+        ("Workflow Concurrency", "test_workflow_concurrency.py"),
+        ("Ticket Checkpoints", "test_ticket_checkpoint.py"),
+        ("Job Queue", "test_job_queue.py"),
+        ("Ticket Log", "test_ticket_log.py"),
+        ("Artifact Placement", "test_artifact_placement.py"),
+        ("Ticket Metadata", "test_ticket_metadata.py"),
 
         # Integration Tests
         ("Phase 0 Integration", "test_phase0.py"),
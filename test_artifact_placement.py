@@ -0,0 +1,248 @@
+"""
+Test script for artifact placement (reflink / hardlink / rename / copy)
+Tests method selection, fallbacks, atomic replacement and the workflow's recorded method
+"""
+
+import os
+import sys
+import time
+import errno
+import shutil
+import asyncio
+import tempfile
+from pathlib import Path
+
+import artifact_placement
+from artifact_placement import place_file
+
+
+def _leftovers(directory):
+    return list(Path(directory).glob(".*.place"))
+
+
+def test_link_or_clone():
+    """Same filesystem: no bytes copied; re-placing replaces cleanly"""
+    print("[+] Testing link/clone placement...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="placement_test_"))
+    try:
+        source = tmp_dir / "recording.mp4"
+        source.write_bytes(os.urandom(256 * 1024))
+        target = tmp_dir / "processing" / "ticket.mp4"
+        target.parent.mkdir()
+
+        method = place_file(source, target)
+        assert method in ("reflink", "hardlink"), f"Fell back to {method}"
+        assert target.read_bytes() == source.read_bytes()
+        if method == "hardlink":
+            assert target.stat().st_ino == source.stat().st_ino
+
+        # Placing again over an existing destination (rerun) leaves no temp files
+        assert place_file(source, target) == method
+        assert not _leftovers(target.parent)
+
+        # Files edited later: never a hardlink
+        editable = place_file(source, tmp_dir / "processing" / "editable.mp4", hardlink=False)
+        assert editable in ("reflink", "copy")
+        assert (tmp_dir / "processing" / "editable.mp4").stat().st_ino != source.stat().st_ino
+
+        print(f"[+] SUCCESS: Placed by {method}")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_fallbacks():
+    """Cross-device links fall back to a copy; moves rename; copy mode always copies"""
+    print("\n[+] Testing fallbacks...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="placement_fallback_test_"))
+    link = os.link
+    reflink = artifact_placement._reflink
+    try:
+        source = tmp_dir / "ticket.pdf"
+        source.write_bytes(b"%PDF-1.4 ticket")
+        os.utime(source, (1_700_000_000, 1_700_000_000))
+
+        def cross_device(*args):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+        os.link = cross_device
+        artifact_placement._reflink = lambda source, target: False
+        copied = tmp_dir / "copied.pdf"
+        copied.write_bytes(b"old contents")
+        assert place_file(source, copied) == "copy"
+        assert copied.read_bytes() == source.read_bytes()
+        assert copied.stat().st_mtime == source.stat().st_mtime, "Timestamps not preserved"
+        os.link = link
+        artifact_placement._reflink = reflink
+
+        os.environ["PHASE0_PLACEMENT"] = "copy"
+        assert place_file(source, tmp_dir / "forced.pdf") == "copy"
+        del os.environ["PHASE0_PLACEMENT"]
+
+        moved = tmp_dir / "moved.pdf"
+        assert place_file(copied, moved, move=True) == "rename"
+        assert not copied.exists() and moved.read_bytes() == source.read_bytes()
+        assert not _leftovers(tmp_dir)
+
+        print("[+] SUCCESS: Fallbacks work")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        os.link = link
+        artifact_placement._reflink = reflink
+        os.environ.pop("PHASE0_PLACEMENT", None)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_large_file_cost():
+    """Placing a large recording costs far less than copying it"""
+    print("\n[+] Testing large file placement...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="placement_large_test_"))
+    try:
+        source = tmp_dir / "recording.mp4"
+        with open(source, 'wb') as f:
+            for _ in range(64):
+                f.write(os.urandom(1024 * 1024))
+
+        start = time.perf_counter()
+        shutil.copy2(source, tmp_dir / "copy2.mp4")
+        copy_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        method = place_file(source, tmp_dir / "placed.mp4")
+        place_seconds = time.perf_counter() - start
+
+        print(f"[*] 64 MB: shutil.copy2 {copy_seconds * 1000:.1f} ms, {method} {place_seconds * 1000:.2f} ms")
+        assert place_seconds < copy_seconds / 5, "Placement not cheaper than a copy"
+
+        print("[+] SUCCESS: No duplicate I/O")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+class FakeOCR:
+    """Stand-in OCR engine"""
+
+    def extract_text(self, file_path, **kwargs):
+        text = "Ticket #13620086\nCompany: Singtech Inc\nTrading Partner: Staples"
+        return {"success": True, "text": text, "confidence": 0.93, "metadata": {"pages": 1}}
+
+    def close(self):
+        pass
+
+
+def test_workflow_records_method():
+    """metadata.json records how the ticket file was placed"""
+    print("\n[+] Testing workflow placement...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="placement_workflow_test_"))
+    try:
+        import json
+        from workflow import TicketWorkflow
+
+        workflow = TicketWorkflow(checkpoints=False)
+        workflow.processing_dir = tmp_dir / "processing"
+        workflow.failed_dir = tmp_dir / "failed"
+        workflow.log_file = tmp_dir / "media-analysis.log"
+        workflow.processing_dir.mkdir()
+        workflow.failed_dir.mkdir()
+        workflow._ocr = FakeOCR()
+
+        ticket = tmp_dir / "ticket.png"
+        ticket.write_bytes(b"png ticket")
+        result = asyncio.run(workflow.process_ticket(ticket))
+        assert result["success"]
+        with open(result["metadata_file"], 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        assert metadata["file_placement"] in artifact_placement.METHODS, metadata.get("file_placement")
+
+        failed_path, error_file = workflow._write_failure(ticket, "test failure")
+        with open(error_file, 'r', encoding='utf-8') as f:
+            assert json.load(f)["file_placement"] in artifact_placement.METHODS
+        assert failed_path.read_bytes() == ticket.read_bytes()
+
+        print(f"[+] SUCCESS: Ticket placed by {metadata['file_placement']}")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_redropped_ticket():
+    """Rewriting a ticket in incoming/ in place leaves the placed copies unchanged"""
+    print("\n[+] Testing a ticket dropped again under the same name...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="placement_redrop_test_"))
+    try:
+        from workflow import TicketWorkflow
+
+        workflow = TicketWorkflow(checkpoints=False)
+        workflow.processing_dir = tmp_dir / "processing"
+        workflow.failed_dir = tmp_dir / "incoming" / "failed"
+        workflow.log_file = tmp_dir / "media-analysis.log"
+        workflow.processing_dir.mkdir()
+        workflow.failed_dir.mkdir(parents=True)
+        workflow._ocr = FakeOCR()
+
+        ticket = tmp_dir / "incoming" / "t.png"
+        ticket.write_bytes(b"first ticket")
+        result = asyncio.run(workflow.process_ticket(ticket))
+        assert result["success"]
+        placed = next(Path(result["ticket_folder"]).glob("*.png"))
+        failed_path, _ = workflow._write_failure(ticket, "test failure")
+
+        # Same name, new bytes, same inode (like cp over an existing file)
+        with open(ticket, 'r+b') as f:
+            f.write(b"second ticket")
+            f.truncate()
+        assert placed.read_bytes() == b"first ticket", "Processed copy changed with incoming/"
+        assert failed_path.read_bytes() == b"first ticket", "Failed copy changed with incoming/"
+
+        print("[+] SUCCESS: Placed copies are independent of incoming/")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("="*60)
+    print("Artifact Placement Test Suite")
+    print("="*60)
+
+    results = [
+        ("Link Or Clone", test_link_or_clone()),
+        ("Fallbacks", test_fallbacks()),
+        ("Large File Cost", test_large_file_cost()),
+        ("Workflow Records Method", test_workflow_records_method()),
+        ("Re-dropped Ticket", test_redropped_ticket()),
+    ]
+
+    print("\n" + "="*60)
+    print("Test Results Summary")
+    print("="*60)
+
+    passed = sum(1 for _, result in results if result)
+    for test_name, result in results:
+        status = "[PASS]" if result else "[FAIL]"
+        print(f"{status} {test_name}")
+
+    print(f"\nPassed: {passed}/{len(results)}")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,295 @@
+"""
+Test script for the durable Phase 0 job queue
+Tests leases, retries, stage limits, backpressure, worker scaling and the Phase 0 stages
+"""
+
+import sys
+import time
+import shutil
+import tempfile
+from pathlib import Path
+
+from job_queue import JobQueue, QueueWorkers, Phase0Stages, STAGES
+
+
+def _queue(tmp_dir, **kwargs):
+    return JobQueue(tmp_dir / "queue.sqlite3", **kwargs)
+
+
+def _files(tmp_dir, count, suffix=".pdf"):
+    files = []
+    for number in range(count):
+        path = tmp_dir / f"ticket_{number:03d}{suffix}"
+        path.write_bytes(f"ticket {number}".encode())
+        files.append(path)
+    return files
+
+
+def test_leases():
+    """A leased job is invisible until its lease expires; the old owner loses it"""
+    print("[+] Testing leases and visibility timeout...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="job_queue_lease_test_"))
+    try:
+        queue = _queue(tmp_dir, lease_seconds={"ingest": 0.3})
+        ticket, = _files(tmp_dir, 1)
+        assert queue.enqueue(ticket) is not None
+        assert queue.enqueue(ticket) is None, "Open job queued twice"
+
+        job = queue.claim("ingest", "worker-a")
+        assert job is not None and job.attempts == 1
+        assert queue.claim("ingest", "worker-b") is None
+
+        assert queue.extend(job)
+        time.sleep(0.4)
+        stolen = queue.claim("ingest", "worker-b")
+        assert stolen is not None and stolen.id == job.id and stolen.attempts == 2
+        assert not queue.complete(job, {}), "Expired lease still completed the job"
+        assert queue.complete(stolen, {"input_hash": "abc"})
+
+        # A worker whose lease is lost mid-run counts a failure, not a processed job
+        (tmp_dir / "more").mkdir()
+        second, = _files(tmp_dir / "more", 1)
+        queue.enqueue(second)
+
+        def stolen_during_run(job):
+            with queue._lock:
+                queue._conn.execute("UPDATE jobs SET lease_owner = 'worker-z' WHERE id = ?", (job.id,))
+            return {}
+
+        pool = QueueWorkers(queue, {stage: stolen_during_run for stage in STAGES},
+                            workers={stage: 1 if stage == "ingest" else 0 for stage in STAGES},
+                            poll_interval=0.01).start()
+        deadline = time.time() + 5
+        while pool.failures == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        pool.stop()
+        assert pool.processed == 0 and pool.failures == 1, (pool.processed, pool.failures)
+
+        # Durable: a fresh connection sees the job waiting at extract
+        queue.close()
+        reopened = _queue(tmp_dir)
+        assert reopened.stats()["stages"]["extract"]["ready"] == 1
+        assert reopened.claim("extract", "worker-c").payload == {"input_hash": "abc"}
+        reopened.close()
+
+        print("[+] SUCCESS: Leases expire and move to a new owner")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_retries_and_dead_letter():
+    """Failures back off before retrying; the last attempt marks the job failed"""
+    print("\n[+] Testing retries with backoff...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="job_queue_retry_test_"))
+    try:
+        queue = _queue(tmp_dir, max_attempts=2)
+        queue.backoff = lambda attempts: 0.2 * attempts
+        ticket, = _files(tmp_dir, 1)
+        queue.enqueue(ticket)
+
+        job = queue.claim("ingest", "worker")
+        assert queue.fail(job, "OSError: share offline") == "retry"
+        assert queue.claim("ingest", "worker") is None, "Retried before backoff elapsed"
+        time.sleep(0.25)
+        job = queue.claim("ingest", "worker")
+        assert job is not None and job.attempts == 2
+        assert queue.fail(job, "OSError: share offline") == "failed"
+        assert queue.claim("ingest", "worker") is None
+
+        stats = queue.stats()
+        assert stats["failed"] == 1 and stats["pending"] == 0
+        assert queue.failed_jobs()[0][3] == "OSError: share offline"
+
+        # retry-failed requeues the job at the stage it failed in
+        assert queue.retry_failed() == 1
+        assert queue.claim("ingest", "worker").attempts == 1
+        queue.close()
+
+        print("[+] SUCCESS: Backoff, then dead letter")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_limits_and_backpressure():
+    """Stage limits cap leased jobs; ingest pauses while the extract backlog is full"""
+    print("\n[+] Testing stage limits and backpressure...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="job_queue_limit_test_"))
+    try:
+        queue = _queue(tmp_dir, stage_limits={"ingest": 2, "extract": 1}, extract_backlog=2)
+        for ticket in _files(tmp_dir, 5):
+            queue.enqueue(ticket)
+
+        first = queue.claim("ingest", "a")
+        second = queue.claim("ingest", "b")
+        assert first and second and queue.claim("ingest", "c") is None, "Ingest limit exceeded"
+        queue.complete(first, {})
+        queue.complete(second, {})
+
+        # Two jobs waiting for OCR: ingest holds back the other three files
+        assert queue.claim("ingest", "a") is None, "Ingest ignored the extract backlog"
+
+        ocr = queue.claim("extract", "ocr-1")
+        assert ocr is not None and queue.claim("extract", "ocr-2") is None, "Extract limit exceeded"
+        queue.complete(ocr, {})
+        assert queue.claim("ingest", "a") is not None, "Ingest did not resume"
+        queue.close()
+
+        print("[+] SUCCESS: Limits and backpressure hold")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _drain(tmp_dir, name, files, workers, delay=0.04):
+    """Run every file through sleeping handlers; returns (elapsed, queue stats)"""
+    queue = JobQueue(tmp_dir / f"{name}.sqlite3", stage_limits={stage: workers for stage in STAGES},
+                     extract_backlog=64)
+    for ticket in files:
+        queue.enqueue(ticket)
+
+    def handler(job):
+        time.sleep(delay)
+        return job.payload
+
+    pool = QueueWorkers(queue, {stage: handler for stage in STAGES}, poll_interval=0.01).start()
+    start = time.perf_counter()
+    drained = pool.run_until_idle(timeout=60, idle_seconds=0)
+    elapsed = time.perf_counter() - start
+    pool.stop()
+    stats = queue.stats()
+    queue.close()
+    assert drained, f"{name}: queue did not drain"
+    return elapsed, stats
+
+
+def test_throughput_scales():
+    """More workers per stage drain the same queue faster"""
+    print("\n[+] Testing throughput with more workers...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="job_queue_scale_test_"))
+    try:
+        files = _files(tmp_dir, 16)
+        single, single_stats = _drain(tmp_dir, "single", files, workers=1)
+        multi, multi_stats = _drain(tmp_dir, "multi", files, workers=4)
+        print(f"[*] 1 worker/stage: {single:.2f}s, 4 workers/stage: {multi:.2f}s")
+
+        assert single_stats["done"] == multi_stats["done"] == len(files)
+        assert multi < single / 2, f"4 workers only {single / multi:.1f}x faster"
+
+        print("[+] SUCCESS: Throughput scales with workers")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+class FakeOCR:
+    """Stand-in OCR engine"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def extract_text(self, file_path, **kwargs):
+        self.calls += 1
+        text = f"Ticket #1362{self.calls:04d}\nCompany: Singtech Inc\nTrading Partner: Staples"
+        return {"success": True, "text": text, "confidence": 0.93, "metadata": {"pages": 1}}
+
+    def close(self):
+        pass
+
+
+def test_phase0_stages():
+    """Queued tickets reach processing/; reruns finish at ingest; bad files dead-letter"""
+    print("\n[+] Testing Phase 0 stages...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="job_queue_phase0_test_"))
+    try:
+        from workflow import TicketWorkflow
+
+        workflow = TicketWorkflow(checkpoints=True)
+        workflow.processing_dir = tmp_dir / "processing"
+        workflow.failed_dir = tmp_dir / "failed"
+        workflow.log_file = tmp_dir / "media-analysis.log"
+        workflow.checkpoint_dir = tmp_dir / "checkpoints"
+        workflow.processing_dir.mkdir()
+        workflow.failed_dir.mkdir()
+        ocr = FakeOCR()
+        workflow._ocr = ocr
+
+        incoming = tmp_dir / "incoming"
+        incoming.mkdir()
+        tickets = _files(incoming, 3, ".png")
+        empty = incoming / "empty.png"
+        empty.write_bytes(b"")
+
+        queue = _queue(tmp_dir, max_attempts=1)
+        stages = Phase0Stages(workflow, settle_seconds=0)
+        for path in tickets + [empty]:
+            queue.enqueue(path)
+        pool = QueueWorkers(queue, stages.handlers(), on_failed=stages.on_failed, poll_interval=0.01).start()
+        assert pool.run_until_idle(timeout=30)
+
+        stats = queue.stats()
+        assert stats["done"] == 3 and stats["failed"] == 1, stats
+        assert len(list(workflow.processing_dir.glob("*/metadata.json"))) == 3
+        assert (workflow.failed_dir / "empty.png").exists(), "Failed file not dead-lettered"
+
+        # Same files again: finished at ingest from their checkpoints, no OCR
+        for path in tickets:
+            queue.enqueue(path)
+        assert pool.run_until_idle(timeout=30)
+        pool.stop()
+        assert ocr.calls == 3, f"OCR ran {ocr.calls} times"
+        assert queue.stats()["done"] == 6
+        queue.close()
+
+        print("[+] SUCCESS: Phase 0 ran through the queue")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("="*60)
+    print("Job Queue Test Suite")
+    print("="*60)
+
+    results = [
+        ("Leases", test_leases()),
+        ("Retries And Dead Letter", test_retries_and_dead_letter()),
+        ("Limits And Backpressure", test_limits_and_backpressure()),
+        ("Throughput Scales", test_throughput_scales()),
+        ("Phase 0 Stages", test_phase0_stages()),
+    ]
+
+    print("\n" + "="*60)
+    print("Test Results Summary")
+    print("="*60)
+
+    passed = sum(1 for _, result in results if result)
+    for test_name, result in results:
+        status = "[PASS]" if result else "[FAIL]"
+        print(f"{status} {test_name}")
+
+    print(f"\nPassed: {passed}/{len(results)}")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,150 @@
+"""
+Test script for the one-pass ticket metadata parser
+Tests field precedence, equivalence with per-pattern searches, page-by-page feeding
+and the per-page early-exit check
+"""
+
+import sys
+import time
+import random
+from metadata_parser import (MetadataScanner, RequiredFieldsCheck, parse_metadata_from_text,
+                             required_fields_found, _parse_metadata_regex)
+
+# Fragments that exercise every rule, overlaps, word boundaries and case folding
+FRAGMENTS = ["#", "Ticket", "CASE", "Customer", "From", "requester", "Company", "Organization",
+             "Trading Partner", "Partner", "Vendor", "Transaction", "850", "856", "997", "204", "ASN",
+             "po", "Invoice", "urgent", "Down", "important", "ASAP", "Error", "Issue", "Problem", "Subject",
+             ":", " ", "\n", "\n\n", "\t", "1234567", "12345678", "123456789", "12", "Acme", "_",
+             "caserror", "9904", "downs", "é", "K", "ſ", "İ"]
+
+
+def _random_text(rng):
+    return "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 40)))
+
+
+def test_field_precedence():
+    """Earlier rules win within a field; first occurrence wins within a rule"""
+    print("[+] Testing field precedence...")
+    try:
+        text = ("From: Maria Chen\nCustomer: Jody Bridge\nTicket: 7654321\nRef #13620086\n"
+                "Vendor: Acme\nTrading Partner: Staples\nTransaction: 123\nShipped 856 ASN\n"
+                "Subject: resend\nIssue: ASN rejected\nPriority: important\n")
+        metadata = parse_metadata_from_text(text)
+        assert metadata["ticket_id"] == "13620086", metadata
+        assert metadata["customer_name"] == "Jody Bridge"
+        assert metadata["trading_partner"] == "Staples"
+        assert metadata["transaction_type"] == "856 ASN"
+        assert metadata["issue_title"] == "Issue: ASN rejected"
+        assert metadata["severity"] == "MEDIUM"
+        assert parse_metadata_from_text("Server DOWN since 9am")["severity"] == "HIGH"
+        assert parse_metadata_from_text("downstream delay")["severity"] == "NORMAL"
+        assert parse_metadata_from_text("")["ticket_id"] == "UNKNOWN"
+
+        print("[+] SUCCESS: Precedence preserved")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+
+
+def test_matches_regex_parser():
+    """Same result as one re.search per pattern on random text"""
+    print("\n[+] Testing equivalence with the per-pattern parser...")
+    try:
+        rng = random.Random(2024)
+        for _ in range(5000):
+            text = _random_text(rng)
+            assert parse_metadata_from_text(text) == _parse_metadata_regex(text), repr(text)
+
+        print("[+] SUCCESS: 5000 random texts parsed identically")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+
+
+def test_incremental_feed():
+    """Feeding text in pieces gives the same metadata at every step, in linear time"""
+    print("\n[+] Testing incremental feeding...")
+    try:
+        rng = random.Random(7)
+        for _ in range(1000):
+            text = _random_text(rng)
+            scanner = MetadataScanner()
+            position = 0
+            while position < len(text):
+                end = position + rng.randint(1, 12)
+                scanner.feed(text[position:end])
+                position = end
+                assert scanner.metadata() == _parse_metadata_regex(text[:position]), repr(text[:position])
+
+        # 2000 pages fed one at a time must not rescan earlier pages
+        page = "REF*ZZ12*BM7~\nPlease resend the corrected file.\n" * 20
+        scanner = MetadataScanner().feed("Ticket #13620086\nCompany: Singtech Inc\n")
+        start = time.perf_counter()
+        for _ in range(2000):
+            scanner.feed("\n\n" + page)
+            scanner.missing_required()
+        elapsed = time.perf_counter() - start
+        assert scanner.metadata()["company"] == "Singtech Inc"
+        assert elapsed < 2.0, f"took {elapsed:.2f}s"
+
+        print(f"[+] SUCCESS: Incremental results match ({elapsed * 1000:.0f}ms for 2000 pages)")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+
+
+def test_required_fields_check():
+    """The per-page early-exit check agrees with required_fields_found on the joined pages"""
+    print("\n[+] Testing per-page required fields check...")
+    try:
+        rng = random.Random(11)
+        fragments = FRAGMENTS + ["Ticket #13620086\n", "Company: Singtech Inc\n", "Trading Partner: Staples\n"]
+        for _ in range(1000):
+            check = RequiredFieldsCheck()
+            pages = []
+            for _ in range(rng.randint(1, 6)):
+                page = "".join(rng.choice(fragments) for _ in range(rng.randint(0, 15)))
+                pages.append(page)
+                assert check(page) == required_fields_found("\n\n".join(pages)), repr(pages)
+
+        assert required_fields_found.incremental is RequiredFieldsCheck
+
+        print("[+] SUCCESS: Per-page check matches")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("="*60)
+    print("Metadata Parser Test Suite")
+    print("="*60)
+
+    results = [
+        ("Field Precedence", test_field_precedence()),
+        ("Matches Regex Parser", test_matches_regex_parser()),
+        ("Incremental Feed", test_incremental_feed()),
+        ("Required Fields Check", test_required_fields_check()),
+    ]
+
+    print("\n" + "="*60)
+    print("Test Results Summary")
+    print("="*60)
+
+    passed = sum(1 for _, result in results if result)
+    for test_name, result in results:
+        status = "[PASS]" if result else "[FAIL]"
+        print(f"{status} {test_name}")
+
+    print(f"\nPassed: {passed}/{len(results)}")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -137,6 +137,47 @@ def test_structured_data():
         return False
 
 
+def test_multi_frame_tiff():
+    """Test that every frame of a multi-frame TIFF becomes a page"""
+    print("\n[+] Testing multi-frame TIFF decoding...")
+    try:
+        processor = OCRProcessor()
+
+        import cv2
+        import numpy as np
+        from PIL import Image
+
+        # Three bilevel fax pages, each labelled with its page number
+        frames = []
+        for number in range(1, 4):
+            img = np.ones((400, 600), dtype=np.uint8) * 255
+            cv2.putText(img, f"Fax page {number}", (50, 200), cv2.FONT_HERSHEY_SIMPLEX, 1.5, 0, 3)
+            frames.append(Image.fromarray(img).convert("1"))
+
+        test_path = processor.cache_dir / "test_fax.tiff"
+        frames[0].save(test_path, save_all=True, append_images=frames[1:], compression="group4")
+
+        page_count, pages = processor._open_pages(test_path)
+        decoded = list(pages)
+        if page_count != 3 or [n for n, _ in decoded] != [1, 2, 3]:
+            print(f"[!] FAILED: Expected 3 pages, got {page_count} / {[n for n, _ in decoded]}")
+            return False
+        if decoded[0][1].ndim != 2 or np.array_equal(decoded[0][1], decoded[1][1]):
+            print("[!] FAILED: Frames not decoded as distinct grayscale pages")
+            return False
+
+        _, selected = processor._open_pages(test_path, page_numbers=[3])
+        if [n for n, _ in selected] != [3]:
+            print("[!] FAILED: Page selection ignored")
+            return False
+
+        print("[+] SUCCESS: Frames decoded one page at a time")
+        return True
+    except Exception as e:
+        print(f"[!] EXCEPTION: {e}")
+        return False
+
+
 def run_all_tests(test_image=None):
     """Run all tests"""
     print("="*60)
@@ -150,6 +191,7 @@ def run_all_tests(test_image=None):
     results.append(("Cache Management", test_cache_management()))
     results.append(("Preprocessing", test_preprocessing()))
     results.append(("Structured Data", test_structured_data()))
+    results.append(("Multi-Frame TIFF", test_multi_frame_tiff()))
 
     # Optional image test
     if test_image and Path(test_image).exists():
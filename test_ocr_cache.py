@@ -0,0 +1,363 @@
+"""
+Test script for the OCR result cache
+Tests content-addressed keys, LRU eviction, persistence across instances,
+manifest stats, TTL expiry, eviction safety with concurrent writers and
+stale-row cleanup
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from ocr_cache import OCRResultCache, hash_file, make_cache_key
+
+
+def _entry(text):
+    return {"text": text, "confidence": 0.9, "layout": [], "metadata": {"pages": 1}}
+
+
+def test_content_addressed_keys():
+    """Same bytes share a key regardless of filename; settings change the key"""
+    print("[+] Testing content-addressed keys...")
+    tmp = Path(tempfile.mkdtemp(prefix="ocr_cache_test_"))
+    try:
+        (tmp / "a").mkdir()
+        (tmp / "b").mkdir()
+        first = tmp / "a" / "ticket.pdf"
+        second = tmp / "b" / "ticket.pdf"
+        first.write_bytes(b"ticket one")
+        second.write_bytes(b"ticket two")
+        copy = tmp / "renamed.pdf"
+        copy.write_bytes(b"ticket one")
+
+        settings = {"preprocess": True}
+        assert hash_file(first) != hash_file(second), "different uploads must not collide"
+        assert hash_file(first) == hash_file(copy), "identical bytes must share a hash"
+        assert make_cache_key(hash_file(first), settings) != make_cache_key(hash_file(first), {"preprocess": False})
+
+        print("[+] SUCCESS: Keys depend on content and settings only")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_round_trip_and_persistence():
+    """Entries survive a new cache instance over the same directory"""
+    print("\n[+] Testing round trip and persistence...")
+    tmp = Path(tempfile.mkdtemp(prefix="ocr_cache_test_"))
+    try:
+        cache = OCRResultCache(tmp, max_bytes=1024 * 1024)
+        assert cache.get("missing") is None
+        cache.put("key1", _entry("Ticket #1234567"))
+
+        reopened = OCRResultCache(tmp, max_bytes=1024 * 1024)
+        entry = reopened.get("key1")
+        assert entry is not None and entry["text"] == "Ticket #1234567"
+        assert reopened.get_stats()["entries"] == 1
+
+        print("[+] SUCCESS: Cached result reloaded")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_lru_eviction():
+    """Least-recently-used entries go first once over budget"""
+    print("\n[+] Testing LRU eviction...")
+    tmp = Path(tempfile.mkdtemp(prefix="ocr_cache_test_"))
+    try:
+        probe = OCRResultCache(tmp / "probe")
+        probe.put("probe", _entry("x" * 10))
+        entry_size = probe.get_stats()["total_size_mb"] * 1024 * 1024
+
+        # Room for two entries, not three
+        cache = OCRResultCache(tmp / "lru", max_bytes=int(entry_size * 2.5))
+        cache.put("a", _entry("x" * 10))
+        cache.put("b", _entry("y" * 10))
+        assert cache.get("a") is not None  # "b" is now least recently used
+        cache.put("c", _entry("z" * 10))
+
+        assert cache.get("b") is None, "LRU entry should have been evicted"
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert not (tmp / "lru" / "b.json.gz").exists()
+
+        print("[+] SUCCESS: LRU entry evicted under byte budget")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_manifest_stats_and_ttl():
+    """Stats come from manifest totals; entries unused past the TTL expire"""
+    print("\n[+] Testing manifest stats and TTL expiry...")
+    tmp = Path(tempfile.mkdtemp(prefix="ocr_cache_test_"))
+    try:
+        cache = OCRResultCache(tmp, max_bytes=1024 * 1024, ttl_seconds=60)
+        cache.put("old", _entry("old ticket"))
+        cache.put("new", _entry("new ticket"))
+        on_disk = sum(p.stat().st_size for p in tmp.glob("*.json.gz"))
+        stats = cache.get_stats()
+        assert stats["entries"] == 2
+        assert abs(stats["total_size_mb"] * 1024 * 1024 - on_disk) < 1, "totals must match files"
+
+        # Age "old" past the TTL
+        with cache.manifest._lock:
+            cache.manifest._conn.execute(
+                "UPDATE entries SET last_access = ? WHERE key = 'old'", (time.time() - 120,))
+
+        result = cache.evict()
+        assert result["removed"] == 1
+        assert not (tmp / "old.json.gz").exists()
+        assert cache.get("new") is not None
+        assert cache.get_stats()["entries"] == 1
+
+        print("[+] SUCCESS: O(1) stats consistent, expired entry evicted")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_eviction_skips_rewritten_entry():
+    """An entry rewritten after the evictor claimed it is not deleted"""
+    print("\n[+] Testing eviction safety with a concurrent writer...")
+    tmp = Path(tempfile.mkdtemp(prefix="ocr_cache_test_"))
+    try:
+        cache = OCRResultCache(tmp, max_bytes=1024 * 1024, ttl_seconds=60)
+        cache.put("key1", _entry("first version"))
+        with cache.manifest._lock:
+            cache.manifest._conn.execute("UPDATE entries SET last_access = 0")
+
+        # Evictor claims the row...
+        victims = cache.manifest.take_victims(expire_before=time.time() - 60)
+        assert len(victims) == 1
+
+        # ...a worker rewrites the same key before the unlink happens
+        writer = OCRResultCache(tmp, max_bytes=1024 * 1024, ttl_seconds=60)
+        path = tmp / "key1.json.gz"
+        future = time.time() + 5
+        writer.put("key1", _entry("second version"))
+        os.utime(path, (future, future))
+        writer.manifest.record("key1", path)
+
+        relative_path, _, mtime_ns = victims[0]
+        assert cache.manifest.resolve(relative_path).stat().st_mtime_ns != mtime_ns
+        assert cache.evict()["removed"] == 0
+        assert cache.get("key1")["text"] == "second version"
+
+        print("[+] SUCCESS: Rewritten entry survived eviction")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_put_waits_for_eviction():
+    """A put() racing an eviction of the same key lands after it: the file stays tracked"""
+    print("\n[+] Testing put during eviction...")
+    tmp = Path(tempfile.mkdtemp(prefix="ocr_cache_test_"))
+    evictor = OCRResultCache(tmp, max_bytes=1024 * 1024, ttl_seconds=60)
+    # Separate instance = separate manifest connection, as in another process
+    writer = OCRResultCache(tmp, max_bytes=1024 * 1024, ttl_seconds=60)
+    try:
+        path = tmp / "key1.json.gz"
+        evictor.put("key1", _entry("first version"))
+        with evictor.manifest._lock:
+            evictor.manifest._conn.execute("UPDATE entries SET last_access = 0")
+
+        # The writer starts a put of the same key right after the evictor has
+        # checked the file and before it unlinks it
+        remove_file = evictor._remove_file
+        landed = []
+        threads = []
+
+        def remove_with_racing_put(victim, mtime_ns):
+            thread = threading.Thread(target=writer.put, args=("key1", _entry("second version")))
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.3)
+            landed.append(path.exists() and evictor.manifest.resolve("key1.json.gz").stat().st_mtime_ns != mtime_ns)
+            return remove_file(victim, mtime_ns)
+
+        evictor._remove_file = remove_with_racing_put
+        assert evictor.evict()["removed"] == 1
+        threads[0].join()
+        assert landed == [False], "put() landed its file during the eviction"
+
+        with writer.manifest._lock:
+            rows = writer.manifest._conn.execute("SELECT path, size FROM entries").fetchall()
+        assert rows == [("key1.json.gz", path.stat().st_size)], rows
+        assert writer.get("key1")["text"] == "second version"
+        assert not list(tmp.glob(".*.tmp"))
+
+        print("[+] SUCCESS: File and manifest row agree")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        evictor.close()
+        writer.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_lookups_take_no_write_lock():
+    """get() does not wait for another process's write; counts and LRU order still land"""
+    print("\n[+] Testing lookups while another process writes...")
+    tmp = Path(tempfile.mkdtemp(prefix="ocr_cache_test_"))
+    cache = OCRResultCache(tmp, max_bytes=1024 * 1024)
+    try:
+        for key in ("old", "new"):
+            cache.put(key, _entry(key))
+
+        # Another process holds the manifest's write lock
+        import sqlite3
+        other = sqlite3.connect(str(tmp / "manifest.sqlite3"), isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        start = time.perf_counter()
+        try:
+            for _ in range(10):
+                assert cache.get("old")["text"] == "old"
+                assert cache.get("missing") is None
+        finally:
+            other.execute("ROLLBACK")
+            other.close()
+        elapsed = time.perf_counter() - start
+        assert elapsed < 2, f"Lookups waited {elapsed:.1f}s for the write lock"
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 10 and stats["misses"] == 10, stats
+        # "new" was not looked up since it was written: least recently used
+        with cache.manifest._lock:
+            order = [row[0] for row in cache.manifest._conn.execute("SELECT key FROM entries ORDER BY access_seq")]
+        assert order == ["new", "old"], order
+
+        print(f"[+] SUCCESS: 20 lookups in {elapsed * 1000:.0f} ms under a held write lock")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        cache.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_failed_unlink_keeps_row():
+    """A file eviction or clear() cannot delete stays tracked and is retried"""
+    print("\n[+] Testing failed unlinks...")
+    tmp = Path(tempfile.mkdtemp(prefix="ocr_cache_test_"))
+    cache = OCRResultCache(tmp, max_bytes=1024 * 1024, ttl_seconds=60)
+    try:
+        for key in ("locked", "gone"):
+            cache.put(key, _entry(key))
+        with cache.manifest._lock:
+            cache.manifest._conn.execute("UPDATE entries SET last_access = 0")
+        size = (tmp / "locked.json.gz").stat().st_size
+        (tmp / "gone.json.gz").unlink()
+
+        # e.g. Windows PermissionError while another process reads the file
+        cache._remove_file = lambda path, mtime_ns: False
+        assert cache.evict()["removed"] == 0
+        stats = cache.get_stats()
+        assert stats["entries"] == 1 and stats["total_size_mb"] * 1024 * 1024 == size, stats
+        assert cache.clear() == 0 and cache.get_stats()["entries"] == 1
+
+        del cache._remove_file
+        assert cache.evict()["removed"] == 1
+        assert cache.get_stats()["entries"] == 0 and not (tmp / "locked.json.gz").exists()
+
+        print("[+] SUCCESS: Undeleted files keep their rows")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        cache.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_stale_rows_dropped_without_extra_writes():
+    """A miss on a deleted file drops its row with the next write; plain misses queue nothing"""
+    print("\n[+] Testing stale row cleanup...")
+    tmp = Path(tempfile.mkdtemp(prefix="ocr_cache_test_"))
+    cache = OCRResultCache(tmp, max_bytes=1024 * 1024)
+    try:
+        cache.put("gone", _entry("deleted behind our back"))
+        (tmp / "gone.json.gz").unlink()
+
+        assert cache.get("never-cached") is None
+        assert cache.manifest._stale == []
+
+        assert cache.get("gone") is None
+        stats = cache.get_stats()
+        assert stats["entries"] == 0 and stats["misses"] == 2, stats
+        assert cache.manifest._stale == []
+
+        # A newer version written by someone else survives the stale delete
+        cache.put("gone", _entry("rewritten"))
+        cache.manifest._stale.append(("gone", 1))
+        cache.get("missing")
+        assert cache.get("gone")["text"] == "rewritten"
+
+
+        print("[+] SUCCESS: Stale rows dropped with the next write")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        cache.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("="*60)
+    print("OCR Result Cache Test Suite")
+    print("="*60)
+
+    results = [
+        ("Content-Addressed Keys", test_content_addressed_keys()),
+        ("Round Trip and Persistence", test_round_trip_and_persistence()),
+        ("LRU Eviction", test_lru_eviction()),
+        ("Manifest Stats and TTL", test_manifest_stats_and_ttl()),
+        ("Eviction Safety", test_eviction_skips_rewritten_entry()),
+        ("Put During Eviction", test_put_waits_for_eviction()),
+        ("Lookups Take No Write Lock", test_lookups_take_no_write_lock()),
+        ("Failed Unlink Keeps Row", test_failed_unlink_keeps_row()),
+        ("Stale Row Cleanup", test_stale_rows_dropped_without_extra_writes()),
+    ]
+
+    print("\n" + "="*60)
+    print("Test Results Summary")
+    print("="*60)
+
+    passed = sum(1 for _, result in results if result)
+    for test_name, result in results:
+        status = "[PASS]" if result else "[FAIL]"
+        print(f"{status} {test_name}")
+
+    print(f"\nPassed: {passed}/{len(results)}")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,133 @@
+"""
+Test script for geometric key-value pairing
+Tests inline, label-right and label-above layouts, the no-box fallback and dense forms
+"""
+
+import sys
+import time
+from ocr_layout import OCRLayout
+from ocr_key_values import extract_key_value_pairs, split_pair
+
+
+def _layout(lines):
+    """OCRLayout from (text, [x0, y0, x1, y1]) pairs"""
+    return OCRLayout([text for text, _ in lines], [0.9] * len(lines), [box for _, box in lines])
+
+
+def test_inline_pairs():
+    """'Key: Value' and 'Key = Value' lines split on the separator"""
+    print("[+] Testing inline pairs...")
+    try:
+        assert split_pair("Ticket #: 13620086") == ("Ticket #", "13620086")
+        assert split_pair("Phone = 555-1234") == ("Phone", "555-1234")
+        assert split_pair("Time: 10:30") == ("Time", "10:30")
+        assert split_pair("Company:") == ("Company", "")
+        assert split_pair("10:30") is None
+        assert split_pair("No separator here") is None
+
+        layout = _layout([("Name: John Doe", [10, 10, 200, 30]), ("Phone = 555-1234", [10, 50, 200, 70])])
+        assert extract_key_value_pairs([layout]) == {"Name": "John Doe", "Phone": "555-1234"}
+
+        print("[+] SUCCESS: Inline pairs split")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+
+
+def test_geometric_pairs():
+    """Labels take the nearest value to the right, else the one underneath"""
+    print("\n[+] Testing label-right and label-above layouts...")
+    try:
+        layout = _layout([
+            # Two-column form: label and value on one row
+            ("Company:", [50, 100, 170, 130]),
+            ("Singtech Inc", [200, 102, 380, 130]),
+            ("Partner:", [600, 100, 720, 130]),
+            ("Staples", [750, 100, 860, 130]),
+            # Label above its value
+            ("Transaction:", [50, 200, 230, 230]),
+            ("856 ASN", [52, 240, 170, 270]),
+            # Paragraph text far below is nobody's value
+            ("Please resend the ASN.", [50, 600, 400, 630]),
+            ("Notes:", [50, 520, 140, 550]),
+        ])
+        pairs = extract_key_value_pairs([layout])
+        assert pairs == {"Company": "Singtech Inc", "Partner": "Staples", "Transaction": "856 ASN"}, pairs
+
+        print("[+] SUCCESS: Values paired by geometry")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+
+
+def test_pairs_without_boxes():
+    """Text-layer pages (no boxes) pair a bare label with the next line"""
+    print("\n[+] Testing pairing without boxes...")
+    try:
+        layout = OCRLayout.from_lines([[None, "Severity:", 1.0], [None, "HIGH", 1.0],
+                                       [None, "Customer: Jody Bridge", 1.0]])
+        assert extract_key_value_pairs([layout, OCRLayout()]) == {"Severity": "HIGH", "Customer": "Jody Bridge"}
+
+        print("[+] SUCCESS: Line-order fallback works")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+
+
+def test_dense_form_scales():
+    """Thousands of label/value rows pair correctly in well under a second"""
+    print("\n[+] Testing dense form...")
+    try:
+        lines = []
+        for row in range(2000):
+            y = row * 40
+            lines.append((f"Field {row}:", [20, y, 160, y + 30]))
+            lines.append((f"value {row}", [180, y, 320, y + 30]))
+        layout = _layout(lines)
+
+        start = time.perf_counter()
+        pairs = extract_key_value_pairs([layout])
+        elapsed = time.perf_counter() - start
+
+        assert len(pairs) == 2000 and pairs["Field 1234"] == "value 1234"
+        assert elapsed < 1.0, f"took {elapsed:.2f}s"
+
+        print(f"[+] SUCCESS: 2000 pairs in {elapsed * 1000:.0f}ms")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("="*60)
+    print("Key-Value Pairing Test Suite")
+    print("="*60)
+
+    results = [
+        ("Inline Pairs", test_inline_pairs()),
+        ("Geometric Pairs", test_geometric_pairs()),
+        ("Pairs Without Boxes", test_pairs_without_boxes()),
+        ("Dense Form", test_dense_form_scales()),
+    ]
+
+    print("\n" + "="*60)
+    print("Test Results Summary")
+    print("="*60)
+
+    passed = sum(1 for _, result in results if result)
+    for test_name, result in results:
+        status = "[PASS]" if result else "[FAIL]"
+        print(f"{status} {test_name}")
+
+    print(f"\nPassed: {passed}/{len(results)}")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,124 @@
+"""
+Test script for the compact OCR layout
+Tests parsing PaddleX and legacy results, JSON round trips and confidence
+"""
+
+import sys
+import json
+import pickle
+import numpy as np
+from ocr_layout import OCRLayout, mean_confidence
+
+
+class FakeOCRResult:
+    """Stand-in for a PaddleX OCRResult page (only .str['res'] is read)"""
+
+    def __init__(self, texts, scores, boxes=None, polys=None):
+        res = {"rec_texts": texts, "rec_scores": np.array(scores)}
+        if boxes is not None:
+            res["rec_boxes"] = np.array(boxes)
+        if polys is not None:
+            res["rec_polys"] = [np.array(p) for p in polys]
+        self.str = {"res": res}
+        self.input_img = np.zeros((2000, 1500, 3), dtype=np.uint8)
+
+
+def test_from_paddlex_result():
+    """Texts, scores and boxes come out of PaddleX results as arrays"""
+    print("[+] Testing PaddleX result parsing...")
+    try:
+        result = [FakeOCRResult(["Ticket #1234567", "Company: Acme"], [0.98, 0.91],
+                                boxes=[[10, 20, 200, 40], [10, 60, 180, 80]])]
+        layout = OCRLayout.from_ocr_result(result)
+        assert layout.text == "Ticket #1234567\nCompany: Acme"
+        assert layout.boxes.shape == (2, 4)
+        assert abs(layout.mean_score - 0.945) < 1e-9
+
+        polys = OCRLayout.from_ocr_result([FakeOCRResult(
+            ["Partner: Staples"], [0.9], polys=[[[5, 5], [50, 4], [51, 20], [6, 21]]])])
+        assert polys.to_lines()[0][0] == [5, 4, 51, 21]
+
+        text_only = OCRLayout.from_ocr_result(result, with_boxes=False)
+        assert text_only.boxes is None and text_only.text == layout.text
+
+        # The input image is not kept alive by the layout
+        assert len(pickle.dumps(layout)) < 2048
+
+        print("[+] SUCCESS: Layout parsed without raw result objects")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+
+
+def test_legacy_result_and_lines_round_trip():
+    """Legacy [box, (text, score)] results and cached JSON lines rebuild the same layout"""
+    print("\n[+] Testing legacy format and JSON round trip...")
+    try:
+        legacy = [[
+            [[[0, 0], [100, 0], [100, 20], [0, 20]], ("Transaction: 856", 0.8)],
+            [[[0, 30], [90, 30], [90, 50], [0, 50]], ("Severity: HIGH", 0.6)],
+        ]]
+        layout = OCRLayout.from_ocr_result(legacy)
+        lines = json.loads(json.dumps(layout.to_lines()))
+        assert lines[0] == [[0, 0, 100, 20], "Transaction: 856", 0.8]
+
+        rebuilt = OCRLayout.from_lines(lines + [[None, "no box", 1.0]])
+        assert rebuilt.to_lines()[:2] == lines
+        assert rebuilt.to_lines()[2][0] is None
+
+        print("[+] SUCCESS: Layout survives JSON round trip")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+
+
+def test_mean_confidence():
+    """Confidence is the mean over all lines of all pages, empty pages ignored"""
+    print("\n[+] Testing confidence across pages...")
+    try:
+        pages = [
+            OCRLayout(["a", "b"], [1.0, 0.5]),
+            OCRLayout(),
+            OCRLayout(["c"], [0.0]),
+        ]
+        assert abs(mean_confidence(pages) - 0.5) < 1e-9
+        assert mean_confidence([]) == 0.0
+        assert mean_confidence([OCRLayout()]) == 0.0
+
+        print("[+] SUCCESS: Confidence matches per-line mean")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("="*60)
+    print("OCR Layout Test Suite")
+    print("="*60)
+
+    results = [
+        ("PaddleX Result Parsing", test_from_paddlex_result()),
+        ("Legacy Format and Round Trip", test_legacy_result_and_lines_round_trip()),
+        ("Mean Confidence", test_mean_confidence()),
+    ]
+
+    print("\n" + "="*60)
+    print("Test Results Summary")
+    print("="*60)
+
+    passed = sum(1 for _, result in results if result)
+    for test_name, result in results:
+        status = "[PASS]" if result else "[FAIL]"
+        print(f"{status} {test_name}")
+
+    print(f"\nPassed: {passed}/{len(results)}")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
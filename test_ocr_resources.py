@@ -0,0 +1,162 @@
+"""
+Test script for OCR CPU resource settings
+Tests settings precedence, engine options, per-worker CPU blocks and worker thread caps
+"""
+
+import os
+import re
+import sys
+import json
+import ctypes
+import shutil
+import tempfile
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from ocr_resources import (ENV_VARS, THREAD_ENV_VARS, load_resource_config, save_resource_config,
+                           engine_options, cpu_blocks, thread_capped_context)
+
+
+def test_settings_precedence():
+    """Environment overrides the settings file, which overrides defaults"""
+    print("[+] Testing settings precedence...")
+    tmp = Path(tempfile.mkdtemp(prefix="ocr_resources_test_"))
+    saved_env = {var: os.environ.pop(var, None) for var in ENV_VARS.values()}
+    try:
+        path = tmp / "ocr_resources.json"
+        assert load_resource_config(path)["workers"] == 1
+        assert load_resource_config(path)["enable_mkldnn"] is None
+
+        save_resource_config({"workers": 4, "worker_threads": 2, "enable_mkldnn": False}, path)
+        config = load_resource_config(path)
+        assert config["workers"] == 4 and config["worker_threads"] == 2
+        assert config["enable_mkldnn"] is False and config["pin_cpus"] is False
+
+        os.environ["OCR_WORKERS"] = "2"
+        os.environ["OCR_MKLDNN"] = "1"
+        config = load_resource_config(path)
+        assert config["workers"] == 2 and config["enable_mkldnn"] is True
+        assert config["worker_threads"] == 2
+
+        path.write_text("{not json", encoding="utf-8")
+        assert load_resource_config(path)["workers"] == 2
+
+        print("[+] SUCCESS: Environment > file > defaults")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        for var, value in saved_env.items():
+            os.environ.pop(var, None)
+            if value is not None:
+                os.environ[var] = value
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_engine_options():
+    """Only settings that were chosen are passed to PaddleOCR"""
+    print("\n[+] Testing engine options...")
+    try:
+        assert engine_options() == {}
+        assert engine_options(cpu_threads=4) == {"cpu_threads": 4}
+        assert engine_options(enable_mkldnn=False) == {"enable_mkldnn": False}
+        assert json.dumps(engine_options(2, True))
+
+        print("[+] SUCCESS: Engine options built")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+
+
+def test_cpu_blocks():
+    """Workers get disjoint blocks while cores last, then wrap around"""
+    print("\n[+] Testing per-worker CPU blocks...")
+    try:
+        assert cpu_blocks(2, 4, cpus=range(8)) == [[0, 1, 2, 3], [4, 5, 6, 7]]
+        assert cpu_blocks(3, 2, cpus=[0, 2, 4, 6]) == [[0, 2], [4, 6], [0, 2]]
+        assert cpu_blocks(2, 8, cpus=range(4)) == [[0, 1, 2, 3], [0, 1, 2, 3]]
+
+        print("[+] SUCCESS: CPU blocks assigned")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+
+
+def _blas_threads():
+    """Threads NumPy's OpenBLAS actually uses, or None where it cannot be queried"""
+    import numpy  # noqa: F401  (loads OpenBLAS)
+    try:
+        with open("/proc/self/maps", 'r') as f:
+            libraries = set(re.findall(r"/\S*openblas\S*\.so\S*", f.read()))
+    except OSError:
+        return None
+    for library in libraries:
+        lib = ctypes.CDLL(library)
+        for symbol in ("openblas_get_num_threads", "openblas_get_num_threads64_",
+                       "scipy_openblas_get_num_threads64_", "scipy_openblas_get_num_threads"):
+            if hasattr(lib, symbol):
+                return getattr(lib, symbol)()
+    return None
+
+
+def _worker_threads():
+    """Pool task: the thread caps this worker started with and what OpenBLAS uses"""
+    return {var: os.environ.get(var) for var in THREAD_ENV_VARS}, _blas_threads()
+
+
+def test_worker_thread_caps():
+    """Workers start with the caps in place: libraries load with the capped thread count"""
+    print("\n[+] Testing worker thread caps...")
+    saved_env = {var: os.environ.get(var) for var in THREAD_ENV_VARS}
+    try:
+        # No initializer: anything the worker sees came from its start-up environment.
+        # One thread, since OpenBLAS never runs more threads than there are cores.
+        with ProcessPoolExecutor(max_workers=1, mp_context=thread_capped_context(1)) as executor:
+            environment, blas_threads = executor.submit(_worker_threads).result(timeout=120)
+
+        assert environment == {var: "1" for var in THREAD_ENV_VARS}, environment
+        if blas_threads is not None:
+            print(f"[*] Worker OpenBLAS threads: {blas_threads} (cores: {os.cpu_count()})")
+            assert blas_threads == 1, f"OpenBLAS runs {blas_threads} threads"
+        else:
+            print("[*] OpenBLAS thread count not queryable here; checked the environment only")
+        assert {var: os.environ.get(var) for var in THREAD_ENV_VARS} == saved_env, "Parent environment changed"
+
+        print("[+] SUCCESS: Worker threads capped")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("="*60)
+    print("OCR Resource Settings Test Suite")
+    print("="*60)
+
+    results = [
+        ("Settings Precedence", test_settings_precedence()),
+        ("Engine Options", test_engine_options()),
+        ("CPU Blocks", test_cpu_blocks()),
+        ("Worker Thread Caps", test_worker_thread_caps()),
+    ]
+
+    print("\n" + "="*60)
+    print("Test Results Summary")
+    print("="*60)
+
+    passed = sum(1 for _, result in results if result)
+    for test_name, result in results:
+        status = "[PASS]" if result else "[FAIL]"
+        print(f"{status} {test_name}")
+
+    print(f"\nPassed: {passed}/{len(results)}")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
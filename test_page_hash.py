@@ -0,0 +1,119 @@
+"""
+Test script for perceptual page hashing
+Tests that repeated pages match and that pages with changed text do not
+"""
+
+import sys
+import cv2
+import numpy as np
+from page_hash import PageDeduplicator, page_signature, same_page, hamming
+
+
+def _page(lines, noise=0, seed=0):
+    """White 1700x2200 page with one text line per entry, optional Gaussian noise"""
+    img = np.full((2200, 1700, 3), 255, dtype=np.uint8)
+    for i, line in enumerate(lines):
+        cv2.putText(img, line, (120, 200 + i * 90), cv2.FONT_HERSHEY_SIMPLEX, 1.6, (0, 0, 0), 3)
+    if noise:
+        rng = np.random.default_rng(seed)
+        img = np.clip(img.astype(np.int16) + rng.normal(0, noise, img.shape), 0, 255).astype(np.uint8)
+    return img
+
+
+PAGE = ["Ticket #13620086", "Company: Singtech Inc", "Trading Partner: Staples",
+        "Transaction: 856", "Severity: HIGH"]
+
+
+def test_repeated_page_matches():
+    """Same page rendered twice (and re-scanned with noise) counts as a repeat"""
+    print("[+] Testing repeated page detection...")
+    try:
+        a = page_signature(_page(PAGE))
+        b = page_signature(_page(PAGE))
+        noisy = page_signature(_page(PAGE, noise=6, seed=1))
+        gray = page_signature(cv2.cvtColor(_page(PAGE), cv2.COLOR_BGR2GRAY))
+
+        assert same_page(a, b) and a.key == b.key
+        assert same_page(a, noisy), f"noisy copy rejected (hamming {hamming(a.dhash, noisy.dhash)})"
+        assert same_page(a, gray)
+
+        print("[+] SUCCESS: Repeated pages match")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+
+
+def test_changed_text_does_not_match():
+    """A template page with one changed digit or an extra line is a different page"""
+    print("\n[+] Testing changed pages are kept apart...")
+    try:
+        a = page_signature(_page(PAGE))
+        digit = page_signature(_page(["Ticket #13620087"] + PAGE[1:]))
+        extra = page_signature(_page(PAGE + ["Notes: resend"]))
+        blank = page_signature(_page([]))
+
+        assert not same_page(a, digit), "one-digit change matched"
+        assert not same_page(a, extra), "extra line matched"
+        assert not same_page(a, blank)
+        assert a.key != digit.key
+
+        print("[+] SUCCESS: Changed pages do not match")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+
+
+def test_deduplicator_returns_first_copy():
+    """Later copies point at the first page that had the content"""
+    print("\n[+] Testing document deduplicator...")
+    try:
+        seen = PageDeduplicator()
+        pages = {1: _page(PAGE), 2: _page(["Disclaimer"]), 3: _page(PAGE), 4: _page(["Disclaimer"])}
+        found = {}
+        for number, image in pages.items():
+            signature = page_signature(image)
+            original = seen.find(signature)
+            if original is None:
+                seen.add(signature, number)
+            else:
+                found[number] = original
+
+        assert found == {3: 1, 4: 2}, f"unexpected duplicates {found}"
+
+        print("[+] SUCCESS: Duplicates map to the first copy")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("="*60)
+    print("Page Hash Test Suite")
+    print("="*60)
+
+    results = [
+        ("Repeated Page Detection", test_repeated_page_matches()),
+        ("Changed Pages Kept Apart", test_changed_text_does_not_match()),
+        ("Document Deduplicator", test_deduplicator_returns_first_copy()),
+    ]
+
+    print("\n" + "="*60)
+    print("Test Results Summary")
+    print("="*60)
+
+    passed = sum(1 for _, result in results if result)
+    for test_name, result in results:
+        status = "[PASS]" if result else "[FAIL]"
+        print(f"{status} {test_name}")
+
+    print(f"\nPassed: {passed}/{len(results)}")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,156 @@
+"""
+Test script for the PDF text-layer fast path
+Tests the usable-text heuristic, per-page extraction and column order with pdftotext
+"""
+
+import sys
+import shutil
+import tempfile
+from pathlib import Path
+from pdf_text_layer import extract_text_layer, find_pdftotext, is_usable_text, text_layer_lines
+from metadata_parser import parse_metadata_from_text
+
+
+def _write_pdf(path, page_texts):
+    """
+    Write a minimal Helvetica PDF
+
+    Each page is a line of text, a list of (x, y, text) placed lines, or None (blank page)
+    """
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for text in page_texts:
+        if isinstance(text, str):
+            text = [(72, 720, text)]
+        stream = " ".join(f"BT /F1 12 Tf {x} {y} Td ({line}) Tj ET" for x, y, line in text or [])
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>")
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    Path(path).write_bytes(out)
+
+
+def test_usable_text_heuristic():
+    """Real text passes; empty, tiny and garbled text layers fall back to OCR"""
+    print("[+] Testing usable-text heuristic...")
+    try:
+        assert is_usable_text("Ticket #13620086\nCompany: Singtech Inc\nTrading Partner: Staples")
+        assert not is_usable_text("")
+        assert not is_usable_text("   \n\n  ")
+        assert not is_usable_text("Page 1")
+        assert not is_usable_text("�" * 40 + " some text")
+        assert not is_usable_text("-" * 60)
+
+        lines = text_layer_lines("  Ticket #1234567  \n\n  Company: Acme  ")
+        assert [line[1] for line in lines] == ["Ticket #1234567", "Company: Acme"]
+        assert all(line[0] is None and line[2] == 1.0 for line in lines)
+
+        print("[+] SUCCESS: Only usable text layers bypass OCR")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+
+
+def test_extract_text_layer_pages():
+    """Embedded text comes back per page; image-only pages come back empty"""
+    print("\n[+] Testing per-page text layer extraction...")
+    if find_pdftotext() is None:
+        print("[*] pdftotext not installed (poppler-utils) - skipping")
+        return True
+
+    tmp = Path(tempfile.mkdtemp(prefix="pdf_text_test_"))
+    try:
+        pdf_path = tmp / "ticket.pdf"
+        _write_pdf(pdf_path, ["Ticket 13620086 Company Singtech Inc Trading Partner Staples", None])
+
+        pages = extract_text_layer(pdf_path)
+        assert sorted(pages) == [1, 2], f"expected pages 1 and 2, got {sorted(pages)}"
+        assert "13620086" in pages[1]
+        assert is_usable_text(pages[1])
+        assert not is_usable_text(pages[2])
+
+        print("[+] SUCCESS: Text layer split by page")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_two_column_header():
+    """Side-by-side header columns come back on separate lines"""
+    print("\n[+] Testing two-column ticket header...")
+    if find_pdftotext() is None:
+        print("[*] pdftotext not installed (poppler-utils) - skipping")
+        return True
+
+    tmp = Path(tempfile.mkdtemp(prefix="pdf_text_columns_test_"))
+    try:
+        pdf_path = tmp / "ticket.pdf"
+        _write_pdf(pdf_path, [[
+            (72, 720, "Ticket #13620086"), (330, 720, "Trading Partner: Staples"),
+            (72, 704, "Company: Singtech Inc"), (330, 704, "Transaction: 856 ASN"),
+            (72, 688, "Customer: Jody Bridge"), (330, 688, "Priority: important"),
+        ]])
+
+        text = extract_text_layer(pdf_path)[1]
+        assert not any("Singtech" in line and "Partner" in line for line in text.splitlines()), text
+        metadata = parse_metadata_from_text(text)
+        assert metadata["company"] == "Singtech Inc", metadata["company"]
+        assert metadata["trading_partner"] == "Staples", metadata["trading_partner"]
+        assert metadata["customer_name"] == "Jody Bridge", metadata["customer_name"]
+
+        print("[+] SUCCESS: Columns not merged")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("="*60)
+    print("PDF Text Layer Test Suite")
+    print("="*60)
+
+    results = [
+        ("Usable-Text Heuristic", test_usable_text_heuristic()),
+        ("Per-Page Extraction", test_extract_text_layer_pages()),
+        ("Two-Column Header", test_two_column_header()),
+    ]
+
+    print("\n" + "="*60)
+    print("Test Results Summary")
+    print("="*60)
+
+    passed = sum(1 for _, result in results if result)
+    for test_name, result in results:
+        status = "[PASS]" if result else "[FAIL]"
+        print(f"{status} {test_name}")
+
+    print(f"\nPassed: {passed}/{len(results)}")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
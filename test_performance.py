@@ -1,11 +1,26 @@
 """
 BMAD-EDI Media Analysis - Performance Test Suite
 Tests processing speed and resource usage
+
+OCR throughput runs OCRProcessor and TicketWorkflow over a synthetic
+ticket corpus (see benchmark_corpus) and reports pages/sec, p50/p95
+latency per stage, peak RSS and field accuracy against ground truth.
+
+Usage:
+    python test_performance.py [--corpus-size N] [--skip-ocr]
+
+Results go to performance_results.json; the previous file's OCR numbers
+are printed alongside for comparison.
 """
 
 import os
 import sys
 import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+import threading
 import psutil
 from pathlib import Path
 import json
@@ -13,12 +28,76 @@ import json
 SKILL_DIR = Path(__file__).parent
 
 
+class PeakRSSMonitor:
+    """Samples RSS of this process plus children (OCR pool workers) in the background"""
+
+    def __init__(self, process, interval=0.05):
+        self.process = process
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        total = self.process.memory_info().rss
+        for child in self.process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        self.peak_bytes = max(self.peak_bytes, total)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    @property
+    def peak_mb(self):
+        return self.peak_bytes / 1024 / 1024
+
+
+def latency_summary(samples_ms):
+    """p50/p95/mean in milliseconds"""
+    from benchmark_ocr import percentile
+    if not samples_ms:
+        return {"count": 0}
+    return {
+        "count": len(samples_ms),
+        "p50_ms": round(percentile(samples_ms, 50), 2),
+        "p95_ms": round(percentile(samples_ms, 95), 2),
+        "mean_ms": round(sum(samples_ms) / len(samples_ms), 2)
+    }
+
+
+def field_accuracy(scores):
+    """Per-field and overall accuracy from a list of score_fields() dicts"""
+    if not scores:
+        return {}
+    fields = scores[0].keys()
+    accuracy = {field: sum(score[field] for score in scores) / len(scores) for field in fields}
+    accuracy["overall"] = sum(accuracy.values()) / len(accuracy)
+    return {field: round(value, 4) for field, value in accuracy.items()}
+
+
 class PerformanceTestSuite:
     """Performance and resource usage tests"""
 
-    def __init__(self):
+    def __init__(self, corpus_size=12, run_ocr=True):
         self.results = {}
         self.process = psutil.Process()
+        self.corpus_size = corpus_size
+        self.run_ocr = run_ocr
 
     def measure_startup_time(self):
         """Measure time to import all modules"""
@@ -155,6 +234,158 @@ class PerformanceTestSuite:
             'passed': psutil.cpu_count(logical=True) >= 2
         }
 
+    def measure_ocr_throughput(self):
+        """OCRProcessor and TicketWorkflow over the synthetic ticket corpus"""
+        sys.path.insert(0, str(SKILL_DIR))
+        if not self.run_ocr:
+            skipped = {'status': 'SKIPPED', 'reason': '--skip-ocr', 'passed': True}
+            self.results['ocr_corpus'] = dict(skipped)
+            self.results['workflow_corpus'] = dict(skipped)
+            return
+
+        try:
+            from ocr_processor import OCRProcessor
+        except ImportError as e:
+            reason = f"OCR unavailable: {e}"
+            self.results['ocr_corpus'] = {'status': 'SKIPPED', 'reason': reason, 'passed': True}
+            self.results['workflow_corpus'] = {'status': 'SKIPPED', 'reason': reason, 'passed': True}
+            return
+
+        from benchmark_corpus import generate_corpus
+
+        tmp_dir = Path(tempfile.mkdtemp(prefix="perf_corpus_"))
+        try:
+            corpus = generate_corpus(tmp_dir / "corpus", tickets=self.corpus_size)
+            processor = OCRProcessor(data_dir=tmp_dir / "data", cache_evictor=False)
+            try:
+                self.results['ocr_corpus'] = self._run_ocr_corpus(processor, tmp_dir / "corpus", corpus)
+                self.results['workflow_corpus'] = self._run_workflow_corpus(processor, tmp_dir, corpus)
+            finally:
+                processor.close()
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _run_ocr_corpus(self, processor, corpus_dir, corpus):
+        """Page-streaming OCR of every ticket: stage latencies, throughput, RSS, accuracy"""
+        from benchmark_corpus import score_fields
+        from metadata_parser import parse_metadata_from_text
+
+        stages = {"page": [], "preprocess": [], "assess": [], "recognize": []}
+        document_ms = []
+        scores = []
+        pages = 0
+
+        with PeakRSSMonitor(self.process) as monitor:
+            start = time.perf_counter()
+            for entry in corpus:
+                texts = []
+                doc_start = last = time.perf_counter()
+                for page in processor.extract_text_iter(corpus_dir / entry["file"]):
+                    now = time.perf_counter()
+                    page_ms = (now - last) * 1000
+                    last = now
+                    pages += 1
+                    texts.append(page["text"])
+
+                    # Page wall time = render + preprocess + recognition
+                    report = page.get("preprocess") or {}
+                    preprocess_ms = report.get("total_ms", 0.0)
+                    stages["page"].append(page_ms)
+                    stages["preprocess"].append(preprocess_ms)
+                    stages["assess"].append(report.get("assess_ms", 0.0))
+                    stages["recognize"].append(max(0.0, page_ms - preprocess_ms))
+                    for name, stage in (report.get("stages") or {}).items():
+                        if stage.get("ran"):
+                            stages.setdefault(name, []).append(stage["ms"])
+                document_ms.append((last - doc_start) * 1000)
+                scores.append(score_fields(entry["fields"], parse_metadata_from_text("\n\n".join(texts))))
+            elapsed = time.perf_counter() - start
+
+        accuracy = field_accuracy(scores)
+        return {
+            'tickets': len(corpus),
+            'pages': pages,
+            'elapsed': elapsed,
+            'pages_per_sec': pages / elapsed if elapsed > 0 else 0.0,
+            'document_latency': latency_summary(document_ms),
+            'stage_latency': {name: latency_summary(samples) for name, samples in stages.items()},
+            'peak_rss_mb': monitor.peak_mb,
+            'field_accuracy': accuracy,
+            'threshold_accuracy': 0.9,
+            'passed': accuracy.get("overall", 0.0) >= 0.9
+        }
+
+    def _run_workflow_corpus(self, processor, tmp_dir, corpus):
+        """Phase 0 end to end (OCR, metadata, filing) for every ticket"""
+        from benchmark_corpus import score_fields
+        try:
+            from workflow import TicketWorkflow
+        except ImportError as e:
+            return {'status': 'SKIPPED', 'reason': f"workflow unavailable: {e}", 'passed': True}
+
+        workflow = TicketWorkflow()
+        # Keep output inside the scratch directory and reuse the loaded engine
+        workflow.processing_dir = tmp_dir / "processing"
+        workflow.failed_dir = tmp_dir / "failed"
+        workflow.log_file = tmp_dir / "media-analysis.log"
+        workflow.checkpoint_dir = tmp_dir / "checkpoints"
+        workflow.processing_dir.mkdir()
+        workflow.failed_dir.mkdir()
+        workflow._ocr = processor
+
+        ticket_ms = []
+        scores = []
+        failures = 0
+        with PeakRSSMonitor(self.process) as monitor:
+            start = time.perf_counter()
+            for entry in corpus:
+                ticket_start = time.perf_counter()
+                result = asyncio.run(workflow.process_ticket(tmp_dir / "corpus" / entry["file"]))
+                ticket_ms.append((time.perf_counter() - ticket_start) * 1000)
+                if not result.get("success"):
+                    failures += 1
+                    scores.append({field: False for field in entry["fields"] if field != "issue_title"})
+                    continue
+                with open(result["metadata_file"], encoding='utf-8') as f:
+                    scores.append(score_fields(entry["fields"], json.load(f)))
+            elapsed = time.perf_counter() - start
+
+        pages = sum(entry["pages"] for entry in corpus)
+        accuracy = field_accuracy(scores)
+        return {
+            'tickets': len(corpus),
+            'failures': failures,
+            'elapsed': elapsed,
+            'tickets_per_sec': len(corpus) / elapsed if elapsed > 0 else 0.0,
+            'pages_per_sec': pages / elapsed if elapsed > 0 else 0.0,
+            'ticket_latency': latency_summary(ticket_ms),
+            'peak_rss_mb': monitor.peak_mb,
+            'field_accuracy': accuracy,
+            'passed': failures == 0 and accuracy.get("overall", 0.0) >= 0.9
+        }
+
+    def print_comparison(self, previous):
+        """OCR throughput and accuracy against a previous results file"""
+        rows = []
+        for section, metric in (('ocr_corpus', 'pages_per_sec'), ('workflow_corpus', 'pages_per_sec'),
+                                ('ocr_corpus', 'peak_rss_mb')):
+            old = previous.get(section, {}).get(metric)
+            new = self.results.get(section, {}).get(metric)
+            if isinstance(old, (int, float)) and isinstance(new, (int, float)):
+                rows.append((f"{section}.{metric}", old, new))
+        for section in ('ocr_corpus', 'workflow_corpus'):
+            old = previous.get(section, {}).get('field_accuracy', {}).get('overall')
+            new = self.results.get(section, {}).get('field_accuracy', {}).get('overall')
+            if old is not None and new is not None:
+                rows.append((f"{section}.accuracy", old, new))
+        if not rows:
+            return
+
+        print("\nCompared with previous run:")
+        for name, old, new in rows:
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+            print(f"  {name:32s} {old:10.3f} -> {new:10.3f}  ({change})")
+
     def print_results(self):
         """Print performance test results"""
         print("\n" + "="*60)
@@ -211,10 +442,19 @@ class PerformanceTestSuite:
         print("[*] Checking CPU info...")
         self.check_cpu_info()
 
+        print(f"[*] Measuring OCR throughput ({self.corpus_size} synthetic tickets)...")
+        self.measure_ocr_throughput()
+
         self.print_results()
 
-        # Save results to file
+        # Save results to file (keeping the previous run for comparison)
         results_file = SKILL_DIR / "performance_results.json"
+        if results_file.exists():
+            try:
+                with open(results_file) as f:
+                    self.print_comparison(json.load(f))
+            except (OSError, ValueError):
+                pass
         with open(results_file, 'w') as f:
             json.dump(self.results, f, indent=2)
         print(f"\n[+] Results saved to: {results_file}")
@@ -222,7 +462,12 @@ class PerformanceTestSuite:
 
 def main():
     """Run performance test suite"""
-    suite = PerformanceTestSuite()
+    parser = argparse.ArgumentParser(description="BMAD-EDI performance tests")
+    parser.add_argument("--corpus-size", type=int, default=12, help="Synthetic tickets for the OCR benchmark")
+    parser.add_argument("--skip-ocr", action="store_true", help="Skip the OCR throughput benchmark")
+    args = parser.parse_args()
+
+    suite = PerformanceTestSuite(corpus_size=args.corpus_size, run_ocr=not args.skip_ocr)
     suite.run_all_tests()
 
 
@@ -0,0 +1,172 @@
+"""
+Test script for checkpointed, idempotent ticket processing
+Tests the checkpoint store, rerun of an unchanged input and resume after a crash
+"""
+
+import sys
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+
+from ticket_checkpoint import CheckpointStore
+from workflow import TicketWorkflow
+
+
+class CountingOCR:
+    """Stand-in OCR engine that counts calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def extract_text(self, file_path, **kwargs):
+        self.calls += 1
+        text = "Ticket #13620086\nCompany: Singtech Inc\nTrading Partner: Staples\nTransaction: 856 ASN"
+        return {"success": True, "text": text, "confidence": 0.93, "metadata": {"pages": 1}}
+
+    def close(self):
+        pass
+
+
+def _workflow(tmp_dir, ocr):
+    workflow = TicketWorkflow(checkpoints=True)
+    workflow.processing_dir = tmp_dir / "processing"
+    workflow.failed_dir = tmp_dir / "failed"
+    workflow.log_file = tmp_dir / "media-analysis.log"
+    workflow.checkpoint_dir = tmp_dir / "checkpoints"
+    workflow.processing_dir.mkdir()
+    workflow.failed_dir.mkdir()
+    workflow._ocr = ocr
+    return workflow
+
+
+def test_checkpoint_store():
+    """Stages persist per content hash; other contents get their own checkpoint"""
+    print("[+] Testing checkpoint store...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="checkpoint_test_"))
+    try:
+        ticket = tmp_dir / "ticket.pdf"
+        ticket.write_bytes(b"%PDF-1.4 ticket one")
+        store = CheckpointStore(tmp_dir / "checkpoints")
+
+        checkpoint = store.open(ticket)
+        assert checkpoint.next_stage == "extract" and checkpoint.result is None
+        checkpoint.complete("extract", {"metadata": {"ticket_id": "13620086"}})
+
+        # Same bytes under another name: same checkpoint, resumes at artifacts
+        copy = tmp_dir / "renamed.pdf"
+        shutil.copy2(ticket, copy)
+        reopened = store.open(copy)
+        assert reopened.stage("extract")["metadata"]["ticket_id"] == "13620086"
+        assert reopened.next_stage == "artifacts"
+        reopened.complete("artifacts", {"result": {"success": True}})
+        assert store.open(ticket).result == {"success": True}
+        assert store.open(ticket).data["files"] == ["ticket.pdf", "renamed.pdf"]
+
+        ticket.write_bytes(b"%PDF-1.4 ticket two")
+        assert store.open(ticket).next_stage == "extract"
+        assert not list((tmp_dir / "checkpoints").glob(".*.tmp"))
+
+        print("[+] SUCCESS: Checkpoints keyed by content")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_rerun_returns_saved_result():
+    """An unchanged, completed input returns its prior result without OCR"""
+    print("\n[+] Testing rerun of a processed ticket...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="checkpoint_rerun_test_"))
+    try:
+        ticket = tmp_dir / "ticket.png"
+        ticket.write_bytes(b"png ticket bytes")
+        ocr = CountingOCR()
+        workflow = _workflow(tmp_dir, ocr)
+
+        first = asyncio.run(workflow.process_ticket(ticket))
+        second = asyncio.run(workflow.process_ticket(ticket))
+        assert first["success"] and second["success"]
+        assert ocr.calls == 1, f"OCR ran {ocr.calls} times"
+        assert second["from_checkpoint"] and second["ticket_folder"] == first["ticket_folder"]
+
+        # Processing folder removed (e.g. archived by hand): artifacts rebuilt, still no OCR
+        shutil.rmtree(first["ticket_folder"])
+        third = asyncio.run(workflow.process_ticket(ticket))
+        assert third["success"] and not third.get("from_checkpoint")
+        assert Path(third["metadata_file"]).exists() and ocr.calls == 1
+        assert len(workflow._input_locks) == 0, "Per-input locks kept after the runs"
+
+        print("[+] SUCCESS: Rerun skipped OCR")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_resume_after_crash():
+    """A crash after OCR resumes at the artifact stage on the next run"""
+    print("\n[+] Testing resume after a crash...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="checkpoint_resume_test_"))
+    try:
+        ticket = tmp_dir / "ticket.pdf"
+        ticket.write_bytes(b"%PDF-1.4 crash ticket")
+        ocr = CountingOCR()
+        workflow = _workflow(tmp_dir, ocr)
+
+        write_ticket_files = workflow._write_ticket_files
+
+        def crash(*args):
+            raise OSError("disk full")
+
+        workflow._write_ticket_files = crash
+        failed = asyncio.run(workflow.process_ticket(ticket))
+        assert not failed["success"] and ocr.calls == 1
+
+        workflow._write_ticket_files = write_ticket_files
+        resumed = asyncio.run(workflow.process_ticket(ticket))
+        assert resumed["success"], resumed
+        assert ocr.calls == 1, "OCR was repeated after the crash"
+        assert resumed["ticket_id"] == "13620086"
+
+        print("[+] SUCCESS: Resumed without repeating OCR")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("="*60)
+    print("Ticket Checkpoint Test Suite")
+    print("="*60)
+
+    results = [
+        ("Checkpoint Store", test_checkpoint_store()),
+        ("Rerun Returns Saved Result", test_rerun_returns_saved_result()),
+        ("Resume After Crash", test_resume_after_crash()),
+    ]
+
+    print("\n" + "="*60)
+    print("Test Results Summary")
+    print("="*60)
+
+    passed = sum(1 for _, result in results if result)
+    for test_name, result in results:
+        status = "[PASS]" if result else "[FAIL]"
+        print(f"{status} {test_name}")
+
+    print(f"\nPassed: {passed}/{len(results)}")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
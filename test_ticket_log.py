@@ -0,0 +1,251 @@
+"""
+Test script for the structured, non-blocking Phase 0 log
+Tests JSON records with ticket context, rotation, workflow events and non-blocking writes
+"""
+
+import os
+import sys
+import time
+import shutil
+import asyncio
+import tempfile
+from pathlib import Path
+
+import ticket_log
+from ticket_log import get_logger, log_context, read_records, summarize
+
+
+def test_json_records():
+    """Records carry the bound ticket context and extra fields"""
+    print("[+] Testing JSON records...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="ticket_log_test_"))
+    try:
+        log_file = tmp_dir / "media-analysis.log"
+        # A plain-text line from before JSON logging
+        log_file.write_text("[2025-10-29 09:00:00] [INFO] [PHASE 0] Processing: old.pdf\n", encoding="utf-8")
+
+        logger = get_logger(log_file, console=False)
+        with log_context(file="ticket.pdf", stage="extract"):
+            logger.info("OCR done", extra={"fields": {"event": "ocr_done", "pages": 3}})
+            with log_context(ticket_id="13620086"):
+                logger.warning("Low confidence")
+        logger.error("Outside a ticket")
+        ticket_log.shutdown(log_file)
+
+        legacy, first, second, third = list(read_records(log_file))
+        assert legacy["level"] == "INFO" and legacy["message"].endswith("old.pdf")
+        assert first["file"] == "ticket.pdf" and first["stage"] == "extract"
+        assert first["event"] == "ocr_done" and first["pages"] == 3
+        assert second["ticket_id"] == "13620086" and second["level"] == "WARNING"
+        assert "file" not in third and third["level"] == "ERROR"
+
+        print("[+] SUCCESS: Records are structured")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_rotation():
+    """The log rotates at its size limit and reads back in order"""
+    print("\n[+] Testing rotation...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="ticket_log_rotate_test_"))
+    os.environ["PHASE0_LOG_MAX_MB"] = "0.01"
+    os.environ["PHASE0_LOG_BACKUPS"] = "50"
+    try:
+        log_file = tmp_dir / "media-analysis.log"
+        logger = get_logger(log_file, console=False)
+        for number in range(500):
+            logger.info(f"message {number:04d}")
+        ticket_log.shutdown(log_file)
+
+        files = list(tmp_dir.glob("media-analysis.log*"))
+        assert len(files) > 2, f"Only {len(files)} log files"
+        assert all(path.stat().st_size <= 11 * 1024 for path in files)
+        messages = [record["message"] for record in read_records(log_file)]
+        assert messages == [f"message {number:04d}" for number in range(500)], "Rotated records out of order"
+
+        print(f"[+] SUCCESS: Rotated into {len(files)} files")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        del os.environ["PHASE0_LOG_MAX_MB"]
+        del os.environ["PHASE0_LOG_BACKUPS"]
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _write_from_process(log_file, name, count, go):
+    """Child process: log count numbered records once all writers are up"""
+    logger = get_logger(log_file, console=False)
+    go.wait()
+    for number in range(count):
+        logger.info(f"{name} {number:04d}")
+    ticket_log.shutdown(log_file)
+
+
+def test_rotation_across_processes():
+    """Several processes share one rotating log without losing or reordering records"""
+    print("\n[+] Testing rotation with several writer processes...")
+    import multiprocessing
+    tmp_dir = Path(tempfile.mkdtemp(prefix="ticket_log_processes_test_"))
+    os.environ["PHASE0_LOG_MAX_MB"] = "0.01"
+    os.environ["PHASE0_LOG_BACKUPS"] = "200"
+    try:
+        log_file = tmp_dir / "media-analysis.log"
+        context = multiprocessing.get_context("spawn")
+        go = context.Event()
+        writers = [context.Process(target=_write_from_process, args=(log_file, f"writer{n}", 1000, go))
+                   for n in range(3)]
+        for writer in writers:
+            writer.start()
+        time.sleep(2)
+        go.set()
+        for writer in writers:
+            writer.join()
+        assert all(writer.exitcode == 0 for writer in writers)
+
+        files = list(tmp_dir.glob("media-analysis.log*"))
+        assert len(files) > 5, f"Only {len(files)} log files"
+        assert all(path.stat().st_size <= 11 * 1024 for path in files)
+        messages = [record["message"] for record in read_records(log_file)]
+        assert len(messages) == 3000, f"{len(messages)} of 3000 records"
+        for n in range(3):
+            own = [message for message in messages if message.startswith(f"writer{n} ")]
+            assert own == [f"writer{n} {number:04d}" for number in range(1000)], f"writer{n} out of order"
+
+        print(f"[+] SUCCESS: 3000 records from 3 processes in {len(files)} files")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        del os.environ["PHASE0_LOG_MAX_MB"]
+        del os.environ["PHASE0_LOG_BACKUPS"]
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+class FakeOCR:
+    """Stand-in OCR engine"""
+
+    def extract_text(self, file_path, **kwargs):
+        text = "Ticket #13620086\nCompany: Singtech Inc\nTrading Partner: Staples"
+        return {"success": True, "text": text, "confidence": 0.93, "metadata": {"pages": 1}}
+
+    def close(self):
+        pass
+
+
+def test_workflow_events():
+    """process_ticket logs lifecycle events that status tooling can count"""
+    print("\n[+] Testing workflow events...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="ticket_log_workflow_test_"))
+    try:
+        from workflow import TicketWorkflow
+
+        workflow = TicketWorkflow(checkpoints=False)
+        workflow.processing_dir = tmp_dir / "processing"
+        workflow.failed_dir = tmp_dir / "failed"
+        workflow.log_file = tmp_dir / "media-analysis.log"
+        workflow.processing_dir.mkdir()
+        workflow.failed_dir.mkdir()
+        workflow._ocr = FakeOCR()
+
+        ticket = tmp_dir / "ticket.png"
+        ticket.write_bytes(b"png ticket")
+        assert asyncio.run(workflow.process_ticket(ticket))["success"]
+        assert not asyncio.run(workflow.process_ticket(tmp_dir / "missing.png"))["success"]
+        ticket_log.shutdown(workflow.log_file)
+
+        records = list(read_records(workflow.log_file))
+        summary = summarize(records)
+        assert summary["events"] == {"ticket_started": 2, "ticket_succeeded": 1, "ticket_failed": 1}, summary
+        succeeded = next(r for r in records if r.get("event") == "ticket_succeeded")
+        assert succeeded["file"] == "ticket.png" and succeeded["ticket_id"] == "13620086"
+        assert succeeded["stage"] == "artifacts"
+        # OCR ran on the OCR thread; the context followed it
+        ocr = next(r for r in records if "PaddleOCR extracted" in r["message"])
+        assert ocr["file"] == "ticket.png" and ocr["stage"] == "extract"
+
+        print("[+] SUCCESS: Events logged with ticket context")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_non_blocking():
+    """Callers never wait on the disk: a slow writer does not slow log calls"""
+    print("\n[+] Testing non-blocking writes...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="ticket_log_slow_test_"))
+    try:
+        count = 300
+        log_file = tmp_dir / "media-analysis.log"
+        logger = get_logger(log_file, console=False)
+
+        # Every write takes 2 ms (slow share, antivirus scan)
+        file_handler = logger.listener.handlers[0]
+        emit = file_handler.emit
+
+        def slow_emit(record):
+            time.sleep(0.002)
+            emit(record)
+
+        file_handler.emit = slow_emit
+
+        start = time.perf_counter()
+        for number in range(count):
+            logger.info(f"message {number}")
+        caller_seconds = time.perf_counter() - start
+        ticket_log.shutdown(log_file)
+        writer_seconds = time.perf_counter() - start
+
+        print(f"[*] {count} messages: callers {caller_seconds * 1000:.1f} ms, "
+              f"writer {writer_seconds * 1000:.1f} ms")
+        assert len(list(read_records(log_file))) == count, "Records lost"
+        assert caller_seconds < count * 0.002 / 4, "Log calls waited on the writer"
+
+        print("[+] SUCCESS: Logging is off the caller's path")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("="*60)
+    print("Ticket Log Test Suite")
+    print("="*60)
+
+    results = [
+        ("JSON Records", test_json_records()),
+        ("Rotation", test_rotation()),
+        ("Rotation Across Processes", test_rotation_across_processes()),
+        ("Workflow Events", test_workflow_events()),
+        ("Non-Blocking Writes", test_non_blocking()),
+    ]
+
+    print("\n" + "="*60)
+    print("Test Results Summary")
+    print("="*60)
+
+    passed = sum(1 for _, result in results if result)
+    for test_name, result in results:
+        status = "[PASS]" if result else "[FAIL]"
+        print(f"{status} {test_name}")
+
+    print(f"\nPassed: {passed}/{len(results)}")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,207 @@
+"""
+Test script for metadata.json with the OCR text in a compressed sidecar
+Tests lazy loading, legacy files, the workflow's output and metadata read speed
+"""
+
+import sys
+import json
+import time
+import random
+import shutil
+import asyncio
+import tempfile
+from pathlib import Path
+
+from ticket_metadata import load_metadata, write_metadata, TicketMetadata
+
+
+def _ocr_text(rng, chars):
+    """OCR-like text: short lines of EDI segments"""
+    words = ["ISA", "GS", "ST*856", "BSN", "HL", "REF*BM", "N1*ST", "Staples", "SSCC", "LIN", "SN1*EA", "Qty:"]
+    lines = []
+    length = 0
+    while length < chars:
+        line = " ".join(rng.choice(words) + str(rng.randint(0, 99999)) for _ in range(8))
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
+def test_lazy_sidecar():
+    """ocr_text moves to the sidecar and loads only when accessed"""
+    print("[+] Testing lazy OCR text sidecar...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="ticket_metadata_test_"))
+    try:
+        metadata_file = tmp_dir / "metadata.json"
+        text = _ocr_text(random.Random(1), 50_000)
+        original = {"ticket_id": "13620086", "confidence": 0.93, "ocr_text": text}
+        write_metadata(metadata_file, original)
+        assert "ocr_text" in original, "Caller's dict modified"
+
+        with open(metadata_file, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        assert "ocr_text" not in raw and raw["ocr_text_chars"] == len(text)
+        assert (tmp_dir / raw["ocr_text_file"]).stat().st_size < len(text) / 2
+
+        metadata = load_metadata(metadata_file)
+        assert not dict.__contains__(metadata, "ocr_text"), "Sidecar loaded eagerly"
+        assert "ocr_text" in metadata and metadata["ticket_id"] == "13620086"
+        assert metadata.get("ocr_text", "") == text and metadata["ocr_text"] == text
+        assert metadata.get("missing", "default") == "default"
+
+        # Rewrite without touching ocr_text: the sidecar reference survives
+        untouched = load_metadata(metadata_file)
+        untouched["ocr_partial"] = False
+        write_metadata(metadata_file, untouched)
+        assert load_metadata(metadata_file)["ocr_text"] == text
+
+        # Older metadata.json with ocr_text inline
+        legacy_file = tmp_dir / "legacy" / "metadata.json"
+        legacy_file.parent.mkdir()
+        legacy_file.write_text(json.dumps({"ticket_id": "1", "ocr_text": "inline"}), encoding="utf-8")
+        legacy = load_metadata(legacy_file)
+        assert legacy["ocr_text"] == "inline" and legacy.sidecars() == []
+        assert TicketMetadata({}, tmp_dir).get("ocr_text", "") == ""
+
+        # Sidecar deleted or corrupt: the field reads as absent
+        (tmp_dir / raw["ocr_text_file"]).unlink()
+        assert load_metadata(metadata_file).get("ocr_text", "") == ""
+        (tmp_dir / raw["ocr_text_file"]).write_bytes(b"not gzip")
+        assert load_metadata(metadata_file).get("ocr_text") is None
+        try:
+            load_metadata(metadata_file)["ocr_text"]
+            assert False, "Missing sidecar did not raise KeyError"
+        except KeyError:
+            pass
+        assert not list(tmp_dir.glob(".*.tmp"))
+
+        print("[+] SUCCESS: OCR text loads lazily")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+class FakeOCR:
+    """Stand-in OCR engine returning a long text"""
+
+    def __init__(self, text):
+        self.text = text
+
+    def extract_text(self, file_path, **kwargs):
+        return {"success": True, "text": self.text, "confidence": 0.93, "metadata": {"pages": 40}}
+
+    def close(self):
+        pass
+
+
+def test_workflow_writes_sidecar():
+    """process_ticket keeps metadata.json small; the analysis still sees the text"""
+    print("\n[+] Testing workflow output...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="ticket_metadata_workflow_test_"))
+    try:
+        from workflow import TicketWorkflow
+
+        text = "Ticket #13620086\nCompany: Singtech Inc\nTrading Partner: Staples\n" + \
+            _ocr_text(random.Random(2), 200_000)
+        workflow = TicketWorkflow(checkpoints=False)
+        workflow.processing_dir = tmp_dir / "processing"
+        workflow.failed_dir = tmp_dir / "failed"
+        workflow.log_file = tmp_dir / "media-analysis.log"
+        workflow.processing_dir.mkdir()
+        workflow.failed_dir.mkdir()
+        workflow._ocr = FakeOCR(text)
+
+        ticket = tmp_dir / "ticket.pdf"
+        ticket.write_bytes(b"%PDF-1.4 long ticket")
+        result = asyncio.run(workflow.process_ticket(ticket))
+        assert result["success"]
+
+        metadata_file = Path(result["metadata_file"])
+        print(f"[*] metadata.json: {metadata_file.stat().st_size} bytes for {len(text)} characters of OCR text")
+        assert metadata_file.stat().st_size < 8 * 1024
+        assert load_metadata(metadata_file)["ocr_text"] == text
+        analysis = Path(result["analysis_file"]).read_text(encoding="utf-8")
+        assert f"Characters extracted: {len(text)}" in analysis
+
+        print("[+] SUCCESS: metadata.json kept small")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_read_speed():
+    """Reading metadata across many tickets is an order of magnitude faster"""
+    print("\n[+] Testing metadata read speed...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="ticket_metadata_speed_test_"))
+    try:
+        rng = random.Random(3)
+        # Long multi-page tickets: ~500 KB of OCR text each
+        tickets = 100
+        text = _ocr_text(rng, 500_000)
+        for number in range(tickets):
+            fields = {"ticket_id": str(13600000 + number), "company": "Singtech Inc",
+                      "trading_partner": "Staples", "confidence": 0.9, "ocr_text": text}
+            legacy = tmp_dir / "legacy" / f"ticket_{number}"
+            legacy.mkdir(parents=True)
+            with open(legacy / "metadata.json", 'w', encoding='utf-8') as f:
+                json.dump(fields, f, indent=2, ensure_ascii=False)
+            split = tmp_dir / "split" / f"ticket_{number}"
+            split.mkdir(parents=True)
+            write_metadata(split / "metadata.json", fields)
+
+        def read_all(folder):
+            start = time.perf_counter()
+            companies = set()
+            for metadata_file in sorted(folder.glob("*/metadata.json")):
+                companies.add(load_metadata(metadata_file)["company"])
+            return time.perf_counter() - start
+
+        legacy_seconds = min(read_all(tmp_dir / "legacy") for _ in range(3))
+        split_seconds = min(read_all(tmp_dir / "split") for _ in range(3))
+        print(f"[*] {tickets} tickets: inline ocr_text {legacy_seconds * 1000:.0f} ms, "
+              f"sidecar {split_seconds * 1000:.0f} ms ({legacy_seconds / split_seconds:.0f}x)")
+        assert legacy_seconds / split_seconds >= 10, "Less than an order of magnitude faster"
+
+        print("[+] SUCCESS: Metadata reads are fast")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("="*60)
+    print("Ticket Metadata Test Suite")
+    print("="*60)
+
+    results = [
+        ("Lazy Sidecar", test_lazy_sidecar()),
+        ("Workflow Writes Sidecar", test_workflow_writes_sidecar()),
+        ("Read Speed", test_read_speed()),
+    ]
+
+    print("\n" + "="*60)
+    print("Test Results Summary")
+    print("="*60)
+
+    passed = sum(1 for _, result in results if result)
+    for test_name, result in results:
+        status = "[PASS]" if result else "[FAIL]"
+        print(f"{status} {test_name}")
+
+    print(f"\nPassed: {passed}/{len(results)}")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
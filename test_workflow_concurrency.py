@@ -0,0 +1,205 @@
+"""
+Test script for concurrent ticket processing in the Phase 0 workflow
+Tests batch mode with a bounded set of shared OCR engines and one Gemini
+browser, and that OCR runs alongside Gemini jobs instead of blocking the event loop
+"""
+
+import sys
+import json
+import time
+import asyncio
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+from workflow import TicketWorkflow
+
+
+class FakeOCR:
+    """Stand-in OCR engine: fixed text per file, records overlapping calls"""
+
+    def __init__(self, seconds=0.1):
+        self.seconds = seconds
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def extract_text(self, file_path, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.seconds)
+        with self._lock:
+            self.active -= 1
+
+        name = Path(file_path).stem
+        if name.startswith("corrupt"):
+            return {"success": False, "error": "cannot identify image file"}
+        number = name.split("_")[-1]
+        text = f"Ticket #{number}\nCompany: Singtech Inc\nTrading Partner: Staples\nTransaction: 856 ASN"
+        confidence = 0.5 if name.startswith("faint") else 0.95
+        return {"success": True, "text": text, "confidence": confidence, "metadata": {"pages": 1}}
+
+    def close(self):
+        pass
+
+
+class FakeGemini:
+    """Stand-in Gemini analyzer (one shared 'browser')"""
+
+    def __init__(self, seconds=0.1):
+        self.seconds = seconds
+        self.calls = 0
+        self.closed = False
+
+    async def extract_edi_metadata(self, file_path):
+        self.calls += 1
+        await asyncio.sleep(self.seconds)
+        return {"ticket_id": "7777777", "company": "Acme", "trading_partner": "Target",
+                "transaction_type": "850 PO", "confidence": 0.9}
+
+    async def cleanup(self):
+        self.closed = True
+
+
+def _workflow(tmp_dir, ocr, gemini=None):
+    """Workflow writing into tmp_dir, with fake engines"""
+    workflow = TicketWorkflow()
+    workflow.processing_dir = tmp_dir / "processing"
+    workflow.failed_dir = tmp_dir / "failed"
+    workflow.log_file = tmp_dir / "media-analysis.log"
+    workflow.checkpoint_dir = tmp_dir / "checkpoints"
+    workflow.processing_dir.mkdir()
+    workflow.failed_dir.mkdir()
+    workflow._ocr = ocr
+    workflow._gemini = gemini
+    return workflow
+
+
+def test_batch_summary():
+    """Batch mode processes every ticket and reports failures and low confidence"""
+    print("[+] Testing batch mode...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="workflow_batch_test_"))
+    try:
+        batch_dir = tmp_dir / "batch"
+        batch_dir.mkdir()
+        for name in ["ticket_1000001.png", "ticket_1000002.pdf", "faint_1000003.jpg",
+                     "corrupt_1000004.png", "call_1.mp3", "call_2.mp4", "notes.txt"]:
+            (batch_dir / name).write_bytes(name.encode())
+
+        ocr, gemini = FakeOCR(), FakeGemini()
+        workflow = _workflow(tmp_dir, ocr, gemini)
+        engines = []
+
+        def create_ocr():
+            # Extra engines share the fake's counters
+            engines.append(ocr)
+            return ocr
+
+        workflow._create_ocr = create_ocr
+        summary = asyncio.run(workflow.process_batch(batch_dir, jobs=3))
+
+        assert summary["tickets"] == 6, summary["tickets"]
+        assert summary["succeeded"] == 5
+        assert [f["file"] for f in summary["failed"]] == ["corrupt_1000004.png"]
+        assert [t["file"] for t in summary["low_confidence"]] == ["faint_1000003.jpg"]
+        assert ocr.calls == 4 and 1 < ocr.max_active <= 3, f"{ocr.max_active} documents OCR'd at once (want 2-3)"
+        assert len(engines) <= 2, "more engines than jobs"
+        assert workflow.ocr_engines == 1, "batch engine count not restored"
+        assert gemini.calls == 2 and gemini.closed, "media tickets must share one browser, closed at the end"
+
+        metadata_file = tmp_dir / "processing" / "ticket_1000002" / "metadata.json"
+        with open(metadata_file, encoding='utf-8') as f:
+            assert json.load(f)["trading_partner"] == "Staples"
+
+        print(f"[+] SUCCESS: {summary['tickets']} tickets, {summary['tickets_per_minute']:.0f} tickets/min")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_ocr_overlaps_gemini():
+    """A PDF in OCR and an audio ticket in Gemini progress at the same time"""
+    print("\n[+] Testing OCR / Gemini overlap...")
+    tmp_dir = Path(tempfile.mkdtemp(prefix="workflow_overlap_test_"))
+    try:
+        pdf, audio = tmp_dir / "ticket_1000001.pdf", tmp_dir / "call.mp3"
+        pdf.write_bytes(b"ticket")
+        audio.write_bytes(b"audio")
+
+        seconds = 0.5
+        workflow = _workflow(tmp_dir, FakeOCR(seconds), FakeGemini(seconds))
+        workflow.reuse_browser = True
+
+        async def run():
+            # Heartbeat: the largest gap shows how long the event loop was blocked
+            gaps = []
+            stop = asyncio.Event()
+
+            async def heartbeat():
+                last = time.perf_counter()
+                while not stop.is_set():
+                    await asyncio.sleep(0.01)
+                    now = time.perf_counter()
+                    gaps.append(now - last)
+                    last = now
+
+            beat = asyncio.create_task(heartbeat())
+            start = time.perf_counter()
+            results = await asyncio.gather(workflow.process_ticket(pdf), workflow.process_ticket(audio))
+            elapsed = time.perf_counter() - start
+            stop.set()
+            await beat
+            await workflow.close()
+            return results, elapsed, max(gaps)
+
+        results, elapsed, max_gap = asyncio.run(run())
+
+        assert all(result["success"] for result in results), results
+        # Serial would take 2 x 0.5s; overlapped takes about 0.5s
+        assert elapsed < 1.5 * seconds, f"{elapsed:.2f}s: OCR and Gemini did not overlap"
+        assert max_gap < seconds / 2, f"event loop blocked for {max_gap:.2f}s"
+
+        print(f"[+] SUCCESS: 2 x {seconds:.1f}s jobs in {elapsed:.2f}s "
+              f"(longest event loop stall {max_gap * 1000:.0f}ms)")
+        return True
+    except AssertionError as e:
+        print(f"[!] FAILED: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("="*60)
+    print("Workflow Concurrency Test Suite")
+    print("="*60)
+
+    results = [
+        ("Batch Summary", test_batch_summary()),
+        ("OCR / Gemini Overlap", test_ocr_overlaps_gemini()),
+    ]
+
+    print("\n" + "="*60)
+    print("Test Results Summary")
+    print("="*60)
+
+    passed = sum(1 for _, result in results if result)
+    for test_name, result in results:
+        status = "[PASS]" if result else "[FAIL]"
+        print(f"{status} {test_name}")
+
+    print(f"\nPassed: {passed}/{len(results)}")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
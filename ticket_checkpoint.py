@@ -0,0 +1,126 @@
+"""
+Ticket Checkpoints
+Idempotent Phase 0 processing keyed by the input file's content hash
+
+Every input file gets one checkpoint, named by the SHA-256 of its bytes,
+recording the stages it has completed:
+    extract     Metadata from OCR or Gemini (the expensive part), saved
+                before anything is written to processing/
+    artifacts   Processing folder, file copy, metadata.json and analysis
+                written; holds the final process_ticket result
+
+A rerun on the same bytes (watcher restart, manual rerun, duplicate drop
+under another name) resumes at the first stage that has not finished, so
+a crash after OCR never loses the OCR work, and a completed ticket returns
+its saved result at the cost of hashing the file.
+
+Checkpoints are gzip-compressed JSON files written atomically (temp file
++ os.replace); a crash mid-write leaves the previous checkpoint intact.
+"""
+
+import os
+import gzip
+import json
+import threading
+from pathlib import Path
+from datetime import datetime
+
+from ocr_cache import hash_file
+
+STAGES = ("extract", "artifacts")
+
+
+class TicketCheckpoint:
+    """Completed stages for one input file"""
+
+    def __init__(self, store, input_hash, data=None):
+        self.store = store
+        self.input_hash = input_hash
+        self.data = data or {"input_hash": input_hash, "stages": {}}
+
+    def stage(self, name):
+        """Saved output of a completed stage, or None"""
+        return self.data["stages"].get(name)
+
+    def complete(self, name, output):
+        """Record a stage as done (persisted before returning)"""
+        if name not in STAGES:
+            raise ValueError(f"Unknown stage: {name}")
+        self.data["stages"][name] = output
+        self.data["updated_at"] = datetime.now().isoformat()
+        self.store.save(self)
+
+    @property
+    def next_stage(self):
+        """First stage not completed yet (None when all are done)"""
+        for stage in STAGES:
+            if stage not in self.data["stages"]:
+                return stage
+        return None
+
+    @property
+    def result(self):
+        """Final process_ticket result, once every stage is done"""
+        artifacts = self.stage("artifacts")
+        return artifacts.get("result") if artifacts else None
+
+
+class CheckpointStore:
+    """Directory of checkpoints, one per input content hash"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, input_hash):
+        return self.directory / f"{input_hash}.json.gz"
+
+    def open(self, file_path, input_hash=None):
+        """
+        Checkpoint for a file's current contents (empty if never seen)
+
+        Args:
+            file_path: Input ticket file
+            input_hash: SHA-256 of the file, if already computed
+
+        Returns:
+            TicketCheckpoint
+        """
+        input_hash = input_hash or hash_file(file_path)
+        checkpoint = self.load(input_hash)
+        if checkpoint is None:
+            checkpoint = TicketCheckpoint(self, input_hash)
+        checkpoint.data.setdefault("files", [])
+        if Path(file_path).name not in checkpoint.data["files"]:
+            checkpoint.data["files"].append(Path(file_path).name)
+        return checkpoint
+
+    def load(self, input_hash):
+        """Saved checkpoint for a content hash, or None (missing or unreadable)"""
+        try:
+            with gzip.open(self._path(input_hash), 'rt', encoding='utf-8') as f:
+                return TicketCheckpoint(self, input_hash, json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"[!] Ignoring unreadable checkpoint {input_hash[:12]}: {e}")
+            return None
+
+    def save(self, checkpoint):
+        """Write a checkpoint atomically"""
+        path = self._path(checkpoint.input_hash)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        data = gzip.compress(json.dumps(checkpoint.data, ensure_ascii=False, default=str).encode("utf-8"))
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def remove(self, input_hash):
+        """Delete a checkpoint (the next run starts from scratch)"""
+        try:
+            self._path(input_hash).unlink()
+            return True
+        except FileNotFoundError:
+            return False
@@ -0,0 +1,402 @@
+"""
+Phase 0 Structured Log
+Non-blocking JSON-lines logging with rotation for the ticket workflow
+
+A log call only puts the record on an in-memory queue; a background
+QueueListener thread formats it, prints it to the console and appends it
+to one open log file (no open/append/close per message). Each line in the
+file is a JSON object:
+
+    {"ts": "2026-10-18T15:59:49.123", "level": "INFO", "message": "...",
+     "file": "ticket.pdf", "stage": "extract", "ticket_id": "13620086",
+     "event": "ticket_succeeded"}
+
+file / stage / ticket_id come from the current log context (log_context),
+which follows asyncio tasks and is captured on the calling thread. "event"
+marks records that status tooling counts (ticket_started, ticket_succeeded,
+ticket_failed, ticket_reused, ...), so readers never scrape message text.
+
+Rotation:
+    PHASE0_LOG_MAX_MB         Rotate at this size (default: 10)
+    PHASE0_LOG_BACKUPS        Rotated files kept (default: 5)
+    PHASE0_LOG_ROTATE_WHEN    Rotate by time instead, e.g. "midnight"
+                              (see logging.handlers.TimedRotatingFileHandler)
+    PHASE0_LOG_CONSOLE        Echo to stdout (default: on unless "0")
+
+Several processes may write one log (job_queue `run` processes, a manual
+workflow.py run). Each write and rotation holds a lock on a side file
+(.media-analysis.log.lock), and rotation copies the live file, then
+truncates it in place, so the file other processes hold open stays valid
+(a rename would strand their records, and fails on Windows while the file
+is open elsewhere).
+
+read_records() reads a log and its rotated files oldest first, and still
+understands the plain-text lines older versions wrote.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import queue
+import shutil
+import atexit
+import logging
+import threading
+import contextvars
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+
+DEFAULT_MAX_MB = 10
+DEFAULT_BACKUPS = 5
+
+# Fields bound for the current ticket (see log_context)
+_context = contextvars.ContextVar("ticket_log_context", default={})
+
+_loggers = {}
+_loggers_lock = threading.Lock()
+
+# Lines written before JSON logging: workflow "[ts] [LEVEL] msg", watcher "ts - LEVEL - msg"
+_LEGACY_LINE = re.compile(
+    r'^(?:\[(?P<ts>[^\]]+)\] \[(?P<level>[A-Z]+)\]|(?P<ts2>\d{4}-\d\d-\d\d [\d:,]+) - (?P<level2>[A-Z]+) -) '
+    r'(?P<message>.*)$'
+)
+
+
+@contextmanager
+def log_context(**fields):
+    """Bind fields (file, stage, ticket_id, ...) to every record logged inside the block"""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def bind(**fields):
+    """Add fields to the current log context until it ends (task, thread or log_context block)"""
+    _context.set({**_context.get(), **fields})
+
+
+def log_fields(**fields):
+    """logging `extra` carrying structured fields, e.g. logging.info(msg, extra=log_fields(event="x"))"""
+    return {"fields": fields}
+
+
+class _ContextFilter(logging.Filter):
+    """Copy the caller's log context onto the record (runs on the calling thread)"""
+
+    def filter(self, record):
+        record.context = _context.get()
+        return True
+
+
+class _PhaseLogger(logging.Logger):
+    """Logger without the per-call stack walk for caller file/line (not logged)"""
+
+    def findCaller(self, stack_info=False, stacklevel=1):
+        return "(unknown file)", 0, "(unknown function)", None
+
+
+class _FastQueueHandler(QueueHandler):
+    """QueueHandler that queues the record itself: message merged, no copy or pre-formatting"""
+
+    def prepare(self, record):
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, message, context and extra fields"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "message": record.getMessage()
+        }
+        for fields in (getattr(record, "context", None), getattr(record, "fields", None)):
+            entry.update((key, value) for key, value in (fields or {}).items() if value is not None)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _ConsoleFormatter(logging.Formatter):
+    """The workflow's original console format: [timestamp] [LEVEL] message"""
+
+    def format(self, record):
+        timestamp = datetime.fromtimestamp(record.created).strftime("%Y-%m-%d %H:%M:%S")
+        return f"[{timestamp}] [{record.levelname}] {record.getMessage()}"
+
+
+class _ProcessLock:
+    """Exclusive lock on a side file, shared by every process writing one log"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        if self._file is None:
+            self._file = os.fdopen(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644), 'r+b')
+        self._file.seek(0)
+        if os.name == 'nt':
+            import msvcrt
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10 s; keep waiting
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self._file
+
+    def __exit__(self, *exc):
+        self._file.seek(0)
+        if os.name == 'nt':
+            import msvcrt
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class _SharedRotation:
+    """Rotation for a log several processes append to (mixed into the stdlib handlers)"""
+
+    def _init_shared(self):
+        base = Path(self.baseFilename)
+        self._process_lock = _ProcessLock(base.with_name(f".{base.name}.lock"))
+
+    def _rotated_elsewhere(self, lock_file):
+        return False
+
+    def _mark_rotated(self, lock_file, boundary):
+        pass
+
+    def emit(self, record):
+        try:
+            with self._process_lock as lock_file:
+                boundary = getattr(self, "rolloverAt", None)
+                if self.shouldRollover(record) and not self._rotated_elsewhere(lock_file):
+                    self.doRollover()
+                    self._mark_rotated(lock_file, boundary)
+                logging.FileHandler.emit(self, record)
+        except Exception:
+            self.handleError(record)
+
+    def rotate(self, source, dest):
+        # Copy, then truncate in place: other processes keep appending to the same file
+        if os.path.exists(source):
+            shutil.copyfile(source, dest)
+            os.truncate(source, 0)
+
+    def close(self):
+        super().close()
+        self._process_lock.close()
+
+
+class _SharedRotatingFileHandler(_SharedRotation, RotatingFileHandler):
+    """Size rotation; the size checked is the shared file's, so one process rotates"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._init_shared()
+
+
+class _SharedTimedRotatingFileHandler(_SharedRotation, TimedRotatingFileHandler):
+    """Time rotation; the lock file records the last interval rotated, so only one process rotates it"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._init_shared()
+
+    def _rotated_elsewhere(self, lock_file):
+        lock_file.seek(0)
+        stamp = lock_file.read(20)
+        if not stamp.strip() or int(stamp) < self.rolloverAt:
+            return False
+        now = int(time.time())
+        rollover_at = self.computeRollover(now)
+        while rollover_at <= now:
+            rollover_at += self.interval
+        self.rolloverAt = rollover_at
+        return True
+
+    def _mark_rotated(self, lock_file, boundary):
+        lock_file.seek(0)
+        lock_file.write(b"%020d" % int(boundary))
+        lock_file.flush()
+
+
+def file_handler(log_file, max_mb=None, backups=None, when=None):
+    """
+    Rotating JSON-lines file handler (size-based, or time-based when `when` is set),
+    safe for several processes writing the same log
+
+    Args:
+        log_file: Log path
+        max_mb: Size limit (default: PHASE0_LOG_MAX_MB or 10)
+        backups: Rotated files kept (default: PHASE0_LOG_BACKUPS or 5)
+        when: TimedRotatingFileHandler interval (default: PHASE0_LOG_ROTATE_WHEN)
+    """
+    log_file = Path(log_file)
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    max_mb = max_mb or float(os.environ.get("PHASE0_LOG_MAX_MB", DEFAULT_MAX_MB))
+    backups = backups if backups is not None else int(os.environ.get("PHASE0_LOG_BACKUPS", DEFAULT_BACKUPS))
+    when = when or os.environ.get("PHASE0_LOG_ROTATE_WHEN")
+
+    if when:
+        handler = _SharedTimedRotatingFileHandler(log_file, when=when, backupCount=backups, encoding="utf-8")
+    else:
+        handler = _SharedRotatingFileHandler(log_file, maxBytes=int(max_mb * 1024 * 1024),
+                                      backupCount=backups, encoding="utf-8")
+    handler.setFormatter(JsonLineFormatter())
+    return handler
+
+
+def get_logger(log_file, console=None):
+    """
+    Non-blocking logger for a log file (one background writer per file)
+
+    Args:
+        log_file: JSON-lines log path
+        console: Echo records to stdout (default: PHASE0_LOG_CONSOLE, on)
+
+    Returns:
+        logging.Logger
+    """
+    key = str(log_file)
+    logger = _loggers.get(key)
+    if logger is not None:
+        return logger
+
+    with _loggers_lock:
+        if key in _loggers:
+            return _loggers[key]
+        if console is None:
+            console = os.environ.get("PHASE0_LOG_CONSOLE", "1") != "0"
+
+        handlers = [file_handler(log_file)]
+        if console:
+            stream = logging.StreamHandler(sys.stdout)
+            stream.setFormatter(_ConsoleFormatter())
+            handlers.append(stream)
+
+        records = queue.SimpleQueue()
+        listener = QueueListener(records, *handlers, respect_handler_level=False)
+        listener.start()
+
+        queue_handler = _FastQueueHandler(records)
+        queue_handler.addFilter(_ContextFilter())
+        logger = _PhaseLogger(f"phase0:{key}", logging.DEBUG)
+        logger.propagate = False
+        logger.addHandler(queue_handler)
+        logger.listener = listener
+        _loggers[key] = logger
+        return logger
+
+
+def shutdown(log_file=None):
+    """Flush and close background writers (all of them, or one log file's)"""
+    with _loggers_lock:
+        keys = [str(log_file)] if log_file is not None else list(_loggers)
+        for key in keys:
+            logger = _loggers.pop(key, None)
+            if logger is None:
+                continue
+            logger.listener.stop()
+            for handler in logger.listener.handlers:
+                handler.close()
+
+
+atexit.register(shutdown)
+
+
+def _log_files(log_file):
+    """Log file and its rotated siblings, oldest first"""
+    log_file = Path(log_file)
+
+    def age(path):
+        suffix = path.name[len(log_file.name) + 1:]
+        # Size rotation: .1 is newest; time rotation: date suffixes sort by age
+        return (-int(suffix), "") if suffix.isdigit() else (0, suffix)
+
+    rotated = sorted(log_file.parent.glob(f"{log_file.name}.*"), key=age)
+    return rotated + ([log_file] if log_file.exists() else [])
+
+
+def read_records(log_file):
+    """
+    Parsed records from a log and its rotated files, oldest first
+
+    Yields:
+        dict: {"ts", "level", "message", ...fields}; plain-text lines from
+            older versions yield ts, level and message only
+    """
+    for path in _log_files(log_file):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                if line.startswith("{"):
+                    try:
+                        yield json.loads(line)
+                        continue
+                    except ValueError:
+                        pass
+                match = _LEGACY_LINE.match(line)
+                if match:
+                    yield {"ts": match.group("ts") or match.group("ts2"),
+                           "level": match.group("level") or match.group("level2"),
+                           "message": match.group("message")}
+
+
+def summarize(records, recent=100):
+    """
+    Counts for status dashboards
+
+    Returns:
+        dict: {"total", "levels" (last `recent` records), "events" (all records),
+               "last_activity", "recent_events"}
+    """
+    from collections import Counter, deque
+
+    total = 0
+    levels = deque(maxlen=recent)
+    events = Counter()
+    recent_events = deque(maxlen=10)
+    last_activity = None
+    for record in records:
+        total += 1
+        levels.append(record.get("level"))
+        last_activity = record.get("ts") or last_activity
+        event = record.get("event")
+        if event:
+            events[event] += 1
+            recent_events.append(record)
+
+    return {
+        "total": total,
+        "levels": dict(Counter(levels)),
+        "events": dict(events),
+        "last_activity": last_activity,
+        "recent_events": list(recent_events)
+    }
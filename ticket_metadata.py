@@ -0,0 +1,121 @@
+"""
+Ticket Metadata Files
+metadata.json with bulky fields (the OCR text) in compressed sidecars
+
+metadata.json keeps the dozen-odd fields every reader needs; the full OCR
+text goes to ocr_text.txt.gz in the same folder and metadata.json records
+the reference:
+
+    "ocr_text_file": "ocr_text.txt.gz",
+    "ocr_text_chars": 48211
+
+load_metadata() returns a TicketMetadata dict that reads the sidecar only
+when ocr_text is accessed, so metadata["ocr_text"] and
+metadata.get("ocr_text", "") keep working in existing code. Older
+metadata.json files with ocr_text inline load unchanged.
+
+Both files are written atomically (temp file + os.replace), sidecar
+first, so metadata.json never points at a missing or partial sidecar.
+Replacing files instead of rewriting them in place also keeps hardlinked
+copies (see artifact_placement) independent. A sidecar that is missing
+or unreadable anyway (deleted by hand, disk error) reads as an absent
+field: metadata["ocr_text"] raises KeyError and get() returns the default.
+"""
+
+import os
+import gzip
+import json
+import zlib
+import threading
+from pathlib import Path
+
+# Field -> sidecar file name (next to metadata.json)
+SIDECAR_FIELDS = {"ocr_text": "ocr_text.txt.gz"}
+
+
+class TicketMetadata(dict):
+    """metadata.json contents; sidecar fields load on first access"""
+
+    def __init__(self, data, folder):
+        super().__init__(data)
+        self.folder = Path(folder)
+
+    def _sidecar(self, key):
+        name = dict.get(self, f"{key}_file") if key in SIDECAR_FIELDS else None
+        return self.folder / name if name else None
+
+    def __missing__(self, key):
+        path = self._sidecar(key)
+        if path is None:
+            raise KeyError(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                value = f.read()
+        except (OSError, EOFError, zlib.error, UnicodeDecodeError) as e:
+            # Sidecar deleted, truncated or corrupt: treat the field as absent
+            print(f"[!] Unreadable {key} sidecar {path}: {e}")
+            raise KeyError(key) from e
+        self[key] = value
+        return value
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or self._sidecar(key) is not None
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def sidecars(self):
+        """Paths of the sidecar files this metadata references"""
+        return [path for path in (self._sidecar(field) for field in SIDECAR_FIELDS) if path is not None]
+
+
+def _atomic_write(path, data):
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_metadata(metadata_file, metadata):
+    """
+    Write metadata.json, moving sidecar fields (ocr_text) to compressed files
+
+    Args:
+        metadata_file: Path of metadata.json
+        metadata: Metadata dict (not modified); sidecar fields not loaded
+            from an existing TicketMetadata keep their current sidecar
+    """
+    metadata_file = Path(metadata_file)
+    data = dict(metadata)
+    for field, name in SIDECAR_FIELDS.items():
+        value = data.pop(field, None)
+        if value is None:
+            continue
+        text = str(value)
+        _atomic_write(metadata_file.parent / name, gzip.compress(text.encode("utf-8"), compresslevel=6))
+        data[f"{field}_file"] = name
+        data[f"{field}_chars"] = len(text)
+
+    _atomic_write(metadata_file, json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8"))
+
+
+def load_metadata(metadata_file):
+    """
+    Read metadata.json (sidecar fields load lazily on access)
+
+    Returns:
+        TicketMetadata
+    """
+    metadata_file = Path(metadata_file)
+    with open(metadata_file, 'r', encoding='utf-8') as f:
+        return TicketMetadata(json.load(f), metadata_file.parent)
@@ -10,6 +10,8 @@ import json
 from pathlib import Path
 from datetime import datetime
 
+from ticket_metadata import load_metadata
+
 
 class ArchiveVerifier:
     """Verify resolution archive completeness"""
@@ -171,8 +173,7 @@ class ArchiveVerifier:
     def _validate_metadata(self, metadata_path):
         """Validate metadata.json content"""
         try:
-            with open(metadata_path, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+            metadata = load_metadata(metadata_path)
 
             required_fields = [
                 "ticket_id",
@@ -189,6 +190,11 @@ class ArchiveVerifier:
                     warnings.append(f"metadata.json missing field: {field}")
                     valid = False
 
+            # OCR text sidecar must travel with metadata.json
+            for sidecar in metadata.sidecars():
+                if not sidecar.exists():
+                    warnings.append(f"metadata.json references missing {sidecar.name}")
+
             # Check confidence score
             if "confidence" in metadata:
                 confidence = metadata["confidence"]
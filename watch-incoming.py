@@ -18,17 +18,48 @@ INCOMING_DIR = r"C:\Users\sleep\Documents\tickets\incoming"
 SKILL_PATH = r"C:\Users\sleep\.claude\skills\media-analysis\run.py"
 LOG_PATH = r"C:\Users\sleep\.claude\logs\watch-incoming.log"
 
+# Persistent OCR worker: loaded once, shared by every analysis subprocess
+OCR_SERVICE_PATH = str(Path(SKILL_PATH).parent / "ocr_service.py")
+START_OCR_SERVICE = os.environ.get("OCR_SERVICE", "1") != "0"
+# Seconds to wait for the service to load its models before watching anyway
+OCR_SERVICE_START_TIMEOUT = float(os.environ.get("OCR_SERVICE_START_TIMEOUT", "180"))
+
+# Durable job queue: files are queued (surviving restarts) and processed by
+# job_queue.py workers instead of one run.py subprocess per file
+JOB_QUEUE_PATH = str(Path(SKILL_PATH).parent / "job_queue.py")
+USE_JOB_QUEUE = os.environ.get("PHASE0_QUEUE", "0") == "1"
+
 # Supported file extensions
-SUPPORTED_EXTS = {'.pdf', '.png', '.jpg', '.jpeg', '.bmp', '.tiff',
+SUPPORTED_EXTS = {'.pdf', '.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.gif',
                   '.mp3', '.wav', '.mp4', '.mov', '.avi'}
 
+# Structured log shared with the skill (JSON lines, rotated; read by watcher-status.py).
+# Without the skill directory, fall back to the plain-text log so main() can
+# still report what is missing.
+sys.path.insert(0, str(Path(SKILL_PATH).parent))
+try:
+    from ticket_log import file_handler, log_fields
+except ImportError:
+    file_handler = None
+
+    def log_fields(**fields):
+        return {"fields": fields}
+
 # Setup logging
+text_format = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+console_handler = logging.StreamHandler(sys.stdout)
+console_handler.setFormatter(text_format)
+Path(LOG_PATH).parent.mkdir(parents=True, exist_ok=True)
+if file_handler is not None:
+    log_handler = file_handler(LOG_PATH)
+else:
+    log_handler = logging.FileHandler(LOG_PATH)
+    log_handler.setFormatter(text_format)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler(LOG_PATH),
-        logging.StreamHandler(sys.stdout)
+        log_handler,
+        console_handler
     ]
 )
 
@@ -62,7 +93,7 @@ class IncomingFileHandler(FileSystemEventHandler):
 
         # Process file
         self.processing.add(str(file_path))
-        logging.info(f"New file detected: {file_path.name}")
+        logging.info(f"New file detected: {file_path.name}", extra=log_fields(event="file_detected", file=file_path.name))
 
         try:
             self._analyze_file(file_path)
@@ -105,17 +136,110 @@ class IncomingFileHandler(FileSystemEventHandler):
             )
 
             if result.returncode == 0:
-                logging.info(f"Analysis complete: {file_path.name}")
+                logging.info(f"Analysis complete: {file_path.name}",
+                             extra=log_fields(event="analysis_succeeded", file=file_path.name))
                 logging.debug(f"Output: {result.stdout}")
             else:
-                logging.error(f"Analysis failed: {file_path.name}")
+                logging.error(f"Analysis failed: {file_path.name}",
+                              extra=log_fields(event="analysis_failed", file=file_path.name))
                 logging.error(f"Error: {result.stderr}")
 
         except subprocess.TimeoutExpired:
-            logging.error(f"Analysis timeout: {file_path.name}")
+            logging.error(f"Analysis timeout: {file_path.name}",
+                          extra=log_fields(event="analysis_timeout", file=file_path.name))
 
         except Exception as e:
-            logging.error(f"Analysis error: {file_path.name} - {e}")
+            logging.error(f"Analysis error: {file_path.name} - {e}",
+                          extra=log_fields(event="analysis_failed", file=file_path.name))
+
+class QueueingFileHandler(FileSystemEventHandler):
+    """Queue new files in the durable job queue (workers wait for complete files)"""
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def on_created(self, event):
+        """Triggered when new file is created"""
+        if event.is_directory:
+            return
+
+        file_path = Path(event.src_path)
+        if file_path.suffix.lower() not in SUPPORTED_EXTS:
+            logging.info(f"Skipping unsupported file: {file_path.name}")
+            return
+
+        if self.queue.enqueue(file_path) is None:
+            logging.warning(f"Already queued: {file_path.name}")
+        else:
+            logging.info(f"Queued: {file_path.name}", extra=log_fields(event="file_queued", file=file_path.name))
+
+def _skill_python():
+    """The skill's venv interpreter (same one run.py uses), else this one"""
+    skill_dir = Path(SKILL_PATH).parent
+    venv_python = skill_dir / "venv" / ("Scripts/python.exe" if os.name == 'nt' else "bin/python")
+    return str(venv_python) if venv_python.exists() else sys.executable
+
+def open_job_queue():
+    """
+    Open the job queue, queue files already waiting in incoming/ (e.g. dropped
+    while the watcher was down) and launch the queue workers.
+    Returns (queue, worker Popen handle).
+    """
+    sys.path.insert(0, str(Path(JOB_QUEUE_PATH).parent))
+    from job_queue import JobQueue
+
+    queue = JobQueue()
+    waiting = [p for p in Path(INCOMING_DIR).iterdir()
+               if p.is_file() and p.suffix.lower() in SUPPORTED_EXTS]
+    queued = sum(1 for p in waiting if queue.enqueue(p) is not None)
+    logging.info(f"Job queue: {queue.db_path} ({queued} waiting files queued, {queue.pending()} pending)")
+
+    process = subprocess.Popen([_skill_python(), JOB_QUEUE_PATH, "run"])
+    logging.info(f"Queue workers starting (pid {process.pid})")
+    return queue, process
+
+def start_ocr_service():
+    """
+    Launch the persistent OCR worker so each analysis subprocess submits to
+    warm models instead of loading PaddleOCR itself.
+    Returns the Popen handle, or None if disabled/already running/unavailable.
+    """
+    if not START_OCR_SERVICE or not Path(OCR_SERVICE_PATH).exists():
+        return None
+
+    sys.path.insert(0, str(Path(OCR_SERVICE_PATH).parent))
+    try:
+        from ocr_service import connect_if_running
+    except ImportError as e:
+        logging.warning(f"OCR service unavailable: {e}")
+        return None
+
+    client = connect_if_running()
+    if client is not None:
+        client.close()
+        logging.info("OCR service already running - reusing it")
+        return None
+
+    process = subprocess.Popen([_skill_python(), OCR_SERVICE_PATH, "serve"])
+    logging.info(f"OCR service starting (pid {process.pid})")
+
+    # Wait until it answers a ping; tickets dispatched before then would
+    # each load PaddleOCR in-process instead
+    deadline = time.monotonic() + OCR_SERVICE_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            logging.warning(f"OCR service exited during startup (code {process.returncode})")
+            return None
+        client = connect_if_running()
+        if client is not None:
+            client.close()
+            logging.info("OCR service ready")
+            return process
+        time.sleep(0.5)
+
+    logging.warning(f"OCR service not ready after {OCR_SERVICE_START_TIMEOUT:.0f}s - "
+                    "continuing; tickets load OCR in-process until it is")
+    return process
 
 def main():
     """Main watcher loop"""
@@ -141,7 +265,15 @@ def main():
     logging.info(f"Supported: {', '.join(SUPPORTED_EXTS)}")
     logging.info("="*60)
 
-    event_handler = IncomingFileHandler()
+    if USE_JOB_QUEUE:
+        # Queue workers load their own OCR engine; no separate OCR service
+        ocr_service = None
+        queue, queue_workers = open_job_queue()
+        event_handler = QueueingFileHandler(queue)
+    else:
+        ocr_service = start_ocr_service()
+        queue_workers = None
+        event_handler = IncomingFileHandler()
     observer = Observer()
     observer.schedule(event_handler, INCOMING_DIR, recursive=False)
     observer.start()
@@ -155,5 +287,15 @@ def main():
 
     observer.join()
 
+    if ocr_service is not None:
+        ocr_service.terminate()
+        logging.info("OCR service stopped")
+
+    if queue_workers is not None:
+        # Running jobs stay leased and are picked up again on the next start
+        queue_workers.terminate()
+        queue.close()
+        logging.info("Queue workers stopped")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
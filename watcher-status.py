@@ -6,9 +6,35 @@ import json
 from pathlib import Path
 from datetime import datetime, timedelta
 
+from ticket_log import read_records
+
 LOG_PATH = r"C:\Users\sleep\.claude\logs\watch-incoming.log"
 STATUS_FILE = r"C:\Users\sleep\.claude\logs\watcher-status.json"
 
+# Watcher messages written before records carried an "event" field
+LEGACY_EVENTS = {
+    "New file detected:": "file_detected",
+    "Analysis complete:": "analysis_succeeded",
+    "Analysis failed:": "analysis_failed",
+    "Analysis error:": "analysis_failed",
+    "Analysis timeout:": "analysis_timeout"
+}
+
+def record_event(record):
+    """
+    Watcher event of a log record, recovered from the message for legacy lines
+
+    Returns:
+        tuple: (event or None, file name or None)
+    """
+    if record.get("event"):
+        return record["event"], record.get("file")
+    message = record.get("message") or ""
+    for prefix, event in LEGACY_EVENTS.items():
+        if message.startswith(prefix):
+            return event, message[len(prefix):].split(" - ")[0].strip()
+    return None, None
+
 def parse_log():
     """Parse log file for statistics"""
     if not Path(LOG_PATH).exists():
@@ -23,25 +49,21 @@ def parse_log():
         "recent_files": []
     }
 
-    with open(LOG_PATH, 'r') as f:
-        for line in f:
-            if "New file detected:" in line:
-                stats["total_files"] += 1
-                filename = line.split("New file detected:")[-1].strip()
-                timestamp = line.split(" - ")[0]
-                stats["recent_files"].append({
-                    "file": filename,
-                    "time": timestamp
-                })
-            elif "Analysis complete:" in line:
-                stats["success"] += 1
-            elif "Analysis failed:" in line:
-                stats["failed"] += 1
-            elif "Analysis timeout:" in line:
-                stats["timeout"] += 1
+    # Structured watcher events (ticket_log JSON lines) and legacy text lines
+    counters = {"analysis_succeeded": "success", "analysis_failed": "failed", "analysis_timeout": "timeout"}
+    for record in read_records(LOG_PATH):
+        event, file_name = record_event(record)
+        if event in ("file_detected", "file_queued"):
+            stats["total_files"] += 1
+            stats["recent_files"].append({
+                "file": file_name,
+                "time": record.get("ts")
+            })
+        elif event in counters:
+            stats[counters[event]] += 1
 
-        stats["last_activity"] = stats["recent_files"][-1]["time"] if stats["recent_files"] else None
-        stats["recent_files"] = stats["recent_files"][-10:]  # Last 10
+    stats["last_activity"] = stats["recent_files"][-1]["time"] if stats["recent_files"] else None
+    stats["recent_files"] = stats["recent_files"][-10:]  # Last 10
 
     return stats
 
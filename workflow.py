@@ -12,9 +12,15 @@ Modified for PaddleOCR-first approach
 """
 
 import asyncio
+import argparse
 import json
-import shutil
-import re
+import time
+import logging
+import threading
+import weakref
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from datetime import datetime
 import sys
@@ -25,12 +31,37 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from gemini_analyzer import GeminiAnalyzer, extract_ticket_metadata
 from ocr_processor import OCRProcessor
+from ocr_service import connect_if_running
+from metadata_parser import parse_metadata_from_text, required_fields_found
+from ocr_cache import hash_file
+from ticket_checkpoint import CheckpointStore
+from ticket_log import get_logger, log_context, bind
+from artifact_placement import place_file
+from ticket_metadata import load_metadata, write_metadata
+
+
+# extraction_method values for documents (OCR, embedded PDF text, or both)
+DOCUMENT_METHODS = ("paddleocr_primary", "pdf_text_layer", "pdf_text_layer+paddleocr_primary")
+
+DOCUMENT_EXTENSIONS = ['.pdf', '.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.gif']
+AUDIO_VIDEO_EXTENSIONS = ['.mp3', '.wav', '.m4a', '.mp4', '.mov', '.avi', '.webm']
+
+# Results below this confidence need manual verification
+LOW_CONFIDENCE = 0.70
 
 
 class TicketWorkflow:
     """BMAD-EDI ticket processing workflow - Phase 0 Pre-Investigation Analysis"""
 
-    def __init__(self):
+    def __init__(self, early_exit=None, checkpoints=None):
+        """
+        Args:
+            early_exit: Stop OCR once page text yields all required metadata
+                fields (default: PHASE0_EARLY_EXIT env var, off unless "1")
+            checkpoints: Record completed stages per input content hash so
+                reruns resume or return the saved result (default:
+                PHASE0_CHECKPOINTS env var, on unless "0")
+        """
         # Working directory: C:\Users\sleep\Documents\tickets\
         self.tickets_base = Path(r"C:\Users\sleep\Documents\tickets")
         self.incoming_dir = self.tickets_base / "incoming"
@@ -44,122 +75,192 @@ class TicketWorkflow:
 
         self.log_file = self.tickets_base / "media-analysis.log"
 
-    def _log(self, message, level="INFO"):
-        """Log message to file and console"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] [{level}] {message}"
-        print(log_entry)
+        # Per-input stage checkpoints (see ticket_checkpoint)
+        if checkpoints is None:
+            checkpoints = os.environ.get("PHASE0_CHECKPOINTS", "1") == "1"
+        self.checkpoints = checkpoints
+        self.checkpoint_dir = self.tickets_base / ".checkpoints"
+        self._checkpoint_store = None
+        # Input hash -> lock; an entry lives only while some run holds or awaits it
+        self._input_locks = weakref.WeakValueDictionary()
+
+        # OCR engines are created lazily and reused for every ticket. A model
+        # is not thread-safe, so each document checks out an engine of its
+        # own: up to ocr_engines documents are OCR'd at once (1 outside batch
+        # mode; process_batch raises it to --jobs, at most max_ocr_engines).
+        # A page pool (OCR_WORKERS) still parallelizes pages within a document.
+        self._ocr = None
+        self.ocr_engines = 1
+        self.max_ocr_engines = max(1, int(os.environ.get("PHASE0_OCR_ENGINES", "4")))
+        self._ocr_available = threading.Condition()
+        self._ocr_all = []
+        self._ocr_idle = []
+        self._ocr_created = 0
+        # OCR jobs queue on their own threads, so waiting tickets do not tie
+        # up the default executor used for file I/O
+        self._ocr_executor = None
+        self._ocr_executor_size = 0
+
+        # Gemini browser: one per ticket by default; process_batch keeps a
+        # single browser open for the whole batch (it has one page, so media
+        # tickets are analyzed one at a time)
+        self.reuse_browser = False
+        self._gemini = None
+        self._gemini_lock = None
+
+        if early_exit is None:
+            early_exit = os.environ.get("PHASE0_EARLY_EXIT", "0") == "1"
+        self.early_exit = early_exit
+
+    def _get_ocr(self):
+        """
+        Return the OCR engine for this workflow
 
-        try:
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(log_entry + "\n")
-        except:
-            pass  # Don't fail if logging fails
+        Prefers a running OCR service (models already loaded and warm);
+        otherwise loads PaddleOCR in-process once and reuses it.
+        """
+        if self._ocr is None:
+            client = connect_if_running()
+            if client is not None:
+                self._log("[*] Submitting to persistent OCR service")
+                self._ocr = client
+            else:
+                self._log("[*] No OCR service running - loading PaddleOCR in-process")
+                self._ocr = OCRProcessor()
+        return self._ocr
 
-    def _parse_metadata_from_text(self, text):
+    def _create_ocr(self):
         """
-        Parse ticket metadata from OCR-extracted text
-
-        Looks for patterns like:
-        - Ticket #XXXXXXX
-        - Customer: Name
-        - Company: Name
-        - Trading Partner: Name
-        - etc.
+        An additional OCR engine for concurrent documents
+
+        Always in-process: the OCR service runs one job at a time, so more
+        connections to it would not add throughput. Engines split the cores
+        between them and leave page pools to the first engine.
         """
-        metadata = {
-            "ticket_id": "UNKNOWN",
-            "customer_name": "Unknown",
-            "company": "Unknown",
-            "trading_partner": "Unknown",
-            "transaction_type": "Unknown",
-            "message_id": "N/A",
-            "severity": "NORMAL",
-            "issue_title": "Issue extracted from OCR",
-            "root_cause": "Pending investigation",
-            "recommended_actions": []
-        }
+        cpu_threads = max(1, (os.cpu_count() or 1) // self.ocr_engines)
+        return OCRProcessor(workers=1, cpu_threads=cpu_threads, cache_evictor=False)
+
+    def _acquire_ocr(self):
+        """Check out an idle OCR engine, creating one while under ocr_engines"""
+        with self._ocr_available:
+            while not self._ocr_idle and self._ocr_created >= self.ocr_engines:
+                self._ocr_available.wait()
+            if self._ocr_idle:
+                return self._ocr_idle.pop()
+            self._ocr_created += 1
+            first = self._ocr_created == 1
+
+        # Model loading happens outside the lock
+        try:
+            ocr = self._get_ocr() if first else self._create_ocr()
+        except BaseException:
+            with self._ocr_available:
+                self._ocr_created -= 1
+                self._ocr_available.notify()
+            raise
+        with self._ocr_available:
+            self._ocr_all.append(ocr)
+        return ocr
+
+    def _release_ocr(self, ocr, replacement=None):
+        """Return an engine to the idle set (or its replacement, after a fallback)"""
+        with self._ocr_available:
+            if replacement is not None:
+                self._ocr_all[self._ocr_all.index(ocr)] = replacement
+                if self._ocr is ocr:
+                    self._ocr = replacement
+                ocr = replacement
+            self._ocr_idle.append(ocr)
+            self._ocr_available.notify()
+
+    def _extract_document_text(self, file_path, stop_when=None, pages=None):
+        """Run OCR on an idle engine, falling back to in-process OCR if the service goes away"""
+        ocr = self._acquire_ocr()
+        replacement = None
+        kwargs = {"preprocess": True, "stop_when": stop_when, "pages": pages}
+        try:
+            try:
+                ocr_result = ocr.extract_text(str(file_path), **kwargs)
+            except ConnectionError as e:
+                self._log(f"[!] OCR service unavailable ({e}) - falling back to in-process OCR", "WARNING")
+                replacement = OCRProcessor()
+                ocr_result = replacement.extract_text(str(file_path), **kwargs)
+        finally:
+            self._release_ocr(ocr, replacement)
+
+        service = ocr_result.get("metadata", {}).get("service")
+        if service:
+            self._log(f"[*] OCR service request: {service.get('request_seconds', 0.0):.2f}s "
+                      f"(cold start paid once: {service.get('cold_start_seconds') or 0.0:.2f}s)")
+        return ocr_result
+
+    async def _run_ocr(self, file_path, stop_when=None, pages=None):
+        """_extract_document_text on an OCR thread, without blocking the event loop"""
+        if self._ocr_executor is None or self._ocr_executor_size < self.ocr_engines:
+            if self._ocr_executor is not None:
+                self._ocr_executor.shutdown(wait=False)
+            self._ocr_executor = ThreadPoolExecutor(max_workers=self.ocr_engines, thread_name_prefix="ocr")
+            self._ocr_executor_size = self.ocr_engines
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._ocr_executor, contextvars.copy_context().run,
+            partial(self._extract_document_text, file_path, stop_when=stop_when, pages=pages)
+        )
+
+    @staticmethod
+    async def _run_io(func, *args):
+        """Run blocking file I/O in the default executor (keeps the ticket's log context)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, contextvars.copy_context().run, partial(func, *args))
+
+    async def _extract_media_metadata(self, file_path):
+        """Gemini metadata for an audio/video ticket, on the shared browser if reuse_browser is set"""
+        if not self.reuse_browser:
+            return await extract_ticket_metadata(str(file_path))
+
+        if self._gemini_lock is None:
+            self._gemini_lock = asyncio.Lock()
+        async with self._gemini_lock:
+            if self._gemini is None:
+                analyzer = GeminiAnalyzer()
+                await analyzer.initialize()
+                if not analyzer.check_auth():
+                    await analyzer.authenticate()
+                self._gemini = analyzer
+            return await self._gemini.extract_edi_metadata(str(file_path))
+
+    async def close(self):
+        """Close the shared Gemini browser and the OCR engines"""
+        if self._gemini is not None:
+            await self._gemini.cleanup()
+            self._gemini = None
+        if self._ocr_executor is not None:
+            self._ocr_executor.shutdown(wait=False)
+            self._ocr_executor = None
+        with self._ocr_available:
+            engines = self._ocr_all or ([self._ocr] if self._ocr is not None else [])
+            self._ocr = None
+            self._ocr_all, self._ocr_idle, self._ocr_created = [], [], 0
+        for ocr in engines:
+            ocr.close()
+
+    def _log(self, message, level="INFO", **fields):
+        """
+        Log message to file and console (written on a background thread, see ticket_log)
 
-        # Extract ticket number (#XXXXXXX or Ticket: XXXXXXX)
-        ticket_patterns = [
-            r'#(\d{7,8})',
-            r'Ticket[:\s#]+(\d{7,8})',
-            r'Case[:\s#]+(\d{7,8})',
-        ]
-        for pattern in ticket_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                metadata["ticket_id"] = match.group(1)
-                break
-
-        # Extract customer/company name
-        customer_patterns = [
-            r'Customer[:\s]+([^\n]+)',
-            r'From[:\s]+([^\n]+)',
-            r'Requester[:\s]+([^\n]+)',
-        ]
-        for pattern in customer_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                metadata["customer_name"] = match.group(1).strip()
-                break
-
-        # Extract company
-        company_patterns = [
-            r'Company[:\s]+([^\n]+)',
-            r'Organization[:\s]+([^\n]+)',
-        ]
-        for pattern in company_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                metadata["company"] = match.group(1).strip()
-                break
-
-        # Extract trading partner
-        partner_patterns = [
-            r'Trading Partner[:\s]+([^\n]+)',
-            r'Partner[:\s]+([^\n]+)',
-            r'Vendor[:\s]+([^\n]+)',
-        ]
-        for pattern in partner_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                metadata["trading_partner"] = match.group(1).strip()
-                break
-
-        # Extract transaction type (850, 810, 856, etc.)
-        transaction_patterns = [
-            r'(850|810|856|997|940|945|947|204|210|214|990)\s*(PO|Invoice|ASN|FA|Warehouse|Shipment|Status|Carrier|Freight)?',
-            r'Transaction[:\s]+(\d{3})',
-        ]
-        for pattern in transaction_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                trans_code = match.group(1)
-                trans_type = match.group(2) if match.lastindex > 1 else ""
-                metadata["transaction_type"] = f"{trans_code} {trans_type}".strip()
-                break
-
-        # Extract severity keywords
-        if re.search(r'\b(urgent|critical|emergency|down)\b', text, re.IGNORECASE):
-            metadata["severity"] = "HIGH"
-        elif re.search(r'\b(important|priority|asap)\b', text, re.IGNORECASE):
-            metadata["severity"] = "MEDIUM"
-
-        # Extract issue title (first line with "error", "issue", "problem", etc.)
-        issue_patterns = [
-            r'(Error[:\s]+[^\n]+)',
-            r'(Issue[:\s]+[^\n]+)',
-            r'(Problem[:\s]+[^\n]+)',
-            r'(Subject[:\s]+[^\n]+)',
-        ]
-        for pattern in issue_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                metadata["issue_title"] = match.group(1).strip()
-                break
+        Args:
+            message: Log message
+            level: INFO, WARNING or ERROR
+            **fields: Structured fields for the JSON record (e.g. event="ticket_failed")
+        """
+        level_number = logging.getLevelName(level)
+        if not isinstance(level_number, int):
+            level_number = logging.INFO
+        get_logger(self.log_file).log(level_number, message, extra={"fields": fields})
 
-        return metadata
+    def _parse_metadata_from_text(self, text):
+        """Parse ticket metadata from OCR-extracted text (see metadata_parser)"""
+        return parse_metadata_from_text(text)
 
     async def process_ticket(self, file_path):
         """
@@ -172,54 +273,84 @@ class TicketWorkflow:
             dict: Processing results with metadata
         """
         file_path = Path(file_path)
-        self._log(f"[PHASE 0] Processing: {file_path.name}")
+        with log_context(file=file_path.name, stage="ingest"):
+            return await self._process_ticket(file_path)
+
+    async def _process_ticket(self, file_path):
+        """process_ticket inside the ticket's log context"""
+        self._log(f"[PHASE 0] Processing: {file_path.name}", event="ticket_started")
 
         if not file_path.exists():
             error_msg = f"File not found: {file_path}"
-            self._log(error_msg, "ERROR")
+            self._log(error_msg, "ERROR", event="ticket_failed")
             return {
                 "success": False,
                 "error": error_msg
             }
 
+        ext = file_path.suffix.lower()
+        if not self.checkpoints or ext not in DOCUMENT_EXTENSIONS + AUDIO_VIDEO_EXTENSIONS:
+            return await self._run_stages(file_path, None)
+
+        # One run per input content at a time; a duplicate waits, then reuses the result
+        input_hash = await self._run_io(hash_file, file_path)
+        lock = self._input_locks.get(input_hash)
+        if lock is None:
+            lock = self._input_locks[input_hash] = asyncio.Lock()
+        async with lock:
+            if self._checkpoint_store is None:
+                self._checkpoint_store = CheckpointStore(self.checkpoint_dir)
+            checkpoint = await self._run_io(self._checkpoint_store.open, file_path, input_hash)
+
+            result = checkpoint.result
+            if result is not None and Path(result["metadata_file"]).exists():
+                self._log(f"[*] Unchanged input already processed - reusing result: {result['ticket_folder']}",
+                          event="ticket_reused", ticket_id=result.get("ticket_id"))
+                return {**result, "from_checkpoint": True}
+            if checkpoint.stage("extract") is not None:
+                self._log(f"[*] Resuming from checkpoint at stage: {checkpoint.next_stage or 'artifacts'}")
+            return await self._run_stages(file_path, checkpoint)
+
+    async def _run_stages(self, file_path, checkpoint):
+        """Extract metadata and write artifacts, skipping stages the checkpoint already has"""
         # Determine file type
         ext = file_path.suffix.lower()
-        is_audio_video = ext in ['.mp3', '.wav', '.m4a', '.mp4', '.mov', '.avi', '.webm']
-        is_document = ext in ['.pdf', '.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.gif']
+        is_audio_video = ext in AUDIO_VIDEO_EXTENSIONS
+        is_document = ext in DOCUMENT_EXTENSIONS
 
         try:
+            bind(stage="extract")
+            extracted = checkpoint.stage("extract") if checkpoint is not None else None
+
             # ROUTING LOGIC: PaddleOCR for documents, Gemini for audio/video
-            if is_document:
+            if extracted is not None:
+                # Step 1 done in an earlier run (OCR / Gemini not repeated)
+                metadata = extracted["metadata"]
+                confidence = extracted["confidence"]
+                extraction_method = extracted["extraction_method"]
+
+            elif is_document:
                 # Step 1: Extract text with PaddleOCR (PRIMARY for documents)
                 self._log("[*] Document detected - using PaddleOCR as primary engine...")
-                ocr = OCRProcessor()
-                ocr_result = ocr.extract_text(str(file_path), preprocess=True)
+                stop_when = required_fields_found if self.early_exit else None
+                # Off the event loop, so Gemini jobs and other tickets keep moving
+                ocr_result = await self._run_ocr(file_path, stop_when=stop_when)
 
                 if not ocr_result.get("success"):
                     error_msg = f"OCR extraction failed: {ocr_result.get('error', 'Unknown error')}"
-                    self._log(error_msg, "ERROR")
+                    self._log(error_msg, "ERROR", event="ticket_failed")
                     return {
                         "success": False,
                         "error": error_msg
                     }
 
                 # Parse OCR text to extract metadata
-                ocr_text = ocr_result.get("text", "")
-                self._log(f"[*] PaddleOCR extracted {len(ocr_text)} characters")
-
-                # Extract metadata from OCR text
-                metadata = self._parse_metadata_from_text(ocr_text)
-                metadata["ocr_text"] = ocr_text
-                metadata["ocr_confidence"] = ocr_result.get("confidence", 0.0)
-                metadata["confidence"] = ocr_result.get("confidence", 0.0)
-                extraction_method = "paddleocr_primary"
-                confidence = metadata["confidence"]
-                self._log(f"[*] PaddleOCR confidence: {confidence:.2f}")
+                metadata, confidence, extraction_method = self._document_metadata(ocr_result)
 
             elif is_audio_video:
                 # Step 1: Extract metadata with Gemini (ONLY for audio/video)
                 self._log("[*] Audio/video detected - using Gemini 2.5 Pro...")
-                metadata = await extract_ticket_metadata(str(file_path))
+                metadata = await self._extract_media_metadata(file_path)
 
                 # Check if extraction was successful
                 if not isinstance(metadata, dict):
@@ -231,98 +362,300 @@ class TicketWorkflow:
 
             else:
                 error_msg = f"Unsupported file type: {ext}"
-                self._log(error_msg, "ERROR")
+                self._log(error_msg, "ERROR", event="ticket_failed")
                 return {
                     "success": False,
                     "error": error_msg,
                     "supported_types": {
-                        "documents": [".pdf", ".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".gif"],
-                        "audio_video": [".mp3", ".wav", ".m4a", ".mp4", ".mov", ".avi", ".webm"]
+                        "documents": DOCUMENT_EXTENSIONS,
+                        "audio_video": AUDIO_VIDEO_EXTENSIONS
                     }
                 }
 
             metadata["extraction_method"] = extraction_method
+            if checkpoint is not None and extracted is None:
+                await self._run_io(checkpoint.complete, "extract", {
+                    "metadata": metadata,
+                    "confidence": confidence,
+                    "extraction_method": extraction_method
+                })
+
+            # Steps 2-6: filename, processing folder, file copy, metadata JSON, analysis
+            bind(stage="artifacts")
+            result = await self._run_io(self._write_artifacts, file_path, metadata, confidence, extraction_method)
+            if checkpoint is not None:
+                await self._run_io(checkpoint.complete, "artifacts", {"result": result})
+            return result
 
-            # Step 2: Generate standardized filename
-            new_filename = self._generate_filename(metadata, file_path.suffix)
-            self._log(f"[*] Generated filename: {new_filename}")
+        except Exception as e:
+            self._log(f"[ERROR] Processing failed: {str(e)}", "ERROR", event="ticket_failed", error=str(e))
 
-            # Step 3: Create processing folder
-            ticket_id = metadata.get("ticket_id", "UNKNOWN")
-            ticket_folder = self.processing_dir / f"ticket_{ticket_id}"
-            ticket_folder.mkdir(exist_ok=True)
+            failed_path, error_file = await self._run_io(self._write_failure, file_path, str(e))
 
-            # Step 4: Copy file to processing folder
-            new_file_path = ticket_folder / new_filename
-            try:
-                shutil.copy2(file_path, new_file_path)
-                self._log(f"[+] File copied to: {new_file_path}")
-            except Exception as e:
-                self._log(f"[!] File copy failed: {str(e)}", "ERROR")
-                raise
-
-            # Step 5: Save metadata JSON
-            metadata_file = ticket_folder / "metadata.json"
-            metadata_to_save = {
-                **metadata,
-                "timestamp": datetime.now().isoformat(),
-                "original_file": file_path.name,
-                "processed_file": new_filename,
-                "confidence": confidence
+            return {
+                "success": False,
+                "error": str(e),
+                "failed_path": str(failed_path),
+                "error_file": str(error_file)
             }
 
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata_to_save, f, indent=2, ensure_ascii=False)
-            self._log(f"[+] Metadata saved: {metadata_file}")
+    def _document_metadata(self, ocr_result):
+        """
+        Ticket metadata from a successful OCR result
+
+        Returns:
+            tuple: (metadata, confidence, extraction_method)
+        """
+        ocr_text = ocr_result.get("text", "")
+        self._log(f"[*] PaddleOCR extracted {len(ocr_text)} characters")
+
+        # Extract metadata from OCR text
+        metadata = self._parse_metadata_from_text(ocr_text)
+        metadata["ocr_text"] = ocr_text
+        metadata["ocr_confidence"] = ocr_result.get("confidence", 0.0)
+        metadata["confidence"] = ocr_result.get("confidence", 0.0)
+        metadata.update(self._ocr_coverage(ocr_result.get("metadata", {})))
+        metadata["ocr_preprocess_ms"] = ocr_result.get("metadata", {}).get("preprocess_ms", 0.0)
+        if metadata["ocr_partial"]:
+            self._log(f"[*] Early exit: required fields found, skipped pages "
+                      f"{metadata['ocr_pages_skipped']} of {metadata['ocr_total_pages']}")
+        metadata["ocr_page_sources"] = {
+            str(detail["page"]): detail.get("source", "ocr")
+            for detail in ocr_result.get("metadata", {}).get("page_details", [])
+        }
+        extraction_method = self._document_extraction_method(ocr_result.get("metadata", {}))
+        confidence = metadata["confidence"]
+        self._log(f"[*] PaddleOCR confidence: {confidence:.2f}")
+        return metadata, confidence, extraction_method
+
+    def _write_artifacts(self, file_path, metadata, confidence, extraction_method):
+        """
+        Name the ticket and write its processing folder (blocking)
 
-            # Step 6: Generate preliminary analysis
-            analysis_file = ticket_folder / "preliminary_analysis.md"
-            self._generate_analysis_md(metadata_to_save, analysis_file)
-            self._log(f"[+] Analysis saved: {analysis_file}")
+        Returns:
+            dict: process_ticket success result
+        """
+        bind(ticket_id=metadata.get("ticket_id"))
 
-            # Step 7: Remove from incoming (optional - comment out if you want to keep originals)
-            # file_path.unlink()
-            # self._log(f"[+] Original file removed from incoming")
+        # Step 2: Generate standardized filename
+        new_filename = self._generate_filename(metadata, file_path.suffix)
+        self._log(f"[*] Generated filename: {new_filename}")
 
-            self._log(f"[SUCCESS] Phase 0 complete: {ticket_folder}")
+        # Steps 3-6: processing folder, file copy, metadata JSON, analysis
+        ticket_id = metadata.get("ticket_id", "UNKNOWN")
+        ticket_folder = self.processing_dir / f"ticket_{ticket_id}"
+        metadata_to_save = {
+            **metadata,
+            "timestamp": datetime.now().isoformat(),
+            "original_file": file_path.name,
+            "processed_file": new_filename,
+            "confidence": confidence
+        }
+        metadata_file, analysis_file = self._write_ticket_files(file_path, ticket_folder, new_filename,
+                                                                metadata_to_save)
+
+        # Step 7: Remove from incoming (optional - comment out if you want to keep originals)
+        # file_path.unlink()
+        # self._log(f"[+] Original file removed from incoming")
+
+        self._log(f"[SUCCESS] Phase 0 complete: {ticket_folder}", event="ticket_succeeded",
+                  confidence=confidence, extraction_method=extraction_method)
+
+        return {
+            "success": True,
+            "ticket_id": ticket_id,
+            "ticket_folder": str(ticket_folder),
+            "metadata_file": str(metadata_file),
+            "analysis_file": str(analysis_file),
+            "confidence": confidence,
+            "extraction_method": extraction_method
+        }
 
-            return {
-                "success": True,
-                "ticket_id": ticket_id,
-                "ticket_folder": str(ticket_folder),
-                "metadata_file": str(metadata_file),
-                "analysis_file": str(analysis_file),
-                "confidence": confidence,
-                "extraction_method": extraction_method
-            }
+    def _write_ticket_files(self, file_path, ticket_folder, new_filename, metadata_to_save):
+        """
+        Create the processing folder with the ticket file, metadata.json and analysis (blocking)
 
+        Returns:
+            tuple: (metadata_file, analysis_file)
+        """
+        ticket_folder.mkdir(exist_ok=True)
+
+        # Place file in processing folder (reflink when possible, see artifact_placement).
+        # Never a hardlink: incoming/ is a drop folder and a re-dropped file with
+        # the same name may be rewritten in place, which would change this copy too
+        new_file_path = ticket_folder / new_filename
+        try:
+            placement = place_file(file_path, new_file_path, hardlink=False)
+            metadata_to_save["file_placement"] = placement
+            self._log(f"[+] File placed ({placement}): {new_file_path}", placement=placement)
         except Exception as e:
-            self._log(f"[ERROR] Processing failed: {str(e)}", "ERROR")
+            self._log(f"[!] File copy failed: {str(e)}", "ERROR")
+            raise
 
-            # Move to failed folder
-            failed_path = self.failed_dir / file_path.name
-            try:
-                shutil.copy2(file_path, failed_path)
-                self._log(f"[*] File copied to failed folder: {failed_path}")
-            except:
-                pass
+        # Save metadata JSON (OCR text in a compressed sidecar, see ticket_metadata)
+        metadata_file = ticket_folder / "metadata.json"
+        write_metadata(metadata_file, metadata_to_save)
+        self._log(f"[+] Metadata saved: {metadata_file}")
 
-            # Create error report
-            error_report = {
-                "error": str(e),
-                "file": file_path.name,
-                "timestamp": datetime.now().isoformat()
-            }
-            error_file = self.failed_dir / f"{file_path.stem}_error.json"
-            with open(error_file, 'w') as f:
-                json.dump(error_report, f, indent=2)
+        # Generate preliminary analysis
+        analysis_file = ticket_folder / "preliminary_analysis.md"
+        self._generate_analysis_md(metadata_to_save, analysis_file)
+        self._log(f"[+] Analysis saved: {analysis_file}")
+        return metadata_file, analysis_file
 
-            return {
-                "success": False,
-                "error": str(e),
-                "failed_path": str(failed_path),
-                "error_file": str(error_file)
-            }
+    def _write_failure(self, file_path, error):
+        """
+        Copy a failed ticket to the failed folder with an error report (blocking)
+
+        Returns:
+            tuple: (failed_path, error_file)
+        """
+        failed_path = self.failed_dir / file_path.name
+        placement = None
+        try:
+            # failed/ sits under incoming/: an independent copy, as above
+            placement = place_file(file_path, failed_path, hardlink=False)
+            self._log(f"[*] File placed in failed folder ({placement}): {failed_path}", placement=placement)
+        except:
+            pass
+
+        error_report = {
+            "error": error,
+            "file": file_path.name,
+            "file_placement": placement,
+            "timestamp": datetime.now().isoformat()
+        }
+        error_file = self.failed_dir / f"{file_path.stem}_error.json"
+        with open(error_file, 'w') as f:
+            json.dump(error_report, f, indent=2)
+        return failed_path, error_file
+
+    async def process_batch(self, directory, jobs=4):
+        """
+        Phase 0 for every supported file in a directory, with bounded concurrency
+
+        All tickets share this workflow's OCR engines (up to jobs of them,
+        at most max_ocr_engines, each OCRing one document at a time) and a
+        single Gemini browser, so models and the browser are loaded once
+        per batch.
+
+        Args:
+            directory: Directory of ticket files (not recursive)
+            jobs: Tickets in flight at once
+
+        Returns:
+            dict: Batch summary (see print_batch_summary) with per-ticket results
+        """
+        directory = Path(directory)
+        files = sorted(path for path in directory.iterdir()
+                       if path.is_file() and path.suffix.lower() in DOCUMENT_EXTENSIONS + AUDIO_VIDEO_EXTENSIONS)
+        jobs = max(1, int(jobs))
+        self._log(f"[BATCH] {len(files)} tickets in {directory} ({jobs} jobs)")
+
+        semaphore = asyncio.Semaphore(jobs)
+        self.reuse_browser = True
+        ocr_engines = self.ocr_engines
+        self.ocr_engines = max(ocr_engines, min(jobs, self.max_ocr_engines))
+
+        async def run_one(path):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    result = await self.process_ticket(path)
+                except Exception as e:
+                    result = {"success": False, "error": f"{type(e).__name__}: {e}"}
+                result["file"] = path.name
+                result["seconds"] = time.perf_counter() - start
+                return result
+
+        start = time.perf_counter()
+        try:
+            results = await asyncio.gather(*(run_one(path) for path in files))
+        finally:
+            await self.close()
+            self.reuse_browser = False
+            self.ocr_engines = ocr_engines
+        elapsed = time.perf_counter() - start
+
+        succeeded = [r for r in results if r.get("success")]
+        seconds = sorted(r["seconds"] for r in results)
+        return {
+            "directory": str(directory),
+            "jobs": jobs,
+            "tickets": len(results),
+            "succeeded": len(succeeded),
+            "failed": [{"file": r["file"], "error": r.get("error", "Unknown error")}
+                       for r in results if not r.get("success")],
+            "low_confidence": [{"file": r["file"], "ticket_id": r.get("ticket_id"), "confidence": r["confidence"]}
+                               for r in succeeded if r.get("confidence", 0.0) < LOW_CONFIDENCE],
+            "elapsed_seconds": elapsed,
+            "tickets_per_minute": len(results) / elapsed * 60 if elapsed > 0 else 0.0,
+            "mean_ticket_seconds": sum(seconds) / len(seconds) if seconds else 0.0,
+            "max_ticket_seconds": seconds[-1] if seconds else 0.0,
+            "results": results
+        }
+
+    def _document_extraction_method(self, ocr_metadata):
+        """extraction_method for documents: embedded PDF text, OCR, or both"""
+        method = ocr_metadata.get("extraction_method", "paddleocr")
+        if method == "pdf_text_layer":
+            self._log("[*] Digital PDF - text layer used, OCR skipped")
+            return "pdf_text_layer"
+        if method == "pdf_text_layer+paddleocr":
+            self._log(f"[*] Mixed PDF - {ocr_metadata.get('text_layer_pages', 0)} text-layer pages, "
+                      f"{ocr_metadata.get('ocr_pages', 0)} OCR'd")
+            return "pdf_text_layer+paddleocr_primary"
+        return "paddleocr_primary"
+
+    def _ocr_coverage(self, ocr_metadata):
+        """Page coverage fields for metadata.json (ocr_text is partial if pages were skipped)"""
+        pages_skipped = ocr_metadata.get("pages_skipped", [])
+        return {
+            "ocr_partial": bool(pages_skipped),
+            "ocr_pages_skipped": pages_skipped,
+            "ocr_total_pages": ocr_metadata.get("pages", 0)
+        }
+
+    async def complete_ocr_text(self, ticket_folder):
+        """
+        OCR the pages skipped by early exit and append them to ocr_text
+
+        Runs the OCR and file I/O in worker threads so it can be scheduled
+        in the background (e.g. asyncio.create_task) while other tickets proceed.
+
+        Args:
+            ticket_folder: processing/ticket_<id> folder with metadata.json
+
+        Returns:
+            dict: Updated metadata (unchanged if ocr_text was already complete)
+        """
+        ticket_folder = Path(ticket_folder)
+        metadata_file = ticket_folder / "metadata.json"
+        metadata = await self._run_io(load_metadata, metadata_file)
+
+        pages_skipped = metadata.get("ocr_pages_skipped", [])
+        if not metadata.get("ocr_partial") or not pages_skipped:
+            return metadata
+
+        file_path = ticket_folder / metadata["processed_file"]
+        self._log(f"[*] Completing OCR text: pages {pages_skipped} of {file_path.name}")
+
+        ocr_result = await self._run_ocr(file_path, pages=pages_skipped)
+        if not ocr_result.get("success"):
+            self._log(f"[!] Full-text OCR failed: {ocr_result.get('error', 'Unknown error')}", "ERROR")
+            return metadata
+
+        # Early exit only ever skips trailing pages, so appending keeps page order
+        remaining_text = ocr_result.get("text", "")
+        if remaining_text:
+            ocr_text = await self._run_io(metadata.get, "ocr_text", "")
+            metadata["ocr_text"] = "\n\n".join(t for t in (ocr_text, remaining_text) if t)
+        metadata["ocr_partial"] = False
+        metadata["ocr_pages_skipped"] = []
+
+        await self._run_io(write_metadata, metadata_file, metadata)
+        self._log(f"[+] Full OCR text saved: {metadata_file}")
+        return metadata
 
     def _generate_filename(self, metadata, extension):
         """Generate standardized filename"""
@@ -353,6 +686,10 @@ class TicketWorkflow:
         extraction_method = metadata.get('extraction_method', 'unknown').upper()
         if extraction_method == "PADDLEOCR_PRIMARY":
             extraction_label = "PADDLEOCR (PRIMARY)"
+        elif extraction_method == "PDF_TEXT_LAYER":
+            extraction_label = "PDF TEXT LAYER (NO OCR)"
+        elif extraction_method == "PDF_TEXT_LAYER+PADDLEOCR_PRIMARY":
+            extraction_label = "PDF TEXT LAYER + PADDLEOCR"
         else:
             extraction_label = extraction_method
 
@@ -395,10 +732,19 @@ class TicketWorkflow:
 ## Extraction Details
 """
 
-        if metadata.get('extraction_method') == 'paddleocr_primary':
+        if metadata.get('extraction_method') in DOCUMENT_METHODS:
             content += f"- PaddleOCR confidence: {confidence:.2f}\n"
             content += f"- Characters extracted: {len(metadata.get('ocr_text', ''))}\n"
-            content += f"- Preprocessing: 5-stage pipeline applied\n"
+            content += f"- Preprocessing: adaptive pipeline ({metadata.get('ocr_preprocess_ms', 0.0):.0f} ms)\n"
+            sources = metadata.get('ocr_page_sources', {})
+            text_layer = sorted(int(page) for page, source in sources.items() if source == "text_layer")
+            if text_layer:
+                content += f"- Embedded PDF text used (no OCR) for pages: {text_layer}\n"
+            if metadata.get('ocr_partial'):
+                content += (f"- OCR text is PARTIAL: stopped after required fields were found; "
+                            f"pages skipped {metadata.get('ocr_pages_skipped')} of "
+                            f"{metadata.get('ocr_total_pages')} "
+                            f"(run `workflow.py --full-text <ticket_folder>` for the rest)\n")
         elif metadata.get('extraction_method') == 'gemini':
             content += f"- Gemini 2.5 Pro confidence: {confidence:.2f}\n"
             content += f"- Analysis method: Multimodal (audio/video)\n"
@@ -410,17 +756,96 @@ class TicketWorkflow:
             f.write(content)
 
 
+def print_batch_summary(summary):
+    """Print throughput, failures and low-confidence tickets for a batch run"""
+    print("\n" + "="*80)
+    print(f"BATCH SUMMARY: {summary['directory']}")
+    print("="*80)
+    print(f"Tickets:     {summary['tickets']} ({summary['succeeded']} succeeded, "
+          f"{len(summary['failed'])} failed) with {summary['jobs']} jobs")
+    print(f"Elapsed:     {summary['elapsed_seconds']:.1f}s "
+          f"({summary['tickets_per_minute']:.1f} tickets/min)")
+    print(f"Per ticket:  mean {summary['mean_ticket_seconds']:.1f}s, max {summary['max_ticket_seconds']:.1f}s")
+
+    if summary["failed"]:
+        print(f"\n[!] Failed ({len(summary['failed'])}):")
+        for failure in summary["failed"]:
+            print(f"    {failure['file']}: {failure['error']}")
+
+    if summary["low_confidence"]:
+        print(f"\n[!] Low confidence (< {LOW_CONFIDENCE:.2f}) - manual verification recommended:")
+        for ticket in summary["low_confidence"]:
+            print(f"    {ticket['file']}: ticket {ticket['ticket_id']} ({ticket['confidence']:.2f})")
+    print("="*80 + "\n")
+
+
+def _positive_int(value):
+    """argparse type: an integer >= 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number, got {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def parse_args(argv=None):
+    """Command line: <file_path> | --full-text <ticket_folder> | --batch <directory> [--jobs N]"""
+    parser = argparse.ArgumentParser(
+        prog="workflow.py",
+        description="BMAD-EDI Phase 0 pre-investigation analysis",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="Supported file types:\n"
+               "  Documents (PaddleOCR): PDF, PNG, JPG, JPEG, BMP, TIFF, GIF\n"
+               "  Audio/Video (Gemini): MP3, WAV, M4A, MP4, MOV, AVI, WEBM\n\n"
+               "Example: python workflow.py C:/Users/sleep/Documents/tickets/incoming/ticket.pdf"
+    )
+    parser.add_argument("file_path", nargs="?", help="Ticket file to process")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--full-text", metavar="TICKET_FOLDER",
+                      help="OCR the pages an early exit skipped for a processed ticket")
+    mode.add_argument("--batch", metavar="DIRECTORY", help="Process every supported file in a directory")
+    parser.add_argument("--jobs", type=_positive_int,
+                        help="Tickets in flight with --batch (default: PHASE0_BATCH_JOBS or 4)")
+
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        parser.print_help()
+        sys.exit(1)
+    args = parser.parse_args(argv)
+
+    if (args.file_path is not None) == (args.batch is not None or args.full_text is not None):
+        parser.error("give one of: <file_path>, --full-text TICKET_FOLDER, --batch DIRECTORY")
+    if args.jobs is not None and args.batch is None:
+        parser.error("--jobs only applies to --batch")
+    if args.batch is not None and args.jobs is None:
+        try:
+            args.jobs = _positive_int(os.environ.get("PHASE0_BATCH_JOBS", "4"))
+        except argparse.ArgumentTypeError as e:
+            parser.error(f"PHASE0_BATCH_JOBS: {e}")
+    return args
+
+
 async def main():
     """CLI entry point"""
-    if len(sys.argv) < 2:
-        print("Usage: python workflow_paddleocr_primary.py <file_path>")
-        print("\nSupported file types:")
-        print("  Documents (PaddleOCR): PDF, PNG, JPG, JPEG, BMP, TIFF, GIF")
-        print("  Audio/Video (Gemini): MP3, WAV, M4A, MP4, MOV, AVI, WEBM")
-        print("\nExample: python workflow_paddleocr_primary.py C:/Users/sleep/Documents/tickets/incoming/ticket.pdf")
-        sys.exit(1)
+    args = parse_args()
+
+    if args.batch is not None:
+        workflow = TicketWorkflow()
+        summary = await workflow.process_batch(args.batch, jobs=args.jobs)
+        print_batch_summary(summary)
+        sys.exit(0 if not summary["failed"] else 1)
+
+    if args.full_text is not None:
+        workflow = TicketWorkflow()
+        metadata = await workflow.complete_ocr_text(args.full_text)
+        print(f"[+] OCR text: {len(metadata.get('ocr_text', ''))} characters "
+              f"(partial: {metadata.get('ocr_partial', False)})")
+        sys.exit(0)
 
-    file_path = sys.argv[1]
+    file_path = args.file_path
 
     workflow = TicketWorkflow()
     result = await workflow.process_ticket(file_path)
@@ -432,7 +857,7 @@ async def main():
         print(f"Extraction Method: {result['extraction_method']}")
 
         # Alert if confidence is below threshold
-        if result['confidence'] < 0.70:
+        if result['confidence'] < LOW_CONFIDENCE:
             print("\n" + "="*80)
             print("[!] WARNING: Low Confidence Extraction (< 0.70)")
             print("[!] Manual verification STRONGLY recommended")